@@ -1,73 +1,204 @@
-from transformers import BertTokenizer, BertForSequenceClassification
-import torch
-import streamlit as st
+import argparse
+import sys
+import os
+import csv
+import time as tme
 
 import pandas as pd
 
+from inference import engine as inference_engine
+from inference import labeler as inference_labeler
+
+from config import BATCH_SIZE, INFERENCE_BACKEND, INFERENCE_WORKERS
+
+# Number of comments read from comments.csv at a time
+CHUNK_SIZE = 5000
+
 class Process:
 
-    def __init__(self, results_path: str):
+    def __init__(self, results_path: str, chunk_size: int = CHUNK_SIZE):
 
         self.results_path = results_path
-        self.comments_path = f"{results_path}comments.csv"
-        self.articles_path = f"{results_path}articles.csv"
+        self.comments_path = os.path.join(results_path, "comments.csv")
+        self.articles_path = os.path.join(results_path, "articles.csv")
+        self.chunk_size = chunk_size
+
+    def read_articles(self) -> pd.DataFrame:
+        return pd.read_csv(self.articles_path, parse_dates=['datetime_added', 'datetime_article']).set_index('id')
+
+    def preprocess_chunk(self, comments: pd.DataFrame, articles: pd.DataFrame) -> pd.DataFrame:
+        # We add the same columns as the Sentiment Analyzer page, so both write the same comments_labeled.csv
+
+        comments['search_term'] = comments['article_id'].map(articles['search_term'])
+        comments['article_title'] = comments['article_id'].map(articles['title'])
+        comments['input_text'] = [f"[ARTICLE TITLE] {title} [COMMENT] {content}"
+                                  for title, content in zip(comments['article_title'], comments['comment_content'])]
 
-    def preprocess_data(self):
+        return comments
+
+    def iter_chunks(self):
+        # We read comments.csv in chunks, so that big datasets don't have to fit in memory at once
 
         dtype_comments = {
             'comment_in_answer_to': 'str'
             # the other column types will be inferred
         }
-        
-        articles = pd.read_csv(self.articles_path, parse_dates=['datetime_added', 'datetime_article'])
-        comments = pd.read_csv(self.comments_path, dtype=dtype_comments, parse_dates=['comment_datetime'])
 
-        comments['article_title'] = comments.join(articles.set_index('id'), on='article_id', lsuffix='comments')['title']
-        comments['input_text'] = comments.apply(lambda row: f"[ARTICLE TITLE] {row['article_title']} [COMMENT] {row['comment_content']}", axis=1)
-        
-        return comments[['input_text']]
-        
+        articles = self.read_articles()
 
-class Predict:
+        for comments in pd.read_csv(self.comments_path, dtype=dtype_comments, parse_dates=['comment_datetime'], chunksize=self.chunk_size):
+            yield self.preprocess_chunk(comments.reset_index(drop=True), articles)
+
+    def preprocess_data(self) -> pd.DataFrame:
+        return pd.concat(list(self.iter_chunks()), ignore_index=True)
+
+
+class LabeledDataset:
 
     def __init__(self, results_path: str):
 
-        self.comments = Process(results_path).preprocess_data()
+        self.filepath = os.path.join(results_path, "comments_labeled.csv")
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.filepath)
 
-        self.model = BertForSequenceClassification.from_pretrained("./model")
-        self.tokenizer = BertTokenizer.from_pretrained("./model")
+    def read(self) -> pd.DataFrame:
+
+        dtype_comments = {'comment_in_answer_to': 'str'}
+        labeled = pd.read_csv(self.filepath, dtype=dtype_comments, parse_dates=['comment_datetime'])
+
+        # Older files were stored with an extra positional index as their first 'comment_id' column,
+        # so the real comment_id was read as 'comment_id.1'
+        if 'comment_id.1' in labeled.columns:
+            labeled = labeled.drop(columns='comment_id').rename(columns={'comment_id.1': 'comment_id'})
+
+        return labeled
+
+    def missing(self, comments: pd.DataFrame, labeled: pd.DataFrame) -> pd.DataFrame:
+        # We return the comments whose comment_id has no label yet
+        return comments[~comments['comment_id'].isin(labeled['comment_id'])].reset_index(drop=True)
+
+    def merge(self, labeled: pd.DataFrame, new_labeled: pd.DataFrame) -> pd.DataFrame:
+        # We append the new predictions to the existing ones. Columns that didn't exist in the old file are kept.
+        return pd.concat([labeled, new_labeled], ignore_index=True).drop_duplicates('comment_id', keep='last')
+
+    def write(self, labeled: pd.DataFrame) -> None:
+        labeled.to_csv(self.filepath, index=False, sep=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+    def append(self, labeled: pd.DataFrame, header: bool) -> None:
+        labeled.to_csv(self.filepath, mode='w' if header else 'a', header=header, index=False, sep=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+
+class Predict:
+
+    def __init__(self,
+                 results_path: str,
+                 labeler: inference_labeler.Labeler = None,
+                 chunk_size: int = CHUNK_SIZE,
+                 progress_callback=None):
+
+        self.results_path = results_path
+        # progress_callback(message) receives the same progress updates printed on stderr (used by the job runner)
+        self.progress_callback = progress_callback
+        self.process = Process(results_path, chunk_size)
+        self.labeled_dataset = LabeledDataset(results_path)
+
+        # Texts that were already labeled by the same model are taken from the prediction cache
+        self.labeler = labeler if labeler else inference_labeler.Labeler()
 
     def predict_sentiment(self, input_text):
 
-        # Set the model to evaluation mode (necessary for inference)
-        self.model.eval()
+        label_codes, _ = self.labeler.predict([input_text])
 
-        # Tokenize the input text
-        inputs = self.tokenizer(input_text, padding=True, truncation=True, return_tensors="pt", max_length=128)
+        return label_codes[0]
 
-        # Make predictions
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            prediction = torch.argmax(logits, axis=1)
+    def add_predictions(self, comments: pd.DataFrame) -> pd.DataFrame:
 
-        return prediction
+        label_codes, _ = self.labeler.predict(comments['input_text'].tolist())
 
-    def predict_all_comments(self):
-        
-        labels = {
-            0: 'positive',
-            1: 'neutral',
-            2: 'negative',
-            3: 'very-negative'
-        }
+        comments['predicted_label_code'] = label_codes
+        comments['predicted_label'] = comments['predicted_label_code'].map(inference_engine.LABELS)
+
+        return comments
+
+    def print_progress(self, labeled: int, predicted: int, cache_hits: int, start_time: float) -> None:
+        # Progress goes to stderr, so stdout can be redirected without mixing both
+        elapsed = tme.time() - start_time
+        message = (f"[{os.path.basename(os.path.normpath(self.results_path))}] {labeled} comments labeled "
+                   f"({predicted} with the model, {cache_hits} from the cache) - {labeled / elapsed:.1f} comments/s")
+        print(message, file=sys.stderr)
+
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def predict_all_comments(self) -> int:
+        # We label every comment without a label in comments_labeled.csv, and return how many we labeled
+
+        start_time = tme.time()
+
+        labeled = self.labeled_dataset.read() if self.labeled_dataset.exists() else None
+
+        new_chunks = []
+        len_labeled, len_predicted, len_cache_hits = 0, 0, 0
+
+        for chunk in self.process.iter_chunks():
+
+            if labeled is not None:
+                chunk = self.labeled_dataset.missing(chunk, labeled)
+            if len(chunk) == 0:
+                continue
+
+            chunk = self.add_predictions(chunk)
+
+            if labeled is None:
+                # Without an existing file, we can write every chunk as soon as it's labeled
+                self.labeled_dataset.append(chunk, header=(len_labeled == 0))
+            else:
+                new_chunks.append(chunk)
+
+            len_labeled += len(chunk)
+            len_predicted += self.labeler.predicted
+            len_cache_hits += self.labeler.cache_hits
+            self.print_progress(len_labeled, len_predicted, len_cache_hits, start_time)
+
+        if new_chunks:
+            self.labeled_dataset.write(self.labeled_dataset.merge(labeled, pd.concat(new_chunks, ignore_index=True)))
+
+        if len_labeled == 0:
+            print(f"[{os.path.basename(os.path.normpath(self.results_path))}] Every comment is already labeled.", file=sys.stderr)
+
+        return len_labeled
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Label the comments of one or more searches and store them in comments_labeled.csv.")
+
+    parser.add_argument("paths", type=str, nargs='+', help="Search directories (data/scrapes/<search>) with articles.csv and comments.csv")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Number of comments in a single forward pass")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Number of comments read from comments.csv at a time")
+    parser.add_argument('--backend', type=str, default=INFERENCE_BACKEND, choices=['torch', 'onnx', 'int8'], help="Inference backend")
+    parser.add_argument('--workers', type=int, default=INFERENCE_WORKERS, help="Number of worker processes")
+    parser.add_argument('--no-cache', action='store_true', help="Don't use the prediction cache")
+
+    args = parser.parse_args()
+
+    start_time = tme.time()
+    total_labeled = 0
+
+    # The same labeler (and its worker processes) labels every search
+    with inference_labeler.Labeler(batch_size=args.batch_size,
+                                   use_cache=not args.no_cache,
+                                   backend=args.backend,
+                                   workers=args.workers) as labeler:
 
-        labels = []
+        for path in args.paths:
+            if not os.path.isfile(os.path.join(path, "comments.csv")):
+                print(f"No comments.csv found in {path}. Skipping it.", file=sys.stderr)
+                continue
+            total_labeled += Predict(path, labeler, args.chunk_size).predict_all_comments()
 
-        for comment in self.comments.values:
-            prediction = self.predict_sentiment(comment)
-            label = labels[prediction]
-            st.write(label)
-            labels.append(label)
+    elapsed = tme.time() - start_time
+    print(f"\nTotal: {total_labeled} comments labeled in {elapsed:.3f}s ({total_labeled / elapsed:.1f} comments/s)", file=sys.stderr)
 
-        return labels
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,147 @@
 # config.py
 import os
 
-REPO_PATH = os.path.dirname(os.path.abspath(__file__))
\ No newline at end of file
+REPO_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# -- Sentiment model --
+MODEL_PATH = os.path.join(REPO_PATH, "model")
+# The fine-tuned model was trained with sequences of at most 128 tokens
+MAX_LENGTH = 128
+# Number of comments sent to the model in a single forward pass
+BATCH_SIZE = 32
+# Number of worker processes used to label comments (1 labels them in the current process)
+INFERENCE_WORKERS = 1
+# torch threads used by each worker (None divides the CPU cores between the workers)
+THREADS_PER_WORKER = None
+
+# -- Prediction cache --
+PREDICTION_CACHE_PATH = os.path.join(REPO_PATH, "data", "cache", "predictions.sqlite")
+# Maximum number of stored predictions. Least recently used ones are evicted first.
+PREDICTION_CACHE_MAX_ENTRIES = 500000
+
+# -- Inference backend --
+# "torch", "onnx" or "int8". The ONNX and int8 backends fall back to torch if their model is missing or stale.
+INFERENCE_BACKEND = "torch"
+ONNX_MODEL_PATH = os.path.join(REPO_PATH, "model_onnx", "model.onnx")
+# Number of threads used by ONNX Runtime (0 lets ONNX Runtime decide)
+ONNX_INTRA_OP_THREADS = 0
+ONNX_INTER_OP_THREADS = 0
+# Dynamically quantized (int8) version of the model, built with python -m inference.quantization
+INT8_MODEL_PATH = os.path.join(REPO_PATH, "model_int8", "model.pt")
+
+# -- Streaming labeling while crawling --
+# Maximum number of comments waiting to be labeled
+STREAMING_QUEUE_SIZE = 1000
+# Comments labeled together, and maximum seconds we wait to fill a micro-batch
+STREAMING_MICRO_BATCH = 64
+STREAMING_MAX_WAIT = 5.0
+
+# -- Crawler --
+# Number of journals crawled at the same time, each with its own WebDriver (1 crawls them one after another)
+CRAWL_WORKERS = 1
+
+# -- Browser profile for the Selenium driver --
+# "eager": driver.get returns once the DOM is ready, without waiting for images, stylesheets and frames.
+# Journals with page_load=normal in sources_elements.csv still wait for the full load.
+BROWSER_PAGE_LOAD_STRATEGY = "eager"
+# Resources the browser doesn't download. Each journal chooses the kinds it blocks
+# in the column blocked_resources of sources_elements.csv (e.g. images,fonts,media,ads)
+BROWSER_BLOCKED_EXTENSIONS = {
+    'images': ["jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico"],
+    'fonts': ["woff", "woff2", "ttf", "otf", "eot"],
+    'media': ["mp4", "webm", "m3u8", "ts", "mp3", "ogg"]
+}
+# Advertising and analytics hosts, blocked with the kind 'ads'
+BROWSER_BLOCKED_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com", "googletagmanager.com",
+    "google-analytics.com", "adservice.google.com", "amazon-adsystem.com", "criteo.com", "criteo.net",
+    "taboola.com", "outbrain.com", "scorecardresearch.com", "chartbeat.com", "chartbeat.net",
+    "hotjar.com", "facebook.net", "connect.facebook.net", "adnxs.com", "rubiconproject.com", "pubmatic.com"
+]
+
+# -- HTTP client for the static pages --
+# Connections kept alive per host, and maximum number of pages fetched at the same time (workers of the crawl frontier)
+HTTP_POOL_SIZE = 10
+HTTP_CONCURRENCY = 8
+# Seconds to connect and to receive the page, and number of retries after a connection or server error
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 20
+HTTP_RETRIES = 2
+
+# -- Pagination --
+# The results in numbered pages (Altaveu, Fòrum, Diari) are sorted from the newest article. Instead of reading every page
+# from the first one, we look for the first page that reaches the end of the interval: we probe pages 2, 4, 8...
+# until one does, then binary search between the last two probes.
+PAGE_SEEK_ENABLED = True
+# We don't probe pages after this one (e.g. a journal that returns its first page for any page number)
+PAGE_SEEK_MAX_PAGE = 1024
+
+# -- Fetch routing --
+# Each kind of page is fetched with plain HTTP or Selenium as set in the columns fetch_listing, fetch_article
+# and fetch_comments of crawler/sources_elements.csv. Static pages without what the parser reads are opened with Selenium,
+# and after this number of them (and none usable), Selenium is used for that journal and kind of page for the rest of the crawl.
+ROUTER_STATIC_ATTEMPTS = 3
+
+# -- HTML parsing --
+# Engine that parses the pages: "lxml", "html.parser" or "selectolax" (optional, pip install selectolax).
+# With selectolax, the containers read by the parser are found by selectolax and only those are built with BeautifulSoup.
+# If the engine isn't installed, we fall back to lxml, then to html.parser.
+PARSER_ENGINE = "lxml"
+# Only build the parts of the page read by the parser (see Parser.LISTING_CONTAINERS and Parser.ARTICLE_CONTAINERS)
+PARSER_STRAIN = True
+
+# -- Crawl frontier --
+# Every static page goes through a queue. Result lists go first, as they lead to the other pages.
+FRONTIER_PRIORITIES = {'listing': 0, 'article': 1, 'comments': 2}
+# Per domain: maximum number of pages fetched at the same time and of requests per second
+FRONTIER_DOMAIN_CONCURRENCY = 4
+FRONTIER_DOMAIN_RATE = 8
+# Domains with other limits, as {domain: (concurrency, requests per second)}, e.g. {'forum.ad': (2, 4)}
+FRONTIER_DOMAIN_LIMITS = {}
+
+# -- Page cache --
+# Pages fetched by the crawler, reused by the next searches
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_PATH = os.path.join(REPO_PATH, "data", "cache", "pages.sqlite")
+# Maximum size of the stored (compressed) pages. Least recently used ones are evicted first.
+PAGE_CACHE_MAX_MB = 500
+# Seconds a page is used without asking the server again, per kind of page:
+# result listings change with every new article, the comments of an article change for a few days,
+# and the body of an article practically never changes
+PAGE_CACHE_TTL = {
+    'listing': 15 * 60,
+    'comments': 60 * 60,
+    'article': 30 * 24 * 60 * 60
+}
+
+# -- Article index --
+# Index of the articles stored in every past search, so new searches don't open them again
+SCRAPES_PATH = os.path.join(REPO_PATH, "data", "scrapes")
+ARTICLE_INDEX_ENABLED = True
+ARTICLE_INDEX_PATH = os.path.join(REPO_PATH, "data", "cache", "articles.sqlite")
+# Reuse the stored comments of indexed articles too (new comments since the last search are then missed)
+ARTICLE_INDEX_REUSE_COMMENTS = False
+
+# -- Article store --
+# The title, subtitle and content of the articles of a search are stored in articles.pack, each one compressed with
+# this zlib level (0-9), and their position in articles.idx. Searches with an articles/ directory of .txt files
+# are moved to the store with python -m crawler.article_store <search directories>
+ARTICLE_STORE_COMPRESSION = 6
+
+# -- Background jobs --
+# State, progress and logs of the crawl and labeling jobs started from the app
+JOBS_PATH = os.path.join(REPO_PATH, "data", "jobs")
+
+# -- Results files --
+# The article and comment rows are appended to the results files while the crawl runs.
+# They are written every this number of rows or seconds, whichever comes first.
+RESULTS_FLUSH_ROWS = 200
+RESULTS_FLUSH_INTERVAL = 10.0
+# Optional columnar copy of the results: None or "parquet" (needs pyarrow), written to <results file>_parquet/
+RESULTS_COLUMNAR_FORMAT = None
+
+# -- Checkpoints --
+# The progress of a crawl is written to checkpoint.json in the results folder at most every this number of seconds,
+# so a crawl that stopped can continue from it (main_crawler.py --resume, or the Resume button of the job)
+CHECKPOINT_ENABLED = True
+CHECKPOINT_INTERVAL = 30
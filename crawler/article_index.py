@@ -0,0 +1,209 @@
+import os
+import glob
+import sqlite3
+import threading
+from contextlib import closing
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import pandas as pd
+
+from crawler import article_store
+
+from config import ARTICLE_INDEX_PATH, SCRAPES_PATH
+
+def canonical_link(link: str) -> str:
+    # The same article can be linked with a different scheme, host case, tracking parameters or a trailing slash
+
+    parts = urlsplit(link.strip())
+    query = urlencode([(key, value) for key, value in parse_qsl(parts.query) if not key.startswith('utm_')])
+    path = parts.path.rstrip('/') if parts.path != '/' else parts.path
+
+    return urlunsplit(('https', parts.netloc.lower(), path, query, ''))
+
+class ArticleIndex:
+    # Index of every article stored in the past scrapes (data/scrapes/<search>/), keyed by canonical link.
+    # For each article we keep its id, its metadata and where its content and comments are stored,
+    # so a new search can reuse them instead of opening the page again.
+
+    def __init__(self, path: str = ARTICLE_INDEX_PATH, scrapes_path: str = SCRAPES_PATH):
+
+        self.path = path
+        self.scrapes_path = scrapes_path
+
+        # Comments files and article stores already read, used when we reuse an article
+        self.comments = {}
+        self.stores = {}
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.create_tables()
+
+    def connect(self) -> sqlite3.Connection:
+        # A new connection for every operation, so the index can be used from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create_tables(self) -> None:
+
+        with closing(self.connect()) as connection, connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    link TEXT PRIMARY KEY,
+                    article_id TEXT NOT NULL,
+                    journal TEXT NOT NULL,
+                    datetime_added TEXT,
+                    datetime_article TEXT NOT NULL,
+                    category TEXT,
+                    type TEXT,
+                    title TEXT,
+                    nb_of_comments INTEGER,
+                    article_path TEXT NOT NULL,
+                    comments_path TEXT
+                )
+            """)
+            # Articles files already indexed, with their modification time
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS indexed_files (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL
+                )
+            """)
+
+    def articles_files(self) -> list:
+        # articles.csv from the app, <date>_<search>_articles.csv from the command line
+        return sorted(glob.glob(os.path.join(self.scrapes_path, "*", "*articles*.csv")))
+
+    def comments_file(self, articles_file: str) -> str:
+        directory, filename = os.path.split(articles_file)
+        comments_file = os.path.join(directory, "comments".join(filename.rsplit("articles", 1)))
+        return comments_file if os.path.isfile(comments_file) else None
+
+    def refresh(self, exclude: str = None) -> int:
+        # We index the articles files that are new or changed since the last refresh, and return how many we read.
+        # The results directory of the current search is excluded, as its files are being rewritten.
+
+        exclude = os.path.abspath(exclude) if exclude else None
+
+        with closing(self.connect()) as connection, connection:
+            indexed = dict(connection.execute("SELECT path, mtime FROM indexed_files").fetchall())
+
+        refreshed = 0
+        for articles_file in self.articles_files():
+
+            # We compare whole path components: excluding data/scrapes/foo must not exclude data/scrapes/foo_2
+            if exclude and os.path.commonpath([os.path.abspath(articles_file), exclude]) == exclude:
+                continue
+
+            # A search whose articles were moved to its article store is indexed again
+            store_index = article_store.index_path(os.path.dirname(articles_file))
+            mtime = max(os.path.getmtime(path) for path in [articles_file, store_index] if os.path.isfile(path))
+            if indexed.get(articles_file) == mtime:
+                continue
+
+            try:
+                self.index_file(articles_file)
+            except Exception as e:
+                print(f"Couldn't index {articles_file}: {e}")
+                continue
+
+            with closing(self.connect()) as connection, connection:
+                connection.execute("INSERT OR REPLACE INTO indexed_files VALUES (?, ?)", (articles_file, mtime))
+            refreshed += 1
+
+        return refreshed
+
+    def index_file(self, articles_file: str) -> None:
+
+        articles = pd.read_csv(articles_file, dtype=str)
+        results_path = os.path.dirname(articles_file)
+        articles_path = os.path.join(results_path, "articles")
+        comments_file = self.comments_file(articles_file)
+
+        # The articles are in the article store of the search, or in articles/<id>.txt if it wasn't migrated
+        store = article_store.ArticleStore(results_path)
+
+        rows = []
+        for article in articles.itertuples(index=False):
+            if article.id in store:
+                article_path = store.data_path
+            else:
+                article_path = os.path.join(articles_path, f"{article.id}.txt")
+            # We only index the articles whose content is stored
+            if not isinstance(article.link, str) or not os.path.isfile(article_path):
+                continue
+            rows.append((canonical_link(article.link),
+                         article.id,
+                         article.journal,
+                         article.datetime_added,
+                         article.datetime_article,
+                         article.category,
+                         article.type,
+                         article.title,
+                         int(article.nb_of_comments) if isinstance(article.nb_of_comments, str) else 0,
+                         article_path,
+                         comments_file))
+
+        with closing(self.connect()) as connection, connection:
+            # If an article is in several searches, we keep the most recent one
+            connection.executemany("""
+                INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(link) DO UPDATE SET
+                    article_id = excluded.article_id,
+                    journal = excluded.journal,
+                    datetime_added = excluded.datetime_added,
+                    datetime_article = excluded.datetime_article,
+                    category = excluded.category,
+                    type = excluded.type,
+                    title = excluded.title,
+                    nb_of_comments = excluded.nb_of_comments,
+                    article_path = excluded.article_path,
+                    comments_path = excluded.comments_path
+                WHERE excluded.datetime_added >= articles.datetime_added
+            """, rows)
+
+    def get(self, link: str) -> dict:
+        # We return the indexed article, or None if it's not indexed or its content is not there anymore
+
+        with closing(self.connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            row = connection.execute("SELECT * FROM articles WHERE link = ?", (canonical_link(link),)).fetchone()
+
+        if row is None or not os.path.isfile(row['article_path']):
+            return None
+
+        article = dict(row)
+        article['datetime_article'] = pd.Timestamp(article['datetime_article']).to_pydatetime()
+
+        return article
+
+    def read_content(self, article: dict) -> tuple:
+        # We return the title, subtitle and content of the article
+
+        if os.path.basename(article['article_path']) == article_store.DATA_FILENAME:
+            results_path = os.path.dirname(article['article_path'])
+            with self.lock:
+                if results_path not in self.stores:
+                    self.stores[results_path] = article_store.ArticleStore(results_path)
+                store = self.stores[results_path]
+            return store.get(article['article_id'])
+
+        # Searches not migrated yet: title, subtitle and content separated by an empty line
+        with open(article['article_path'], 'r', encoding='utf-8') as file:
+            return article_store.split_text(file.read())
+
+    def read_comments(self, article: dict) -> list:
+        # We return the stored comments of the article as [comment_id, [attributes]], or None if they are not stored
+
+        comments_path = article['comments_path']
+        if not comments_path or not os.path.isfile(comments_path):
+            return None
+
+        with self.lock:
+            if comments_path not in self.comments:
+                comments = pd.read_csv(comments_path, dtype=str, keep_default_na=False)
+                self.comments[comments_path] = {article_id: group for article_id, group in comments.groupby('article_id')}
+            comments = self.comments[comments_path].get(article['article_id'])
+
+        if comments is None:
+            return []
+
+        return [[row[0], list(row[1:])] for row in comments.itertuples(index=False)]
@@ -0,0 +1,198 @@
+import argparse
+import os
+import sys
+import threading
+import zlib
+
+from config import ARTICLE_STORE_COMPRESSION
+
+DATA_FILENAME = "articles.pack"
+INDEX_FILENAME = "articles.idx"
+
+def data_path(results_path: str) -> str:
+    return os.path.join(results_path, DATA_FILENAME)
+
+def index_path(results_path: str) -> str:
+    return os.path.join(results_path, INDEX_FILENAME)
+
+def store_exists(results_path: str) -> bool:
+    return os.path.isfile(data_path(results_path)) and os.path.isfile(index_path(results_path))
+
+def join_text(title: str, subtitle: str, content: str) -> str:
+    # Same text as the articles/<id>.txt files: title, subtitle and content, separated by an empty line
+    return f"{title}\n\n{subtitle}\n\n{content}"
+
+def split_text(text: str) -> tuple:
+
+    parts = text.split("\n\n", 2)
+    parts = parts + [""] * (3 - len(parts))
+
+    return parts[0], parts[1], parts[2]
+
+class ArticleStore:
+    # The title, subtitle and content of the articles of a search, instead of one articles/<id>.txt file per article.
+    # Every article is compressed on its own and appended to articles.pack, and articles.idx has one line per article
+    # with its id, position and size in articles.pack. An article stored again is appended, and the last line wins.
+    # The article is written before its line in the index, so a crawl that stops never leaves a line without its article.
+    # Journals can be crawled in parallel threads, so every write goes through a lock.
+
+    def __init__(self, results_path: str, level: int = ARTICLE_STORE_COMPRESSION):
+
+        self.data_path = data_path(results_path)
+        self.index_path = index_path(results_path)
+        self.level = level
+
+        self.positions = self.read_index()
+        self.lock = threading.Lock()
+
+        # The files are only opened to write the first article
+        self.data_file = None
+        self.index_file = None
+
+    def read_index(self) -> dict:
+        # {article_id: (position, size)}. We skip the lines of articles not completely written.
+
+        positions = {}
+        if not os.path.isfile(self.index_path) or not os.path.isfile(self.data_path):
+            return positions
+
+        data_size = os.path.getsize(self.data_path)
+        with open(self.index_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if not line.endswith("\n"):
+                    continue
+                try:
+                    article_id, position, size = line.rstrip("\n").split("\t")
+                    position, size = int(position), int(size)
+                except ValueError:
+                    continue
+                if position + size <= data_size:
+                    positions[article_id] = (position, size)
+
+        return positions
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self.positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def ids(self) -> list:
+        return list(self.positions)
+
+    def put(self, article_id: str, title: str, subtitle: str, content: str) -> None:
+
+        data = zlib.compress(join_text(title, subtitle, content).encode('utf-8'), self.level)
+
+        with self.lock:
+            if self.data_file is None:
+                self.open()
+
+            position = self.data_file.seek(0, os.SEEK_END)
+            self.data_file.write(data)
+            self.data_file.flush()
+
+            self.index_file.write(f"{article_id}\t{position}\t{len(data)}\n")
+            self.index_file.flush()
+
+            self.positions[article_id] = (position, len(data))
+
+    def open(self) -> None:
+
+        # A crawl that stopped while writing can leave a torn last line in the index: the next line must not be appended to it
+        torn_line = False
+        if os.path.isfile(self.index_path) and os.path.getsize(self.index_path) > 0:
+            with open(self.index_path, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                torn_line = file.read(1) != b"\n"
+
+        self.data_file = open(self.data_path, 'ab')
+        self.index_file = open(self.index_path, 'a', encoding='utf-8')
+        if torn_line:
+            self.index_file.write("\n")
+
+    def get(self, article_id: str) -> tuple:
+        # (title, subtitle, content) of the article, or None if it's not stored
+
+        position = self.positions.get(article_id)
+        if position is None:
+            return None
+
+        with open(self.data_path, 'rb') as file:
+            file.seek(position[0])
+            data = file.read(position[1])
+
+        return split_text(zlib.decompress(data).decode('utf-8'))
+
+    def items(self):
+        # Every article as (article_id, (title, subtitle, content)), reading articles.pack once from start to end
+
+        with open(self.data_path, 'rb') as file:
+            for article_id, (position, size) in sorted(self.positions.items(), key=lambda item: item[1][0]):
+                file.seek(position)
+                yield article_id, split_text(zlib.decompress(file.read(size)).decode('utf-8'))
+
+    def close(self) -> None:
+
+        with self.lock:
+            if self.data_file is not None:
+                self.data_file.close()
+                self.index_file.close()
+                self.data_file = None
+                self.index_file = None
+
+def migrate(results_path: str, keep: bool = False) -> int:
+    # We move the articles/<id>.txt files of a search to its article store, and return how many we moved.
+    # The files are only deleted (unless keep) once every article can be read back from the store.
+
+    articles_path = os.path.join(results_path, "articles")
+    if not os.path.isdir(articles_path):
+        return 0
+
+    store = ArticleStore(results_path)
+
+    filenames = sorted(filename for filename in os.listdir(articles_path) if filename.endswith(".txt"))
+    for filename in filenames:
+        article_id = filename[:-len(".txt")]
+        if article_id in store:
+            continue
+        with open(os.path.join(articles_path, filename), 'r', encoding='utf-8') as file:
+            store.put(article_id, *split_text(file.read()))
+    store.close()
+
+    stored = ArticleStore(results_path)
+    for filename in filenames:
+        with open(os.path.join(articles_path, filename), 'r', encoding='utf-8') as file:
+            if stored.get(filename[:-len(".txt")]) != split_text(file.read()):
+                raise ValueError(f"{filename} couldn't be read back from {stored.data_path}")
+
+    if not keep:
+        for filename in filenames:
+            os.remove(os.path.join(articles_path, filename))
+        if not os.listdir(articles_path):
+            os.rmdir(articles_path)
+
+    return len(filenames)
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Move the articles/<id>.txt files of past searches to their article store (articles.pack and articles.idx).")
+    parser.add_argument("paths", type=str, nargs='+', help="Search directories (data/scrapes/<search>) with an articles/ directory")
+    parser.add_argument('--keep', action='store_true', help="Keep the articles/ directory after moving its articles")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if not os.path.isdir(os.path.join(path, "articles")):
+            print(f"No articles/ directory found in {path}. Skipping it.", file=sys.stderr)
+            continue
+
+        try:
+            migrated = migrate(path, args.keep)
+        except Exception as e:
+            print(f"Couldn't migrate {path}: {e}", file=sys.stderr)
+            continue
+
+        print(f"{migrated} articles moved to {data_path(path)}")
+
+if __name__ == "__main__":
+    main()
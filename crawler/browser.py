@@ -0,0 +1,66 @@
+from selenium.common.exceptions import WebDriverException
+
+from crawler import waits
+
+from config import BROWSER_BLOCKED_EXTENSIONS, BROWSER_BLOCKED_HOSTS
+
+class BrowserProfile:
+    # What the browser downloads for each journal. The driver only waits for the DOM (BROWSER_PAGE_LOAD_STRATEGY),
+    # and doesn't download the kinds of resources in the column blocked_resources of sources_elements.csv.
+    # Some journals need their scripts to render the comments: they block less, or wait for the full load (page_load=normal).
+
+    def __init__(self, crawler_instance):
+
+        # The crawler_instance has attributes driver, sources_elements and profile_applied
+        self.crawler = crawler_instance
+        self.waits = waits.Waits(self.crawler)
+
+    def setting(self, journal: str, column: str) -> str:
+
+        if column in self.crawler.sources_elements.columns and journal in self.crawler.sources_elements.index:
+            value = self.crawler.sources_elements.loc[journal, column]
+            if value == value and value != '-':  # not NaN
+                return str(value).strip()
+
+        return None
+
+    def blocked_urls(self, journal: str) -> list:
+        # URL patterns (with * wildcards) of the resources blocked for the journal
+
+        blocked = self.setting(journal, 'blocked_resources')
+        if blocked is None:
+            return []
+
+        urls = []
+        for kind in [kind.strip() for kind in blocked.split(',')]:
+            if kind == 'ads':
+                for host in BROWSER_BLOCKED_HOSTS:
+                    urls += [f"*://{host}/*", f"*.{host}/*"]
+            else:
+                for extension in BROWSER_BLOCKED_EXTENSIONS.get(kind, []):
+                    urls += [f"*.{extension}", f"*.{extension}?*"]
+
+        return urls
+
+    def apply(self, journal: str) -> None:
+        # The blocked URLs are set on the current window of the driver, so we set them again
+        # when the journal or the window changes
+
+        applied = (journal, self.crawler.driver.current_window_handle)
+        if self.crawler.profile_applied == applied:
+            return
+        # We only try once per journal and window
+        self.crawler.profile_applied = applied
+
+        try:
+            self.crawler.driver.execute_cdp_cmd('Network.enable', {})
+            self.crawler.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls(journal)})
+        except (WebDriverException, AttributeError) as e:
+            # e.g. a driver without the Chrome DevTools Protocol: every resource is downloaded
+            print(f"Couldn't apply the browser profile of {journal}: {e}")
+
+    def wait_page_load(self, journal: str) -> None:
+        # With the eager page load strategy, the journals that need the whole page wait until it's loaded
+
+        if self.setting(journal, 'page_load') == 'normal':
+            self.waits.until(journal, 'page_load', lambda driver: driver.execute_script("return document.readyState") == 'complete')
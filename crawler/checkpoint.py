@@ -0,0 +1,182 @@
+import os
+import json
+import threading
+import time as tme
+from datetime import datetime
+
+from config import CHECKPOINT_INTERVAL
+
+def checkpoint_path(results_path: str) -> str:
+    return os.path.join(results_path, "checkpoint.json")
+
+def encode(value):
+    # The interval and the dates of the candidates are datetimes: we keep them as datetimes
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f"Can't store {type(value)} in a checkpoint")
+
+def decode(value: dict):
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    return value
+
+class Checkpoint:
+    # Progress of a crawl, written to <results_path>/checkpoint.json at most every CHECKPOINT_INTERVAL seconds
+    # (and whenever a journal is done), so a crawl that stopped can be resumed instead of starting over.
+    # Per journal we keep:
+    #   - pages: the last page of results read for each search term (None once every page of the term was read)
+    #   - candidates: the articles collected from those pages (see scraper.Candidates.to_list)
+    #   - articles: the ids of the articles already got (with their journal), and comments: the ids of their comments
+    #     (with their article id). Their rows are already in the results files, as the output is flushed before every write.
+    #   - done: every article of the journal was got
+    # and the results files of the crawl, so a crawl resumed on another day keeps writing to the same files.
+    # Journals can be crawled in parallel threads, so every access goes through a lock.
+
+    def __init__(self, results_path: str, date_init: datetime, date_end: datetime, search_terms: list, sources: list):
+
+        self.filepath = checkpoint_path(results_path)
+        self.state = {'date_init': date_init,
+                      'date_end': date_end,
+                      'search_terms': search_terms,
+                      'sources': sources,
+                      'filepaths': None,
+                      'journals': {}}
+
+        # main_crawler.Output with the results files (set by the crawler)
+        self.output = None
+        self.resumed = False
+
+        self.lock = threading.Lock()
+        self.last_write = tme.time()
+
+    def resume(self) -> bool:
+        # We load the checkpoint if it's from the same search (search terms and sources). The crawl continues
+        # with the interval of the checkpoint, even if the one of the new run is different (e.g. date_end is now).
+
+        if not os.path.isfile(self.filepath):
+            print("No checkpoint found: starting the crawl from the beginning")
+            return False
+
+        with open(self.filepath, 'r', encoding='utf-8') as file:
+            state = json.load(file, object_hook=decode)
+
+        if state['search_terms'] != self.state['search_terms'] or state['sources'] != self.state['sources']:
+            print("The checkpoint is from a different search: starting the crawl from the beginning")
+            return False
+
+        self.state = state
+        self.resumed = True
+        done = [journal for journal, journal_state in state['journals'].items() if journal_state['done']]
+        print(f"Resuming the crawl from {self.filepath}: {len(self.article_ids())} articles already got, "
+              f"journals done: {', '.join(done) if done else 'none'}")
+
+        return True
+
+    @property
+    def date_init(self) -> datetime:
+        return self.state['date_init']
+
+    @property
+    def date_end(self) -> datetime:
+        return self.state['date_end']
+
+    @property
+    def filepaths(self) -> tuple:
+        # (articles, comments) results files of the stopped crawl, without the extension, or None
+        filepaths = self.state.get('filepaths')
+        return tuple(filepaths) if filepaths else None
+
+    def journal(self, journal: str) -> dict:
+        return self.state['journals'].setdefault(journal, {'pages': {}, 'candidates': [], 'articles': {}, 'comments': {}, 'done': False})
+
+    def due(self) -> bool:
+        # The progress is only copied to the checkpoint when it's going to be written
+        return tme.time() - self.last_write >= CHECKPOINT_INTERVAL
+
+    def write(self) -> None:
+        # We write to a temporary file and rename it, so a crash while writing doesn't lose the previous checkpoint
+
+        if self.output is not None:
+            self.output.flush()
+
+        with self.lock:
+            if self.output is not None:
+                self.state['filepaths'] = [self.output.filepath, self.output.comments_filepath]
+
+            tmp_path = f"{self.filepath}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.state, file, default=encode, ensure_ascii=False)
+            os.replace(tmp_path, self.filepath)
+
+            self.last_write = tme.time()
+
+    def remove(self) -> None:
+        # The results were stored: there is nothing to resume anymore
+        if os.path.isfile(self.filepath):
+            os.remove(self.filepath)
+
+    # -- Results of the search terms --
+    def page_done(self, journal: str, term: str, page: int, candidates: list, force: bool = False) -> None:
+        # page is None once every page of the term was read
+
+        if not force and not self.due():
+            return
+
+        with self.lock:
+            state = self.journal(journal)
+            state['pages'][term] = page
+            state['candidates'] = candidates
+        self.write()
+
+    def term_done(self, journal: str, term: str, candidates: list) -> None:
+        self.page_done(journal, term, None, candidates, force=True)
+
+    def is_term_done(self, journal: str, term: str) -> bool:
+        with self.lock:
+            pages = self.journal(journal)['pages']
+            return term in pages and pages[term] is None
+
+    def last_page(self, journal: str, term: str) -> int:
+        # The last page of results of the term already read, or None
+        with self.lock:
+            return self.journal(journal)['pages'].get(term)
+
+    def candidates(self, journal: str) -> list:
+        with self.lock:
+            return self.journal(journal)['candidates']
+
+    # -- Results --
+    def save_rows(self, journal: str, articles: dict, comments: dict, done: bool = False) -> None:
+        # They are copied, as the journal keeps adding to them while other journals write the checkpoint
+
+        if not done and not self.due():
+            return
+
+        with self.lock:
+            state = self.journal(journal)
+            state['articles'] = dict(articles)
+            state['comments'] = dict(comments)
+            if done:
+                state['candidates'] = []
+                state['done'] = True
+        self.write()
+
+    def journal_done(self, journal: str, articles: dict, comments: dict) -> None:
+        self.save_rows(journal, articles, comments, done=True)
+
+    def is_journal_done(self, journal: str) -> bool:
+        with self.lock:
+            return self.journal(journal)['done']
+
+    def rows(self, journal: str) -> tuple:
+        with self.lock:
+            state = self.journal(journal)
+            return dict(state['articles']), dict(state['comments'])
+
+    def article_ids(self) -> list:
+        with self.lock:
+            return [article_id for journal in self.state['journals'].values() for article_id in journal['articles']]
+
+    def comment_ids(self) -> list:
+        with self.lock:
+            return [comment_id for journal in self.state['journals'].values() for comment_id in journal['comments']]
@@ -0,0 +1,151 @@
+import bisect
+import itertools
+import threading
+import time as tme
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+from crawler import http_client
+
+from config import HTTP_CONCURRENCY, FRONTIER_PRIORITIES, FRONTIER_DOMAIN_CONCURRENCY, FRONTIER_DOMAIN_RATE, FRONTIER_DOMAIN_LIMITS
+
+def domain(url: str) -> str:
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+class FetchTask:
+    # A static page to fetch. The kind of page ('listing', 'article' or 'comments') defines its priority.
+
+    def __init__(self, url: str, kind: str, order: int):
+
+        self.url = url
+        self.kind = kind
+        self.domain = domain(url)
+        self.priority = FRONTIER_PRIORITIES.get(kind, max(FRONTIER_PRIORITIES.values()) + 1)
+        # Tasks with the same priority are dispatched in the order they were submitted
+        self.order = order
+        self.submitted_at = tme.time()
+        self.future = Future()
+
+    def __lt__(self, other) -> bool:
+        return (self.priority, self.order) < (other.priority, other.order)
+
+class Frontier:
+    # Every static page of the crawl goes through a single queue, served by a pool of workers.
+    # Tasks are dispatched by priority (result lists first, as they lead to more pages), and each domain
+    # has a maximum number of pages fetched at the same time and of requests per second.
+    # Scrapers of several journals share the workers, so every domain is kept busy within its limits.
+
+    def __init__(self, workers: int = HTTP_CONCURRENCY):
+
+        self.client = http_client.get_client()
+
+        self.queue = []
+        self.order = itertools.count()
+        # Per domain: pages being fetched, time of its next allowed request and statistics
+        self.domains = {}
+        self.condition = threading.Condition()
+
+        for _ in range(workers):
+            threading.Thread(target=self.work, daemon=True).start()
+
+    def limits(self, domain: str) -> tuple:
+        # (concurrency, requests per second) of the domain
+        return FRONTIER_DOMAIN_LIMITS.get(domain, (FRONTIER_DOMAIN_CONCURRENCY, FRONTIER_DOMAIN_RATE))
+
+    def domain_state(self, domain: str) -> dict:
+        return self.domains.setdefault(domain, {'active': 0, 'next_time': 0.0, 'fetched': 0, 'queue_time': 0.0, 'fetch_time': 0.0})
+
+    def submit(self, url: str, kind: str) -> Future:
+
+        task = FetchTask(url, kind, next(self.order))
+
+        with self.condition:
+            bisect.insort(self.queue, task)
+            self.condition.notify()
+
+        return task.future
+
+    def next_task(self) -> FetchTask:
+        # We take the first task of the queue whose domain is under its limits, waiting if there is none
+
+        with self.condition:
+            while True:
+                now = tme.time()
+                wait = None
+
+                for i, task in enumerate(self.queue):
+                    state = self.domain_state(task.domain)
+                    concurrency, rate = self.limits(task.domain)
+                    if state['active'] >= concurrency:
+                        continue
+                    if state['next_time'] > now:
+                        # We wake up when the domain can be requested again
+                        wait = min(wait, state['next_time'] - now) if wait else state['next_time'] - now
+                        continue
+
+                    del self.queue[i]
+                    state['active'] += 1
+                    state['next_time'] = now + 1 / rate
+                    state['queue_time'] += now - task.submitted_at
+                    return task
+
+                self.condition.wait(timeout=wait)
+
+    def work(self) -> None:
+
+        while True:
+            task = self.next_task()
+
+            start_time = tme.time()
+            try:
+                task.future.set_result(self.client.get_text(task.url, task.kind))
+            except Exception as e:
+                task.future.set_exception(e)
+
+            with self.condition:
+                state = self.domain_state(task.domain)
+                state['active'] -= 1
+                state['fetched'] += 1
+                state['fetch_time'] += tme.time() - start_time
+                self.condition.notify_all()
+
+    def fetch(self, url: str, kind: str = None) -> str:
+        return self.fetch_all([url], kind)[0]
+
+    def fetch_all(self, urls: list, kind: str = None) -> list:
+        # We return the text of the pages, in the same order as urls. Pages that couldn't be accessed are None.
+        # Pages still fresh in the page cache are returned right away, without taking a turn in the queue.
+
+        texts = [self.client.fresh_text(url, kind) for url in urls]
+        futures = {i: self.submit(url, kind) for i, url in enumerate(urls) if texts[i] is None}
+
+        for i, future in futures.items():
+            texts[i] = future.result()
+
+        return texts
+
+    def summary(self) -> list:
+
+        lines = []
+        with self.condition:
+            for domain, state in sorted(self.domains.items()):
+                if state['fetched']:
+                    lines.append(f"{domain}: {state['fetched']} pages, average {state['queue_time'] / state['fetched']:.2f}s in the queue "
+                                 f"and {state['fetch_time'] / state['fetched']:.2f}s fetching")
+
+        return lines
+
+# We use a single frontier in the process, so the limits of each domain are shared by every scraper
+FRONTIER = None
+FRONTIER_LOCK = threading.Lock()
+
+def get_frontier() -> Frontier:
+
+    global FRONTIER
+
+    with FRONTIER_LOCK:
+        if FRONTIER is None:
+            FRONTIER = Frontier()
+
+        return FRONTIER
@@ -0,0 +1,127 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from crawler import page_cache
+
+from config import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, PAGE_CACHE_ENABLED
+
+# urllib3 only decodes brotli responses if a brotli package is installed, so we only ask for them in that case
+try:
+    import brotli
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+class HttpClient:
+    # Shared HTTP client for the static pages. Connections are kept alive and reused in a pool per host,
+    # so we don't pay a new TCP and TLS handshake for every article.
+    # The pages of the crawl are fetched from several threads through crawler.frontier.Frontier.
+
+    def __init__(self,
+                 pool_size: int = HTTP_POOL_SIZE,
+                 timeout: tuple = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 retries: int = HTTP_RETRIES):
+
+        self.timeout = timeout
+
+        # We retry connection errors and temporary server errors, waiting a bit longer each time
+        retry = Retry(total=retries,
+                      backoff_factor=0.5,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET', 'HEAD'])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': ACCEPT_ENCODING,
+                                     'Connection': 'keep-alive'})
+
+    def get(self, url: str, headers: dict = None) -> requests.Response:
+        # We return the response, or None if the page couldn't be accessed
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            print(f"Cannot access {url} right now. Please try again later.")
+            return None
+
+        return response
+
+    def fresh_text(self, url: str, kind: str = None) -> str:
+        # The page from the page cache if it can be used without asking the server, or None.
+        # The frontier uses it to return those pages without queueing them.
+
+        if kind is None or not PAGE_CACHE_ENABLED:
+            return None
+
+        cache = page_cache.get_page_cache()
+        page = cache.get(url)
+
+        if page and cache.is_fresh(page, kind):
+            cache.count('hits')
+            return page['text']
+
+        return None
+
+    def get_text(self, url: str, kind: str = None) -> str:
+        # If we know the kind of page ('listing', 'comments' or 'article'), we go through the page cache.
+        # We return None if the page couldn't be got (e.g. an error page), so the router can fall back to Selenium.
+
+        if kind is None or not PAGE_CACHE_ENABLED:
+            response = self.get(url)
+            return response.text if response is not None and response.status_code == 200 else None
+
+        cache = page_cache.get_page_cache()
+        page = cache.get(url)
+
+        if page and cache.is_fresh(page, kind):
+            cache.count('hits')
+            return page['text']
+
+        # If we have an older version of the page, we ask the server to send it only if it changed
+        headers = {}
+        if page and page['etag']:
+            headers['If-None-Match'] = page['etag']
+        if page and page['last_modified']:
+            headers['If-Modified-Since'] = page['last_modified']
+
+        response = self.get(url, headers)
+
+        if response is None:
+            # If the server can't be reached, an older version is better than nothing
+            return page['text'] if page else None
+
+        if response.status_code == 304 and page:
+            cache.touch(url)
+            cache.count('revalidated')
+            return page['text']
+
+        cache.count('misses')
+        if response.status_code != 200:
+            return None
+
+        cache.put(url, kind, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+        return response.text
+
+# We use a single client in the process, so every scraper shares the same connection pool
+CLIENT = None
+CLIENT_LOCK = threading.Lock()
+
+def get_client() -> HttpClient:
+
+    global CLIENT
+
+    with CLIENT_LOCK:
+        if CLIENT is None:
+            CLIENT = HttpClient()
+
+        return CLIENT
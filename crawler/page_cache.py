@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import zlib
+import time as tme
+from contextlib import closing
+
+from config import PAGE_CACHE_PATH, PAGE_CACHE_MAX_MB, PAGE_CACHE_TTL
+
+# We check the size of the cache every EVICT_EVERY stored pages
+EVICT_EVERY = 50
+
+class PageCache:
+    # Pages we already fetched, keyed by url, with their body compressed and their ETag / Last-Modified headers.
+    # Each page has a kind ('listing', 'comments', 'article') that defines how long it's used without asking the server again.
+
+    def __init__(self, path: str = PAGE_CACHE_PATH, max_mb: float = PAGE_CACHE_MAX_MB, ttl: dict = PAGE_CACHE_TTL):
+
+        self.path = path
+        self.max_bytes = max_mb * 1024 * 1024
+        self.ttl = ttl
+
+        # Counters of the current crawl. The scrapers can fetch pages from several threads.
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self.stored_since_eviction = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.create_table()
+
+    def connect(self) -> sqlite3.Connection:
+        # A new connection for every operation, so the cache can be used from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create_table(self) -> None:
+
+        with closing(self.connect()) as connection, connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+
+    def count(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get(self, url: str) -> dict:
+        # We return the stored page, or None if we don't have it
+
+        with closing(self.connect()) as connection, connection:
+            row = connection.execute("SELECT kind, body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE pages SET last_used = ? WHERE url = ?", (tme.time(), url))
+
+        kind, body, etag, last_modified, fetched_at = row
+
+        return {'kind': kind,
+                'text': zlib.decompress(body).decode('utf-8'),
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': fetched_at}
+
+    def is_fresh(self, page: dict, kind: str) -> bool:
+        # The page can be used without asking the server if it's younger than the TTL of its kind
+        return tme.time() - page['fetched_at'] < self.ttl[kind]
+
+    def put(self, url: str, kind: str, text: str, etag: str = None, last_modified: str = None) -> None:
+
+        body = zlib.compress(text.encode('utf-8'))
+        now = tme.time()
+
+        with closing(self.connect()) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               (url, kind, body, len(body), etag, last_modified, now, now))
+
+        self.count('stored')
+
+        with self.lock:
+            self.stored_since_eviction += 1
+            evict = self.stored_since_eviction >= EVICT_EVERY
+            if evict:
+                self.stored_since_eviction = 0
+        if evict:
+            self.evict()
+
+    def touch(self, url: str) -> None:
+        # The server confirmed (304 Not Modified) that the stored page is still valid
+        with closing(self.connect()) as connection, connection:
+            connection.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (tme.time(), url))
+
+    def evict(self) -> None:
+        # We delete the least recently used pages until the cache is under its size bound
+
+        with closing(self.connect()) as connection, connection:
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            to_delete = []
+            for url, size in connection.execute("SELECT url, size FROM pages ORDER BY last_used ASC"):
+                if total <= self.max_bytes:
+                    break
+                to_delete.append((url,))
+                total -= size
+
+            connection.executemany("DELETE FROM pages WHERE url = ?", to_delete)
+
+        with self.lock:
+            self.stats['evicted'] += len(to_delete)
+
+    def summary(self) -> dict:
+
+        self.evict()
+
+        with closing(self.connect()) as connection:
+            pages, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+
+        with self.lock:
+            return dict(self.stats, pages=pages, size_mb=size / (1024 * 1024))
+
+# We use a single cache in the process, shared by every scraper
+CACHE = None
+CACHE_LOCK = threading.Lock()
+
+def get_page_cache() -> PageCache:
+
+    global CACHE
+
+    with CACHE_LOCK:
+        if CACHE is None:
+            CACHE = PageCache()
+
+        return CACHE
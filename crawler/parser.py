@@ -19,19 +19,46 @@ from crawler import utils
 
 class Parser:
 
+    # Each article in the list of results
+    ARTICLES_LOCS = {
+        'altaveu': ('div', "c-news-list__wrapper"),
+        'periodic': ('li', re.compile("item article article_llistat.*")),
+        'bondia': ('div', "flex flex-col gap-1"),
+        'forum': ('article', re.compile("^entry author-.* post-.*")),
+        'ara': ('article', "ara-card ara-card--article"),
+        'diari': ('article', "c-article c-article--lateral size-12")
+    }
+
+    # Elements of the pages read by the parser, as (tag, attributes). crawler.parsing only builds these subtrees of the page.
+    # Listing pages: the list of results (all_articles, next_all_articles)
+    LISTING_CONTAINERS = {
+        'altaveu': [('div', {'class': "c-news-list__wrapper"})],
+        'periodic': [('li', {'class': re.compile("item article article_llistat.*")})],
+        'bondia': [('section', {'class': "col-span-12"})],
+        'forum': [('article', {'class': re.compile("^entry author-.* post-.*")})],
+        'ara': [('article', {'class': "ara-card ara-card--article"}), ('div', {'class': "next-page"})],
+        'diari': [('article', {'class': "c-article c-article--lateral size-12"})]
+    }
+    # Article pages: the content, the subtitle, the datetime when it's only inside the article, and the static comments
+    ARTICLE_CONTAINERS = {
+        'altaveu': [('div', {'class': "c-mainarticle__opening"}), ('div', {'class': "c-mainarticle__body"}),
+                    ('h2', {'class': "c-mainarticle__subtitle"}), ('time', {'class': "c-mainarticle__time"})],
+        'periodic': [('div', {'class': "noticia-main__content"}), ('h2', {'class': "noticia-header__subtitle"})],
+        'bondia': [('div', {'class': "article-body my-5 text-lg"}), ('p', {'class': "text-2xl"}), ('div', {'class': "col-span-4 pt-2"})],
+        'forum': [('div', {'class': "entry-the-content"})],
+        'ara': [('div', {'class': "ara-body"}), ('h2', {'class': "subtitle"}), ('meta', {'property': "article:modified_time"})],
+        'diari': [('div', {'class': "c-detail__body"}), ('p', {'class': "c-detail__subtitle"}), ('meta', {'property': "article:modified_time"})]
+    }
+
+    # Journals whose articles only have their datetime inside the article (see get_datetime)
+    DATETIME_IN_ARTICLE = ['altaveu', 'ara']
+
     def __init__(self):
         return None
 
     def all_articles(self, journal: str, soup: BeautifulSoup) -> list:
 
-        locs = {
-            'altaveu': ('div', "c-news-list__wrapper"),
-            'periodic': ('li', re.compile("item article article_llistat.*")),
-            'bondia': ('div', "flex flex-col gap-1"),
-            'forum': ('article', re.compile("^entry author-.* post-.*")),
-            'ara': ('article', "ara-card ara-card--article"),
-            'diari': ('article', "c-article c-article--lateral size-12")
-        }
+        locs = self.ARTICLES_LOCS
 
         if journal == 'bondia':
             soup = soup.find('section', class_="col-span-12")
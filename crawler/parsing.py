@@ -0,0 +1,174 @@
+import re
+import threading
+import time as tme
+
+from bs4 import BeautifulSoup
+
+from crawler import parser
+
+from config import PARSER_ENGINE, PARSER_STRAIN
+
+# BeautifulSoup >= 4.13 lets us decide which tags are built while parsing (see ContainerFilter)
+try:
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+try:
+    import lxml
+    TREE_BUILDER = 'lxml'
+except ImportError:
+    TREE_BUILDER = 'html.parser'
+
+# selectolax is optional
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+def define_engine(engine: str) -> str:
+    # We return the engine to use, falling back to lxml and then html.parser if it isn't installed
+
+    if engine == 'selectolax' and SelectolaxParser is None:
+        print("selectolax is not installed, the pages are parsed with lxml")
+        engine = 'lxml'
+    if engine == 'lxml' and TREE_BUILDER != 'lxml':
+        print("lxml is not installed, the pages are parsed with html.parser")
+        engine = 'html.parser'
+
+    return engine
+
+ENGINE = define_engine(PARSER_ENGINE)
+# BeautifulSoup tree builder: with selectolax, the containers found are built with lxml (or html.parser)
+BUILDER = TREE_BUILDER if ENGINE == 'selectolax' else ENGINE
+
+def define_containers(journal: str, kind: str) -> list:
+    # The containers of the page read by the parser, or None if we need the whole page.
+    # 'comments' pages are article pages fetched again more often (see StaticMethods.article_kind)
+
+    if journal is None:
+        return None
+
+    match kind:
+        case 'listing':
+            return parser.Parser.LISTING_CONTAINERS.get(journal)
+        case 'article' | 'comments':
+            return parser.Parser.ARTICLE_CONTAINERS.get(journal)
+
+    return None
+
+def match_value(expected, value) -> bool:
+    # Same rule as BeautifulSoup's find(..., class_=expected): the whole value or any of its words matches
+
+    if value is None:
+        return False
+    if isinstance(value, list):
+        value = " ".join(value)
+
+    values = [value] + value.split()
+    if isinstance(expected, re.Pattern):
+        return any(expected.search(v) for v in values)
+
+    return expected in values
+
+def is_container(containers: list, name: str, attrs: dict) -> bool:
+    return any(name == tag and all(match_value(value, attrs.get(key)) for key, value in tag_attrs.items())
+               for tag, tag_attrs in containers)
+
+if ElementFilter is not None:
+
+    class ContainerFilter(ElementFilter):
+        # While parsing, we only build the containers and everything inside them
+
+        def __init__(self, containers: list):
+            super().__init__()
+            self.containers = containers
+
+        def allow_tag_creation(self, nsprefix, name: str, attrs: dict) -> bool:
+            return is_container(self.containers, name, attrs or {})
+
+        def allow_string_creation(self, string: str) -> bool:
+            # Only called for the text outside the containers
+            return False
+
+def containers_html(text: str, containers: list) -> str:
+    # With selectolax: the HTML of the containers, in the order of the page.
+    # A container inside another one is already included in it.
+
+    tree = SelectolaxParser(text)
+    selectors = ", ".join(sorted({tag for tag, _ in containers}))
+
+    selected = set()
+    html = []
+    for node in tree.css(selectors):
+        if not is_container(containers, node.tag, node.attributes):
+            continue
+        parent = node.parent
+        while parent is not None and parent.mem_id not in selected:
+            parent = parent.parent
+        if parent is None:
+            selected.add(node.mem_id)
+            html.append(node.html)
+
+    return "".join(html)
+
+def has_containers(soup: BeautifulSoup, journal: str, kind: str) -> bool:
+    # The page has at least one of the containers read by the parser
+    # (e.g. a page fetched without JavaScript can be an empty shell, or an advertisement)
+
+    containers = define_containers(journal, kind)
+    if not containers:
+        return True
+
+    return any(soup.find(tag, attrs=attrs) for tag, attrs in containers)
+
+class ParseStats:
+    # Time spent parsing each page, grouped by journal and kind of page.
+    # Journals can be crawled in parallel threads, so every access goes through a lock.
+
+    def __init__(self):
+
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def record(self, journal: str, kind: str, seconds: float, size: int) -> None:
+
+        with self.lock:
+            durations, sizes = self.pages.setdefault((journal or '-', kind or 'page'), ([], []))
+            durations.append(seconds)
+            sizes.append(size)
+
+    def summary(self) -> list:
+
+        lines = []
+        with self.lock:
+            for (journal, kind), (durations, sizes) in sorted(self.pages.items()):
+                lines.append(f"{journal} - {kind}: {len(durations)} pages, {sum(durations):.1f}s in total, "
+                             f"average {1000 * sum(durations) / len(durations):.0f}ms per page "
+                             f"({sum(sizes) / len(sizes) / 1024:.0f} kB), maximum {1000 * max(durations):.0f}ms")
+
+        return lines
+
+def make_soup(text: str, journal: str = None, kind: str = None, stats: ParseStats = None, strain: bool = True) -> BeautifulSoup:
+    # We parse the page with the configured engine. If we know the journal and the kind of page,
+    # only the containers read by the parser are built, instead of the whole page.
+    # strain=False builds the whole page (e.g. comments read with the relations between them).
+
+    start_time = tme.time()
+
+    containers = define_containers(journal, kind) if strain and PARSER_STRAIN else None
+
+    if containers and ENGINE == 'selectolax':
+        soup = BeautifulSoup(containers_html(text, containers), BUILDER)
+    elif containers and ElementFilter is not None:
+        soup = BeautifulSoup(text, BUILDER, parse_only=ContainerFilter(containers))
+    else:
+        soup = BeautifulSoup(text, BUILDER)
+
+    if stats is not None:
+        stats.record(journal, kind, tme.time() - start_time, len(text))
+
+    return soup
@@ -0,0 +1,161 @@
+import threading
+import time as tme
+from datetime import datetime
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from crawler import parsing
+
+from config import ROUTER_STATIC_ATTEMPTS
+
+def route(sources_elements: pd.DataFrame, journal: str, kind: str) -> str:
+    # 'static' (plain HTTP) or 'dynamic' (Selenium): how we fetch the pages of this kind ('listing', 'article' or 'comments')
+    # for the journal, from the column fetch_<kind> of sources_elements.csv.
+    # None if the journal doesn't have this kind of page (e.g. no comments).
+
+    column = f"fetch_{kind}"
+    if column in sources_elements.columns and journal in sources_elements.index:
+        value = sources_elements.loc[journal, column]
+        if value in ('static', 'dynamic'):
+            return value
+        if value == '-':
+            return None
+
+    # Without the column, we use plain HTTP if the source is static
+    if 'static' in sources_elements.columns and journal in sources_elements.index and sources_elements.loc[journal, 'static'] == 'yes':
+        return 'static'
+
+    return 'dynamic'
+
+class FetchStats:
+    # Path taken by every page of a crawl (static or dynamic) and how long it took, grouped by journal and kind of page.
+    # Journals can be crawled in parallel threads, so every access goes through a lock.
+
+    def __init__(self):
+
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def new_entry(self) -> dict:
+        return {'static': [], 'dynamic': [], 'static_usable': 0, 'static_unusable': 0, 'fallbacks': 0, 'failed': 0}
+
+    def record(self, journal: str, kind: str, path: str, seconds: float, usable: bool) -> None:
+
+        with self.lock:
+            entry = self.pages.setdefault((journal, kind), self.new_entry())
+            entry[path].append(seconds)
+            if path == 'static':
+                entry['static_usable' if usable else 'static_unusable'] += 1
+            elif not usable:
+                entry['failed'] += 1
+
+    def fallback(self, journal: str, kind: str) -> None:
+
+        with self.lock:
+            self.pages.setdefault((journal, kind), self.new_entry())['fallbacks'] += 1
+
+    def static_unusable(self, journal: str, kind: str) -> bool:
+        # Plain HTTP never gave a usable page of this kind after ROUTER_STATIC_ATTEMPTS tries
+
+        with self.lock:
+            entry = self.pages.get((journal, kind))
+            return entry is not None and entry['static_usable'] == 0 and entry['static_unusable'] >= ROUTER_STATIC_ATTEMPTS
+
+    def summary(self) -> list:
+
+        lines = []
+        with self.lock:
+            for (journal, kind), entry in sorted(self.pages.items()):
+                line = f"{journal} - {kind}:"
+                for path in ['static', 'dynamic']:
+                    durations = entry[path]
+                    if durations:
+                        line = line + f" {len(durations)} {path} ({sum(durations):.1f}s in total, average {sum(durations) / len(durations):.2f}s),"
+                line = line + f" {entry['fallbacks']} fell back to the browser, {entry['failed']} failed"
+                lines.append(line)
+
+        return lines
+
+class Router:
+    # Each kind of page is fetched with plain HTTP when the journal serves it statically (column fetch_<kind>
+    # of sources_elements.csv), and with the browser only when it needs JavaScript.
+    # If a static page doesn't have what the parser reads, we open it with the browser instead.
+
+    def __init__(self, crawler_instance, static_methods_instance, dynamic_methods_instance):
+
+        # The crawler_instance has attributes sources_elements and fetch_stats
+        self.crawler = crawler_instance
+        self.static_methods = static_methods_instance
+        self.dynamic_methods = dynamic_methods_instance
+
+    def path(self, journal: str, kind: str) -> str:
+
+        path = route(self.crawler.sources_elements, journal, kind)
+
+        # If plain HTTP never worked for this kind of page, we stop trying it for the rest of the crawl
+        if path == 'static' and self.can_fall_back(journal) and self.crawler.fetch_stats.static_unusable(journal, kind):
+            return 'dynamic'
+
+        return path
+
+    def can_fall_back(self, journal: str) -> bool:
+        # Only the sources marked as dynamic can be opened with the browser
+        return 'dynamic' in self.crawler.sources_elements.columns and self.crawler.sources_elements.loc[journal, 'dynamic'] == 'yes'
+
+    def page_kind(self, journal: str, kind: str) -> str:
+        # Kind of page for the page cache and the parser: article pages with the comments inside are fetched again more often
+        return self.static_methods.article_kind(journal) if kind == 'article' else kind
+
+    def get_soup(self, journal: str, url: str, kind: str) -> BeautifulSoup:
+        # We return the soup of the page, or False if it couldn't be accessed
+
+        if self.path(journal, kind) == 'static':
+
+            start_time = tme.time()
+            soup = self.static_methods.get_soup(url, self.page_kind(journal, kind), journal)
+            usable = bool(soup) and parsing.has_containers(soup, journal, kind)
+            self.crawler.fetch_stats.record(journal, kind, 'static', tme.time() - start_time, usable)
+
+            if usable or not self.can_fall_back(journal):
+                return soup
+
+            self.crawler.fetch_stats.fallback(journal, kind)
+
+        return self.get_soup_dynamic(journal, url, kind)
+
+    def get_soup_dynamic(self, journal: str, url: str, kind: str) -> BeautifulSoup:
+
+        start_time = tme.time()
+        soup = self.dynamic_methods.get_soup(journal, url, self.page_kind(journal, kind))
+        self.crawler.fetch_stats.record(journal, kind, 'dynamic', tme.time() - start_time, bool(soup))
+
+        return soup if soup else False
+
+    def get_soups(self, journal: str, urls: list, kind: str) -> dict:
+        # We return a dictionary {url: soup}. Static pages are fetched at the same time,
+        # and each one costs its share of the time of the whole batch.
+
+        if not urls:
+            return {}
+
+        if self.path(journal, kind) != 'static':
+            return {url: self.get_soup_dynamic(journal, url, kind) for url in urls}
+
+        start_time = tme.time()
+        soups = self.static_methods.get_soups(urls, self.page_kind(journal, kind), journal)
+        seconds = (tme.time() - start_time) / len(urls)
+
+        for url, soup in soups.items():
+            usable = bool(soup) and parsing.has_containers(soup, journal, kind)
+            self.crawler.fetch_stats.record(journal, kind, 'static', seconds, usable)
+
+            if not usable and self.can_fall_back(journal):
+                self.crawler.fetch_stats.fallback(journal, kind)
+                soups[url] = self.get_soup_dynamic(journal, url, kind)
+
+        return soups
+
+    def get_soups_in_interval(self, journal: str, articles: list, date_init: datetime, date_end: datetime) -> dict:
+        # The articles of the list that are inside the interval and haven't been saved yet (see StaticMethods.links_in_interval)
+        return self.get_soups(journal, self.static_methods.links_in_interval(journal, articles, date_init, date_end), 'article')
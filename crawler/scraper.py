@@ -3,20 +3,25 @@ import time as tme
 import traceback
 import sys
 
-import requests
 from bs4 import BeautifulSoup
 
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.webdriver.support.ui import WebDriverWait
 
 from datetime import datetime
 
 from crawler import utils
 from crawler import parser
+from crawler import waits
+from crawler import browser
+from crawler import frontier
+from crawler import page_cache
+from crawler import parsing
+from crawler import routing
+
+from config import PAGE_CACHE_ENABLED, ARTICLE_INDEX_REUSE_COMMENTS, PAGE_SEEK_ENABLED, PAGE_SEEK_MAX_PAGE, FRONTIER_DOMAIN_CONCURRENCY
 
 class AddArticle:
 
@@ -34,6 +39,17 @@ class AddArticle:
     def define_article_id(self, journal: str, date_article: datetime):
         return f"{journal[:2].upper()}{date_article.strftime("%Y%m%d%H%M%S")}"
     
+    def should_fetch(self, link: str) -> bool:
+        # We don't open the article while collecting the results of the search terms (it will be opened once afterwards),
+        # nor if a past search already stored it
+        return self.crawler.candidates is None and not self.indexed_article(link)
+
+    def indexed_article(self, link: str) -> dict:
+        # If the article was already stored by a past search, we return its entry in the article index
+        if self.crawler.article_index is None:
+            return None
+        return self.crawler.article_index.get(link)
+
     def add_article_to_dict(self,
                             journal: str,
                             article,
@@ -48,63 +64,164 @@ class AddArticle:
         # get all the attributes we want, all the comments in the article (if there are any) and append all of
         # the information to the dictionary.
 
-        if soup:
+        # The title and the category are in the element of the list of results
+        title = self.parser.get_title(journal, article)
+        category = self.parser.get_category(journal, article, soup)
+
+        # While we look through the results of every search term, we only collect the articles (see Scraper.scrape)
+        if self.crawler.candidates is not None:
+            # If the page was already fetched (e.g. for its date), we only keep the text the second phase needs,
+            # unless the comments are also read from the page
+            text = None
+            if soup and routing.route(self.crawler.sources_elements, journal, 'comments') != 'static':
+                text = (self.parser.get_subtitle(journal, soup), self.parser.get_content(journal, soup))
+                soup = None
+            self.crawler.candidates.add(journal, article_id, date_article, link, title, category, soup, text, term)
+            return dict_articles, dict_comments
+
+        return self.add_candidate_to_dict(journal, title, category, article_id, date_article, link, soup, term, dict_articles, dict_comments)
+
+    def add_candidate_to_dict(self,
+                              journal: str,
+                              title: str,
+                              category: str,
+                              article_id: str,
+                              date_article: datetime,
+                              link: str,
+                              soup: BeautifulSoup,
+                              term: str,
+                              dict_articles: dict,
+                              dict_comments: dict,
+                              text: tuple = None):
+        # Same as add_article_to_dict(...), with the attributes already taken from the list of results.
+        # text is the (subtitle, content) of the article if they were read before (see Candidates).
+
+        # If a past search already stored the article, we reuse it instead of reading the page
+        indexed = self.indexed_article(link)
+        if indexed:
+            return self.add_indexed_article_to_dict(journal, indexed, article_id, date_article, link, term, dict_articles, dict_comments)
+
+        if soup or text:
 
-            # We get all the attributes we don't already have
-            title = self.parser.get_title(journal, article)
-            category = self.parser.get_category(journal, article, soup)
             type_article = utils.category_type(category)
 
             utils.prints('article', date_article=date_article, title=title)
 
             # We get the content in the article
-            content = self.parser.get_content(journal, soup)
-            subtitle = self.parser.get_subtitle(journal, soup)
+            if text:
+                subtitle, content = text
+            else:
+                content = self.parser.get_content(journal, soup)
+                subtitle = self.parser.get_subtitle(journal, soup)
             self.crawler.output.store_article(article_id, title, subtitle, content)
 
             # We get all the comments in the article with the get_comments(...) function. If there are none,
             # get_comments(...) will return an empty list.
             comments = self.comments.get_comments(journal, link, soup)
-            len_comments = len(comments)
-            utils.prints('comments', len_comments=len_comments, date_article=date_article)
-
-            # We add a line with all the comment information blank. If there are no comments, the article will only
-            # have this line, and if there are comments, we'll have a line that only defines the article.
-            dict_articles[article_id] = [self.crawler.NOW,
-                                        journal,
-                                        term,
-                                        date_article,
-                                        category,
-                                        type_article,
-                                        title,
-                                        link,
-                                        len_comments]
-            
-            self.crawler.saved_articles.add(article_id)
-
-            # We loop through the list (if it's not empty) and add a new element to the article for each comment,
-            # with the comment information at the end.
-            for comment in comments:
-                comment_id = f"{article_id}-{str(comment[0])}"
-                if not comment_id in self.crawler.saved_comments:
-                    dict_comments[comment_id] = [article_id,
-                                                comment[1],
-                                                comment[2],
-                                                comment[3],
-                                                comment[4],
-                                                comment[5],
-                                                comment[6],
-                                                comment[7]]
-                    self.crawler.saved_comments.add(comment_id)
+
+            self.save_article(journal, article_id, date_article, category, type_article, title, link, term, comments, dict_articles, dict_comments)
 
         return dict_articles, dict_comments
 
+    def add_indexed_article_to_dict(self,
+                                    journal: str,
+                                    indexed: dict,
+                                    article_id: str,
+                                    date_article: datetime,
+                                    link: str,
+                                    term: str,
+                                    dict_articles: dict,
+                                    dict_comments: dict):
+        # We copy the stored title, subtitle and content to the current search, and take the category from the index
+
+        title, subtitle, content = self.crawler.article_index.read_content(indexed)
+        utils.prints('article', date_article=date_article, title=title)
+        self.crawler.output.store_article(article_id, title, subtitle, content)
+
+        comments = None
+        if ARTICLE_INDEX_REUSE_COMMENTS:
+            stored_comments = self.crawler.article_index.read_comments(indexed)
+            if stored_comments is not None:
+                # Same format as get_comments(...): the comment's number in the article, then its attributes
+                comments = [[comment_id.split('-', 1)[1]] + attributes[1:] for comment_id, attributes in stored_comments]
+
+        if comments is None:
+            # The comments can change after the article is published, so we read them again
+            soup = None
+            if routing.route(self.crawler.sources_elements, journal, 'comments') == 'static':
+                soup = StaticMethods(self.crawler).get_soup(link, 'comments', journal)
+            comments = self.comments.get_comments(journal, link, soup) if soup is not False else []
+
+        self.save_article(journal, article_id, date_article, indexed['category'], indexed['type'], title, link, term, comments, dict_articles, dict_comments)
+
+        return dict_articles, dict_comments
+
+    def save_article(self,
+                     journal: str,
+                     article_id: str,
+                     date_article: datetime,
+                     category: str,
+                     type_article: str,
+                     title: str,
+                     link: str,
+                     term: str,
+                     comments: list,
+                     dict_articles: dict,
+                     dict_comments: dict) -> None:
+
+        len_comments = len(comments)
+        utils.prints('comments', len_comments=len_comments, date_article=date_article)
+
+        # We add a line with all the comment information blank. If there are no comments, the article will only
+        # have this line, and if there are comments, we'll have a line that only defines the article.
+        article_row = [self.crawler.NOW,
+                       journal,
+                       term,
+                       date_article,
+                       category,
+                       type_article,
+                       title,
+                       link,
+                       len_comments]
+        # The row goes to the results file right away (see crawler.writers.RowWriter): we only keep the id of the article,
+        # with its journal, in memory
+        self.crawler.output.store_result(article_id, article_row)
+        dict_articles[article_id] = journal
+        
+        self.crawler.saved_articles.add(article_id)
+
+        # We loop through the list (if it's not empty) and add a new element to the article for each comment,
+        # with the comment information at the end.
+        for comment in comments:
+            comment_id = f"{article_id}-{str(comment[0])}"
+            if self.crawler.saved_comments.add_if_new(comment_id):
+                comment_row = [article_id,
+                               comment[1],
+                               comment[2],
+                               comment[3],
+                               comment[4],
+                               comment[5],
+                               comment[6],
+                               comment[7]]
+                self.crawler.output.store_comment(comment_id, comment_row)
+                # Comments are most of the results: we only keep their id in memory, the row is in the results file
+                dict_comments[comment_id] = article_id
+
+                # If we are labeling while crawling, the comment goes to the labeling queue
+                if self.crawler.labeling_pipeline:
+                    self.crawler.labeling_pipeline.submit(comment_id, comment_row, title, term)
+
+# Location of the comments loaded dynamically, used to know when they are loaded
+COMMENTS_LOC = {'altaveu': '//div[@data-type="comment"]',
+                'diari': '//div[@class="comment"]'}
+
 class Comments:
 
     def __init__(self, crawler_instance, parser_instance, dynamic_methods_instance):
         self.crawler = crawler_instance
         self.parser = parser_instance
         self.dynamic_methods = dynamic_methods_instance
+        self.waits = self.dynamic_methods.waits
 
     def load_all_comments(self, journal):
         # In the event the comment list has a "Show more" button, we need to load all comment before accessing them
@@ -119,40 +236,56 @@ class Comments:
         # We use a find_elements method that will return an empty list in case there is no button,
         # which will render the condition False
         while more_comments and self.crawler.driver.find_elements(By.XPATH, load_more_loc[journal]):
-            try:
-                button = WebDriverWait(self.crawler.driver, 15).until(
-                    EC.element_to_be_clickable((By.XPATH, load_more_loc[journal])))
-            except TimeoutException:
-                # If the button isn't there, WebDriverWait will raise a TimeoutExeption
-                # This means there are no more comments to load
+            button = self.waits.clickable(journal, 'show_more_comments_button', By.XPATH, load_more_loc[journal])
+            if button is None:
+                # If the button isn't clickable, there are no more comments to load
                 more_comments = False
             if more_comments:
                 # If we were able to find the button, we click it
+                len_comments = len(self.crawler.driver.find_elements(By.XPATH, COMMENTS_LOC[journal]))
                 self.crawler.driver.execute_script("arguments[0].click();", button)
-                # Even though it's better to avoid .sleep(), in this case it's necessary because if we don't wait
-                # When we go through the loop again, the load_more_button is going to be found even if it's not there
-                # anymore. We can't handle this with normal waits, as we're not waiting for an element to be available,
-                # we're waiting for an element to stop being available
-                tme.sleep(2)
+                # When we go through the loop again, the old button could still be found even if it's not there anymore.
+                # We wait until the button we clicked is removed or hidden, or until new comments are added.
+                more_comments = self.waits.loaded_more(journal, 'show_more_comments', button, By.XPATH, COMMENTS_LOC[journal], len_comments)
 
     def get_comments(self, journal, url, soup):
+        # Comments in the static page of the article are read from its soup. The others are rendered
+        # by JavaScript, so we open the article with Selenium (column fetch_comments of sources_elements.csv)
+
+        match routing.route(self.crawler.sources_elements, journal, 'comments'):
+            case 'static':
+                return self.get_comments_soup(journal, soup) if soup else []
+
+            case 'dynamic':
+                start_time = tme.time()
+                comments = self.get_comments_dynamic(journal, url)
+                self.crawler.fetch_stats.record(journal, 'comments', 'dynamic', tme.time() - start_time, True)
+                return comments
+
+            case _:
+                # If we are not in a journal that has comments, we return an empty list
+                return []
+
+    def get_comments_dynamic(self, journal, url):
         # Depending on the journal, we use a method or another to get the comment_list
 
         match journal:
             case 'altaveu':
                 # Comments are loaded dynamically, so we get them with Selenium
                 self.dynamic_methods.open_url(journal, url)
-                tme.sleep(1)
+                # We wait until the comments rendered by JavaScript stop appearing
+                self.waits.stable_count(journal, 'comments', By.XPATH, COMMENTS_LOC[journal])
                 # We load all comments
                 self.load_all_comments(journal)
                 # We create a BeautifulSoup object with the current page_source
-                soup = BeautifulSoup(self.crawler.driver.page_source, 'html.parser')
+                soup = parsing.make_soup(self.crawler.driver.page_source, journal, 'comments', self.crawler.parse_stats, strain=False)
                 return self.get_comments_soup(journal, soup)
 
             case 'diari':
                 try:
                     self.dynamic_methods.open_url(journal, url)
-                    tme.sleep(1)
+                    # The comments are rendered inside the shadow DOM of the comments widget
+                    self.waits.shadow_root(journal, 'comments', By.CSS_SELECTOR, "hyvor-talk-comments")
                     shadow_host = self.crawler.driver.find_element(By.CSS_SELECTOR, "hyvor-talk-comments")
                     # Use JavaScript to extract the shadow root's inner HTML
                     shadow_dom_html = self.crawler.driver.execute_script("""
@@ -161,14 +294,11 @@ class Comments:
                     """, shadow_host)
 
                     # Create a BeautifulSoup object with the extracted shadow DOM HTML
-                    soup = BeautifulSoup(shadow_dom_html, "html.parser")
+                    soup = parsing.make_soup(shadow_dom_html, journal, 'comments', self.crawler.parse_stats, strain=False)
                     return self.get_comments_soup(journal, soup)
                 except:
                     return []
 
-            case 'bondia':
-                return self.get_comments_soup(journal, soup)
-
             case _:
                 # If we are not in a journal that has comments, we return an empty list
                 return []
@@ -217,6 +347,8 @@ class DynamicMethods:
         self.crawler = crawler_instance
 
         self.parser = parser.Parser()
+        self.waits = waits.Waits(self.crawler)
+        self.browser = browser.BrowserProfile(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self)
 
     def buttons(self, journal: str) -> None:
@@ -243,14 +375,9 @@ class DynamicMethods:
             case 'periodic':
                 # If there is an advertisement pop_up that stops us from accessing the journal, we click the "Access journal"
                 # button to access the journal
-                access = True
-                try:
-                    access_journal = WebDriverWait(self.crawler.driver, 15).until(EC.presence_of_element_located((
-                        By.XPATH, '//div[@class="interstitial__link"]/a')))
-                except TimeoutException:
-                    access = False
+                access_journal = self.waits.presence(journal, 'advertisement', By.XPATH, '//div[@class="interstitial__link"]/a')
 
-                if access:
+                if access_journal:
                     self.crawler.driver.execute_script("arguments[0].click();", access_journal)
                     self.crawler.driver.implicitly_wait(15)
 
@@ -259,54 +386,61 @@ class DynamicMethods:
     def open_url(self, journal: str, url: str) -> None:
         
         try:
+            # We block the resources the journal doesn't need before opening the page
+            self.browser.apply(journal)
             self.crawler.driver.get(url)
         except:
             print(f"Cannot access {url} right now. Please try again later.")
             return False
+        self.browser.wait_page_load(journal)
         self.buttons(journal)
         self.opening_url_actions(journal)
         return True
 
-    def get_soup(self, journal: str, url: str = None) -> BeautifulSoup:
+    def get_soup(self, journal: str, url: str = None, kind: str = None) -> BeautifulSoup:
+        # Article pages (kind='article') are taken from the page cache when we have a recent version.
+        # Other pages are always opened, as we keep using the driver on them (clicking buttons, loading more...)
+
+        if url and kind == 'article' and PAGE_CACHE_ENABLED:
+            cache = page_cache.get_page_cache()
+            page = cache.get(url)
+            if page and cache.is_fresh(page, kind):
+                cache.count('hits')
+                return parsing.make_soup(page['text'], journal, kind, self.crawler.parse_stats)
 
         if url:
             success = self.open_url(journal, url)
             if not success:
                 return None
-        
-        soup = BeautifulSoup(self.crawler.driver.page_source, 'html.parser')
+
+        page_source = self.crawler.driver.page_source
+
+        if url and kind == 'article' and PAGE_CACHE_ENABLED:
+            cache.count('misses')
+            cache.put(url, kind, page_source)
+
+        # Pages read from the driver without a kind are lists of results
+        soup = parsing.make_soup(page_source, journal, kind if kind else 'listing', self.crawler.parse_stats)
         return soup
     
-    def url_in_second_window(self, mode: str, url=None) -> None:
+    def url_in_second_window(self, mode: str, url=None, journal: str = None) -> None:
         # If we need to, we open a second window on the WebDriver (to be able to keep the information on the current window)
 
         if mode == "open":
-            global window_before
-            window_before = self.crawler.driver.window_handles[0]
+            # The handle is kept in the crawler (one per worker), as each worker has its own driver
+            self.crawler.window_before = self.crawler.driver.window_handles[0]
             self.crawler.driver.execute_script("window.open()")
             second_window = self.crawler.driver.window_handles[1]
             self.crawler.driver.switch_to.window(second_window)
+            if journal:
+                self.browser.apply(journal)
             self.crawler.driver.get(url)
 
         else:
 
             self.crawler.driver.close()
-            self.crawler.driver.switch_to.window(window_before)    
-
-    def all_articles_selenium(self, journal: str, next_page=None):
-        # We look for all the articles on the current page
-        # For dynamic webpages -> Selenium
-        all_articles_locs = self.crawler.sources_elements.loc[journal, 'all_articles']
-        # We wait until we can find the elements to begin
-        WebDriverWait(self.crawler.driver, 15).until(EC.presence_of_element_located((By.XPATH, all_articles_locs)))
-
-        # If we are looking for articles after clicking on the "Show more" button, we can't search the whole page
-        # but only the articles that are new
-        if next_page is None:
-            return self.crawler.driver.find_elements(By.XPATH, all_articles_locs)
-        else:
-            return next_page.find_elements(By.XPATH, '.' + all_articles_locs)
-    
+            self.crawler.driver.switch_to.window(self.crawler.window_before)
+
 class StaticMethods:
 
     def __init__(self, crawler_instance):
@@ -316,17 +450,143 @@ class StaticMethods:
         self.parser = parser.Parser()
         self.add_article = AddArticle(self.crawler, self.parser)
 
-    def get_soup(self, url: str) -> BeautifulSoup:
+    def get_soup(self, url: str, kind: str = None, journal: str = None) -> BeautifulSoup:
 
-        try:
-            response = requests.get(url)
-        except:
-            print(f"Cannot access {url} right now. Please try again later.")
+        text = frontier.get_frontier().fetch(url, kind)
+        if text is None:
             return False
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = parsing.make_soup(text, journal, kind, self.crawler.parse_stats)
         return soup
 
+    def article_kind(self, journal: str) -> str:
+        # Journals whose comments are in the static page of the article need to fetch it again more often
+        return 'comments' if routing.route(self.crawler.sources_elements, journal, 'comments') == 'static' else 'article'
+
+    def get_soups(self, urls: list, kind: str = None, journal: str = None) -> dict:
+        # We fetch all the pages at the same time (as many as the crawl frontier allows for the domain)
+        # and return a dictionary {url: soup}. Pages that couldn't be accessed are False, as in get_soup(...)
+
+        texts = frontier.get_frontier().fetch_all(urls, kind)
+
+        return {url: parsing.make_soup(text, journal, kind, self.crawler.parse_stats) if text is not None else False
+                for url, text in zip(urls, texts)}
+
+    def links_in_interval(self, journal: str, articles: list, date_init: datetime, date_end: datetime) -> list:
+        # For the journals with the date of the article in the list of results, the links of the articles
+        # of the list that are inside the interval and haven't been saved yet (they are fetched at the same time).
+        # Articles stored by a past search are not fetched: they are reused from the article index.
+        # While collecting the results of every search term, nothing is fetched.
+
+        links = []
+        for article in articles:
+            date_article = self.parser.get_datetime(journal, article)
+            article_id = self.add_article.define_article_id(journal, date_article)
+            if date_init <= date_article <= date_end and not article_id in self.crawler.saved_articles:
+                link = self.parser.get_link(journal, article)
+                if self.add_article.should_fetch(link):
+                    links.append(link)
+
+        return links
+
+class PageSeeker:
+    # The results in numbered pages are sorted from the newest to the oldest article. If the interval is in the past,
+    # instead of reading every newer page we look for the first page that reaches date_end:
+    # we probe pages 2, 4, 8... until one does (or is empty), then binary search between the last two probes.
+
+    def __init__(self, crawler_instance, parser_instance, add_article_instance, router_instance):
+
+        self.crawler = crawler_instance
+        self.parser = parser_instance
+        self.add_article = add_article_instance
+        self.router = router_instance
+
+    def page_url(self, journal: str, url: str, add_on: str, page: int) -> str:
+        return url if page == 1 else utils.numbered_page_url(journal, url, add_on, page)
+
+    def start_page(self, journal: str, url: str, add_on: str, date_end: datetime, term: str) -> int:
+        # The page after the last one read before the checkpoint we resume from, or the first page of the interval
+
+        if self.crawler.checkpoint:
+            last_page = self.crawler.checkpoint.last_page(journal, term)
+            if last_page is not None:
+                utils.prints('resume_page', current_page=last_page + 1)
+                return last_page + 1
+
+        if PAGE_SEEK_ENABLED:
+            return self.first_page(journal, url, add_on, date_end)
+
+        return 1
+
+    def page_done(self, journal: str, term: str, page: int) -> None:
+        # The articles of the page are in the candidates: if the crawl stops, it can resume from the next page.
+        # We only copy the candidates when the checkpoint is going to be written.
+
+        if self.crawler.checkpoint and self.crawler.candidates is not None and self.crawler.checkpoint.due():
+            self.crawler.checkpoint.page_done(journal, term, page, self.crawler.candidates.to_list())
+
+    def oldest_date(self, journal: str, url: str) -> datetime:
+        # The date of the last article of the page, or None if the page is empty or couldn't be accessed
+
+        soup = self.router.get_soup(journal, url, 'listing')
+        if not soup:
+            return None
+
+        articles = self.parser.all_articles(journal, soup)
+        if not articles:
+            return None
+
+        article = articles[-1]
+        if journal not in self.parser.DATETIME_IN_ARTICLE:
+            return self.parser.get_datetime(journal, article)
+
+        # We need to open the article to know its date (it's kept in the page cache for when we read the page)
+        link = self.parser.get_link(journal, article)
+        indexed = self.add_article.indexed_article(link)
+        if indexed:
+            return indexed['datetime_article']
+
+        return self.parser.get_datetime(journal, article, self.router.get_soup(journal, link, 'article'))
+
+    def first_page(self, journal: str, url: str, add_on: str, date_end: datetime) -> int:
+        # We return the first page with an article published before date_end
+
+        probes = 0
+
+        def reaches_end(page: int) -> bool:
+            # Empty pages are after the last result, so they also count as reaching the end
+            nonlocal probes
+            probes += 1
+            date = self.oldest_date(journal, self.page_url(journal, url, add_on, page))
+            return date is None or date <= date_end
+
+        try:
+            if reaches_end(1):
+                return 1
+
+            # Exponential probing: the last page known to be newer than the interval, and the first one that reaches it
+            newer, reached = 1, 2
+            while not reaches_end(reached):
+                newer, reached = reached, reached * 2
+                if reached > PAGE_SEEK_MAX_PAGE:
+                    # The results don't seem to end: we read them from the first page
+                    return 1
+
+            while reached - newer > 1:
+                middle = (newer + reached) // 2
+                if reaches_end(middle):
+                    reached = middle
+                else:
+                    newer = middle
+
+        except Exception as e:
+            print(f"Couldn't look for the first page of the interval, reading from the first page: {e}")
+            return 1
+
+        utils.prints('page_seek', current_page=reached, skipped_pages=reached - 1, probes=probes)
+
+        return reached
+
 """ -- THE DIFFERENT SCRAPERS -> Depending on source --"""
 class Altaveu:
 
@@ -340,6 +600,8 @@ class Altaveu:
         self.static_methods = StaticMethods(self.crawler)
         self.dynamic_methods = DynamicMethods(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self.dynamic_methods)
+        self.router = routing.Router(self.crawler, self.static_methods, self.dynamic_methods)
+        self.page_seeker = PageSeeker(self.crawler, self.parser, self.add_article, self.router)
 
         # We define all the variables to store locations or paths that we'll need
         self.next_page = self.crawler.sources_elements.loc['altaveu', 'next_page']
@@ -360,15 +622,19 @@ class Altaveu:
         dict_comments = {}
 
         try:
-            current_page = 1
+            # We skip the pages already read before a checkpoint, or with only articles newer than the interval
+            current_page = self.page_seeker.start_page(journal, url, self.next_page, date_end, term)
+            first_url = self.page_seeker.page_url(journal, url, self.next_page, current_page)
             utils.prints('current_page', current_page=current_page)
 
-            # We use the function crawl_current_page to obtain the articles from the First page
+            # We use the function crawl_current_page to obtain the articles from the first page of the interval
             (articles_current_page, comments_current_page, date_in_interval, successful_access) = self.numbered_pages_current_page(journal,
-                                                                                                                url,
+                                                                                                                first_url,
                                                                                                                 date_init,
                                                                                                                 date_end,
                                                                                                                 term)
+            if successful_access:
+                self.page_seeker.page_done(journal, term, current_page)
             dict_articles.update(articles_current_page)
             dict_comments.update(comments_current_page)
 
@@ -384,6 +650,8 @@ class Altaveu:
                                                                                                                 date_init,
                                                                                                                 date_end,
                                                                                                                 term)
+                if successful_access:
+                    self.page_seeker.page_done(journal, term, current_page)
                 dict_articles.update(articles_current_page)
                 dict_comments.update(comments_current_page)
         
@@ -409,7 +677,7 @@ class Altaveu:
         date_in_interval = True
         successful_access = True
 
-        soup = self.static_methods.get_soup(url)
+        soup = self.router.get_soup(journal, url, 'listing')
         
         if soup:
             try:
@@ -422,14 +690,30 @@ class Altaveu:
 
                 date_article = self.crawler.NOW
 
+                # The date of the article is only inside the article. The list is sorted from the newest article, so we fetch
+                # the articles in batches, in the order of the list, and stop fetching once we leave the interval.
+                # Articles stored by a past search are not fetched: we already know their date.
+                links = [self.parser.get_link(journal, article) for article in articles]
+                indexed = {link: self.add_article.indexed_article(link) for link in links}
+                links_to_fetch = [link for link in links if not indexed[link]]
+                soups = {}
+                fetched = 0
+
                 i = 0
                 # Same method as scrape_single_page, except in the event we exit the date interval, we'll return a variable
                 # date_in_interval = False so the loop in scrape_numbered_pages can stop.
                 while date_init <= date_article and i < len_articles and date_in_interval:
                     article = articles[i]
                     link = self.parser.get_link(journal, article)
-                    soup = self.static_methods.get_soup(link)
-                    date_article = self.parser.get_datetime(journal, article, soup)
+                    if indexed[link]:
+                        soup = False
+                        date_article = indexed[link]['datetime_article']
+                    else:
+                        if link not in soups:
+                            soups.update(self.router.get_soups(journal, links_to_fetch[fetched:fetched + FRONTIER_DOMAIN_CONCURRENCY], 'article'))
+                            fetched += FRONTIER_DOMAIN_CONCURRENCY
+                        soup = soups[link]
+                        date_article = self.parser.get_datetime(journal, article, soup)
 
                     article_id = self.add_article.define_article_id(journal, date_article)
 
@@ -472,6 +756,8 @@ class Forum:
         self.static_methods = StaticMethods(self.crawler)
         self.dynamic_methods = DynamicMethods(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self.dynamic_methods)
+        self.router = routing.Router(self.crawler, self.static_methods, self.dynamic_methods)
+        self.page_seeker = PageSeeker(self.crawler, self.parser, self.add_article, self.router)
 
         # We define all the variables to store locations or paths that we'll need
         self.next_page = self.crawler.sources_elements.loc['forum', 'next_page']
@@ -492,15 +778,19 @@ class Forum:
         dict_comments = {}
 
         try:
-            current_page = 1
+            # We skip the pages already read before a checkpoint, or with only articles newer than the interval
+            current_page = self.page_seeker.start_page(journal, url, self.next_page, date_end, term)
+            first_url = self.page_seeker.page_url(journal, url, self.next_page, current_page)
             utils.prints('current_page', current_page=current_page)
 
-            # We use the function crawl_current_page to obtain the articles from the First page
+            # We use the function crawl_current_page to obtain the articles from the first page of the interval
             (articles_current_page, comments_current_page, date_in_interval, successful_access) = self.numbered_pages_current_page(journal,
-                                                                                                                                url,
+                                                                                                                                first_url,
                                                                                                                                 date_init,
                                                                                                                                 date_end,
                                                                                                                                 term)
+            if successful_access:
+                self.page_seeker.page_done(journal, term, current_page)
             dict_articles.update(articles_current_page)
             dict_comments.update(comments_current_page)
 
@@ -516,6 +806,8 @@ class Forum:
                                                                                                                 date_init,
                                                                                                                 date_end,
                                                                                                                 term)
+                if successful_access:
+                    self.page_seeker.page_done(journal, term, current_page)
                 dict_articles.update(articles_current_page)
                 dict_comments.update(comments_current_page)
         
@@ -542,7 +834,7 @@ class Forum:
         date_in_interval = True
         successful_access = True
 
-        soup = self.static_methods.get_soup(url)
+        soup = self.router.get_soup(journal, url, 'listing')
         
         if soup:
             try:
@@ -555,6 +847,9 @@ class Forum:
 
                 date_article = self.crawler.NOW
 
+                # We fetch the articles of the page inside the interval at the same time
+                soups = self.router.get_soups_in_interval(journal, articles, date_init, date_end)
+
                 i = 0
                 # Same method as scrape_single_page, except in the event we exit the date interval, we'll return a variable
                 # date_in_interval = False so the loop in scrape_numbered_pages can stop.
@@ -563,7 +858,7 @@ class Forum:
                     date_article = self.parser.get_datetime(journal, article)
                     if date_article <= date_end:
                         link = self.parser.get_link(journal, article)
-                        soup = self.static_methods.get_soup(link)
+                        soup = soups.get(link, False)
 
                         article_id = self.add_article.define_article_id(journal, date_article)
 
@@ -605,6 +900,7 @@ class Bondia:
         self.static_methods = StaticMethods(self.crawler)
         self.dynamic_methods = DynamicMethods(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self.dynamic_methods)
+        self.router = routing.Router(self.crawler, self.static_methods, self.dynamic_methods)
 
         # We define all the variables to store locations or paths that we'll need
         self.load_next_page = self.crawler.sources_elements.loc['bondia', 'load_next_page']
@@ -633,7 +929,8 @@ class Bondia:
             utils.prints('current_page', current_page=current_page)
             # We use the function crawl_current_page to obtain the articles from the First page
             self.dynamic_methods.open_url(journal, url)
-            tme.sleep(15)
+            # We wait for the list of articles to be rendered
+            self.dynamic_methods.waits.presence(journal, 'first_page', By.CSS_SELECTOR, self.load_next_page)
             soup = self.dynamic_methods.get_soup(journal)
 
             (articles_current_page, comments_current_page, date_in_interval, successful_access) = self.numbered_pages_current_page(journal,
@@ -648,26 +945,26 @@ class Bondia:
             while date_in_interval and successful_access and more_articles:
                 current_page += 1
                 utils.prints('current_page', current_page=current_page)
-                try:
-                    # We wait for the button to be available
-                    next_page_button_loc = self.define_next_page_button(current_page)
+                # We wait for the button to be available
+                next_page_button_loc = self.define_next_page_button(current_page)
 
-                    next_page_button_loc = WebDriverWait(self.crawler.driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, next_page_button_loc)))
-                except TimeoutException:
+                next_page_button = self.dynamic_methods.waits.presence(journal, 'next_page_button', By.CSS_SELECTOR, next_page_button_loc)
+                if next_page_button is None:
                     # If we couldn't find the button, it means there are no more articles in the page.
                     print(f"COULDN'T FIND THE BUTTON WITH CSS SELECTOR -> {next_page_button_loc}")
                     more_articles = False
 
                 if more_articles:
                     # If there are more articles to look for, we press the button.
-                    self.crawler.driver.execute_script("arguments[0].click();", next_page_button_loc)
+                    articles_list = self.crawler.driver.find_elements(By.CSS_SELECTOR, self.load_next_page)
+                    articles_list = articles_list[0].get_attribute('innerHTML') if articles_list else ""
+                    self.crawler.driver.execute_script("arguments[0].click();", next_page_button)
 
-                    # We wait until the location of the new list of articles is loaded
+                    # We wait for the next page to load or we will get the soup from the previous page.
+                    # The list of articles is updated in place, so we wait until its content changes.
+                    self.dynamic_methods.waits.content_changes(journal, 'page_turn', By.CSS_SELECTOR, self.load_next_page, articles_list)
 
                     # We get the soup from the current html page
-                    # We wait for the next page to load or we will get the soup from the previous page.
-                    tme.sleep(15)
                     soup = self.dynamic_methods.get_soup(journal)
 
                     # We get all the new articles from the new numbered page.
@@ -713,6 +1010,9 @@ class Bondia:
 
                 date_article = self.crawler.NOW
 
+                # We fetch the articles of the page inside the interval at the same time
+                soups = self.router.get_soups_in_interval(journal, articles, date_init, date_end)
+
                 i = 0
 
                 # Same method as scrape_single_page, except in the event we exit the date interval, we'll return a variable
@@ -723,7 +1023,7 @@ class Bondia:
                     
                     if date_article <= date_end:
                         link = self.parser.get_link(journal, article)
-                        soup = self.static_methods.get_soup(link)
+                        soup = soups.get(link, False)
 
                         article_id = self.add_article.define_article_id(journal, date_article)
 
@@ -765,6 +1065,7 @@ class Periodic:
         self.static_methods = StaticMethods(self.crawler)
         self.dynamic_methods = DynamicMethods(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self.dynamic_methods)
+        self.router = routing.Router(self.crawler, self.static_methods, self.dynamic_methods)
 
         # We define all the variables to store locations or paths that we'll need
 
@@ -775,14 +1076,15 @@ class Periodic:
                     date_end: datetime,
                     term: str) -> dict:
         # Structure to crawl: Single page
-        # Type of webpage: Static/Dynamic (We use beautifulsoup no navigate, but we need selenium to access the url)
+        # Type of webpage: Static/Dynamic (We use beautifulsoup to navigate. The router opens the pages with plain HTTP,
+        # or with selenium if they need it, e.g. behind an advertisement)
         # All the articles are on a single page. We get a single list with all the articles and loop through it
         # We add every article (list of attributes) that is inside the desired interval to the dictionary
         utils.prints('url', url=url)
         dict_articles = {}
         dict_comments = {}
 
-        soup = self.dynamic_methods.get_soup(journal, url)
+        soup = self.router.get_soup(journal, url, 'listing')
 
         if soup:
             try:
@@ -807,7 +1109,8 @@ class Periodic:
                             # We get the artcle's link to turn into a soup object.
                             # We'll use soup to get the attributes and content we need from inside the article
                             link = self.parser.get_link(journal, article)
-                            soup = self.dynamic_methods.get_soup(journal, link)
+                            # Articles stored by a past search are not opened again
+                            soup = self.router.get_soup(journal, link, 'article') if self.add_article.should_fetch(link) else False
                             dict_articles, dict_comments = self.add_article.add_article_to_dict(journal,
                                                                                                 article,
                                                                                                 article_id,
@@ -839,6 +1142,7 @@ class Ara:
         self.static_methods = StaticMethods(self.crawler)
         self.dynamic_methods = DynamicMethods(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self.dynamic_methods)
+        self.router = routing.Router(self.crawler, self.static_methods, self.dynamic_methods)
 
         # We define all the variables to store locations or paths that we'll need
         self.load_more_button = self.crawler.sources_elements.loc['ara', 'load_more_button']
@@ -872,8 +1176,14 @@ class Ara:
                 while date_article >= date_init and j < len(articles):
                     article = articles[j]
                     link = self.parser.get_link(journal, article)
-                    soup = self.dynamic_methods.get_soup(journal, link)
-                    date_article = self.parser.get_datetime(journal, article, soup)
+                    # Articles stored by a past search are not opened again: we already know their date
+                    indexed = self.add_article.indexed_article(link)
+                    if indexed:
+                        soup = False
+                        date_article = indexed['datetime_article']
+                    else:
+                        soup = self.router.get_soup(journal, link, 'article')
+                        date_article = self.parser.get_datetime(journal, article, soup)
 
                     article_id = self.add_article.define_article_id(journal, date_article)
 
@@ -894,11 +1204,9 @@ class Ara:
                 # If the number of tags next_page_loc is smaller than i + 1, we press the button to get more articles
                 #self.dynamic_methods.open_url(journal, url)
                 while len(self.crawler.driver.find_elements(By.CSS_SELECTOR, self.load_next_page)) < i + 1 and more_articles:
-                    try:
-                        # We wait for the button to be available
-                        load_more_button = WebDriverWait(self.crawler.driver, 15).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, self.load_more_button)))
-                    except TimeoutException:
+                    # We wait for the button to be available
+                    load_more_button = self.dynamic_methods.waits.presence(journal, 'load_more_button', By.CSS_SELECTOR, self.load_more_button)
+                    if load_more_button is None:
                         # If we couldn't find the button, it means there are no more articles in the page.
                         more_articles = False
 
@@ -909,8 +1217,8 @@ class Ara:
 
                 if more_articles:
                     # We wait until the location of the new list of articles is loaded
-                    WebDriverWait(self.crawler.driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR,
-                                                                                                 self.load_next_page)))
+                    if not self.dynamic_methods.waits.presence(journal, 'next_page', By.CSS_SELECTOR, self.load_next_page):
+                        raise TimeoutException(f"Couldn't find the next page of articles at {self.load_next_page}")
                     # We get the next list of articles from the current next_page_log tag.
                     soup = self.dynamic_methods.get_soup(journal)
                     articles = self.parser.next_all_articles(journal, soup, i)
@@ -936,6 +1244,8 @@ class Diari:
         self.static_methods = StaticMethods(self.crawler)
         self.dynamic_methods = DynamicMethods(self.crawler)
         self.add_article = AddArticle(self.crawler, self.parser, self.dynamic_methods)
+        self.router = routing.Router(self.crawler, self.static_methods, self.dynamic_methods)
+        self.page_seeker = PageSeeker(self.crawler, self.parser, self.add_article, self.router)
 
         # We define all the variables to store locations or paths that we'll need
         self.next_page = None
@@ -956,15 +1266,19 @@ class Diari:
         dict_comments = {}
 
         try:
-            current_page = 1
+            # We skip the pages already read before a checkpoint, or with only articles newer than the interval
+            current_page = self.page_seeker.start_page(journal, url, self.next_page, date_end, term)
+            first_url = self.page_seeker.page_url(journal, url, self.next_page, current_page)
             utils.prints('current_page', current_page=current_page)
 
-            # We use the function crawl_current_page to obtain the articles from the First page
+            # We use the function crawl_current_page to obtain the articles from the first page of the interval
             (articles_current_page, comments_current_page, date_in_interval, successful_access) = self.numbered_pages_current_page(journal,
-                                                                                                            url,
+                                                                                                            first_url,
                                                                                                             date_init,
                                                                                                             date_end,
                                                                                                             term)
+            if successful_access:
+                self.page_seeker.page_done(journal, term, current_page)
             dict_articles.update(articles_current_page)
             dict_comments.update(comments_current_page)
 
@@ -980,6 +1294,8 @@ class Diari:
                                                                                                                 date_init,
                                                                                                                 date_end,
                                                                                                                 term)
+                if successful_access:
+                    self.page_seeker.page_done(journal, term, current_page)
                 dict_articles.update(articles_current_page)
                 dict_comments.update(comments_current_page)
         
@@ -1006,7 +1322,7 @@ class Diari:
         date_in_interval = True
         successful_access = True
 
-        soup = self.static_methods.get_soup(url)
+        soup = self.router.get_soup(journal, url, 'listing')
         
         if soup:
             try:
@@ -1019,6 +1335,9 @@ class Diari:
 
                 date_article = self.crawler.NOW
 
+                # We fetch the articles of the page inside the interval at the same time
+                soups = self.router.get_soups_in_interval(journal, articles, date_init, date_end)
+
                 i = 0
                 # Same method as scrape_single_page, except in the event we exit the date interval, we'll return a variable
                 # date_in_interval = False so the loop in scrape_numbered_pages can stop.
@@ -1031,7 +1350,7 @@ class Diari:
                     if not article_id in self.crawler.saved_articles:
                         if date_article <= date_end:
                             link = self.parser.get_link(journal, article)
-                            soup = self.static_methods.get_soup(link)
+                            soup = soups.get(link, False)
                             if date_init <= date_article:
                                 dict_articles, dict_comments = self.add_article.add_article_to_dict(journal,
                                                                                     article,
@@ -1057,6 +1376,57 @@ class Diari:
         
         return (dict_articles, dict_comments, date_in_interval, successful_access)
     
+class Candidates:
+    # Articles found in the results of every search term of a journal, in the order we found them.
+    # Each article is kept once, with every search term that found it.
+
+    def __init__(self):
+        self.articles = {}
+
+    def add(self, journal: str, article_id: str, date_article: datetime, link: str, title: str, category: str, soup: BeautifulSoup, text: tuple, term: str) -> None:
+
+        if article_id not in self.articles:
+            self.articles[article_id] = {'journal': journal,
+                                         'article_id': article_id,
+                                         'date_article': date_article,
+                                         'link': link,
+                                         # A plain string: the parser's one keeps the whole page of results in memory
+                                         'title': str(title) if title is not None else None,
+                                         'category': category,
+                                         # Some journals need the article to know its date: we keep its page, or only its
+                                         # (subtitle, content) if the comments aren't read from the page, so it isn't fetched again
+                                         'soup': soup if soup else None,
+                                         'text': text,
+                                         'terms': []}
+
+        candidate = self.articles[article_id]
+        if term not in candidate['terms']:
+            candidate['terms'].append(term)
+        if soup and candidate['soup'] is None:
+            candidate['soup'] = soup
+        if text and candidate['text'] is None:
+            candidate['text'] = text
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def __iter__(self):
+        return iter(self.articles.values())
+
+    def to_list(self) -> list:
+        # The candidates as they are kept in a checkpoint: without their page or text, the article is fetched again when resuming
+
+        return [{key: value for key, value in candidate.items() if key not in ('soup', 'text')} for candidate in self]
+
+    @classmethod
+    def from_list(cls, candidates: list):
+
+        instance = cls()
+        for candidate in candidates:
+            instance.articles[candidate['article_id']] = dict(candidate, terms=list(candidate['terms']), soup=None, text=None)
+
+        return instance
+
 """ -- THE MAIN SCRAPER --"""
 class Scraper:
 
@@ -1115,24 +1485,44 @@ class Scraper:
         return url
 
     def scrape(self, journal: str) -> dict:
+        # We work in two phases:
+        #   1. We look through the results of every search term and collect the articles in the interval
+        #   2. We get each different article once, with all the search terms that found it
 
-        result = {}
-        result_comments = {}
+        # If we resume from a checkpoint, we start with what the stopped crawl already got
+        checkpoint = self.crawler.checkpoint
+        if checkpoint and checkpoint.is_journal_done(journal):
+            utils.prints('resume_journal', journal=journal)
+            return checkpoint.rows(journal)
+
+        result, result_comments = checkpoint.rows(journal) if checkpoint else ({}, {})
 
         self.crawler.cookies_clicked = False
         self.crawler.notifs_clicked = False
 
+        self.crawler.candidates = Candidates.from_list(checkpoint.candidates(journal)) if checkpoint else Candidates()
+
         for term in self.crawler.search_terms:
+            if checkpoint and checkpoint.is_term_done(journal, term):
+                continue
+
             utils.prints('term', term=term)
             # already_saved = result
             url = self.word_to_url(journal, term)
 
+            # In an incremental crawl, we stop looking once we reach the newest article already stored for this term
+            date_init = self.crawler.date_init
+            if self.crawler.watermarks:
+                date_init = self.crawler.watermarks.date_init(journal, term, self.crawler.date_init)
+                if date_init != self.crawler.date_init:
+                    utils.prints('watermark', date_init=date_init)
+
             match journal:
                 case 'altaveu':
                     # numbered_pages (dynamic comments)
                     articles, comments = Altaveu(self.crawler).numbered_pages(journal,
                                                                                 url,
-                                                                                self.crawler.date_init,
+                                                                                date_init,
                                                                                 self.crawler.date_end,
                                                                                 term)
                     result.update(articles)
@@ -1142,7 +1532,7 @@ class Scraper:
                     # numbered_pages
                     articles, comments = Forum(self.crawler).numbered_pages(journal,
                                                                                 url,
-                                                                                self.crawler.date_init,
+                                                                                date_init,
                                                                                 self.crawler.date_end,
                                                                                 term)
                     result.update(articles)
@@ -1151,7 +1541,7 @@ class Scraper:
                 case 'bondia':
                     articles, comments = Bondia(self.crawler).numbered_pages(journal,
                                                                                 url,
-                                                                                self.crawler.date_init,
+                                                                                date_init,
                                                                                 self.crawler.date_end,
                                                                                 term)
                     result.update(articles)
@@ -1161,7 +1551,7 @@ class Scraper:
                     # single_page 
                     articles, comments = Periodic(self.crawler).single_page(journal,
                                                                             url,
-                                                                            self.crawler.date_init,
+                                                                            date_init,
                                                                             self.crawler.date_end,
                                                                             term)
                     result.update(articles)
@@ -1171,7 +1561,7 @@ class Scraper:
                     # load_more_page
                     articles, comments = Ara(self.crawler).load_more_page(journal,
                                                                                 url,
-                                                                                self.crawler.date_init,
+                                                                                date_init,
                                                                                 self.crawler.date_end,
                                                                                 term)
                     result.update(articles)
@@ -1181,10 +1571,82 @@ class Scraper:
                     # next_page
                     articles, comments = Diari(self.crawler).numbered_pages(journal,
                                                                                 url,
-                                                                                self.crawler.date_init,
+                                                                                date_init,
                                                                                 self.crawler.date_end,
                                                                                 term)
                     result.update(articles)
                     result_comments.update(comments)
 
-        return result, result_comments
\ No newline at end of file
+            if checkpoint:
+                checkpoint.term_done(journal, term, self.crawler.candidates.to_list())
+
+        candidates = self.crawler.candidates
+        self.crawler.candidates = None
+
+        utils.prints('candidates', len_articles=len(candidates))
+        articles, comments = self.get_candidates(journal, candidates, result, result_comments)
+        result.update(articles)
+        result_comments.update(comments)
+
+        if checkpoint:
+            checkpoint.journal_done(journal, result, result_comments)
+
+        return result, result_comments
+
+    def get_candidates(self, journal: str, candidates: Candidates, result: dict = None, result_comments: dict = None) -> dict:
+        # We get every collected article once. The articles of static journals are fetched at the same time, one batch at a time.
+        # result and result_comments are the rows the journal already had (e.g. from a checkpoint), kept with the new ones in checkpoints.
+
+        dict_articles = dict(result) if result else {}
+        dict_comments = dict(result_comments) if result_comments else {}
+
+        dynamic_methods = DynamicMethods(self.crawler)
+        router = routing.Router(self.crawler, StaticMethods(self.crawler), dynamic_methods)
+        add_article = AddArticle(self.crawler, parser.Parser(), dynamic_methods)
+
+        # e.g. already stored by a previous incremental crawl
+        pending = [candidate for candidate in candidates if candidate['article_id'] not in self.crawler.saved_articles]
+
+        # We fetch the articles in batches, so only the pages of one batch are in memory and the rows
+        # of each batch are written (and checkpointed) before fetching the next one
+        for start in range(0, len(pending), FRONTIER_DOMAIN_CONCURRENCY):
+            batch = pending[start:start + FRONTIER_DOMAIN_CONCURRENCY]
+
+            links = [candidate['link'] for candidate in batch
+                     if candidate['soup'] is None and candidate['text'] is None and add_article.should_fetch(candidate['link'])]
+            soups = router.get_soups(journal, links, 'article')
+
+            for candidate in batch:
+
+                try:
+                    soup = candidate['soup']
+                    if soup is None and candidate['text'] is None and add_article.should_fetch(candidate['link']):
+                        soup = soups.get(candidate['link'], False)
+
+                    dict_articles, dict_comments = add_article.add_candidate_to_dict(journal,
+                                                                                     candidate['title'],
+                                                                                     candidate['category'],
+                                                                                     candidate['article_id'],
+                                                                                     candidate['date_article'],
+                                                                                     candidate['link'],
+                                                                                     soup,
+                                                                                     utils.TERMS_SEPARATOR.join(candidate['terms']),
+                                                                                     dict_articles,
+                                                                                     dict_comments,
+                                                                                     candidate['text'])
+                except Exception as e:
+                    print(f"\n--> There was an error getting the article {candidate['link']} in journal {journal}")
+                    print(f"ERROR MESSAGE:\n{e}")
+                    traceback.print_exc()
+                    print("\n")
+
+                # The page of the article isn't needed anymore
+                candidate['soup'] = None
+                candidate['text'] = None
+
+            del soups
+
+            if self.crawler.checkpoint:
+                self.crawler.checkpoint.save_rows(journal, dict_articles, dict_comments)
+
+        return dict_articles, dict_comments
\ No newline at end of file
@@ -1,73 +1,41 @@
 from datetime import date, datetime, timedelta, time
 from dateutil.relativedelta import relativedelta
 
-import streamlit as st
 import io
 import sys
+import threading
 
-STREAMLIT = False
+# An article found with several search terms stores all of them in search_term, separated by TERMS_SEPARATOR
+TERMS_SEPARATOR = "|"
+# When the crawl runs as a background job, every status update is also sent to the job's progress
+JOB_PROGRESS = None
 
-def running_from_st():
+def running_from_job(progress_callback):
 
-    global STREAMLIT
+    global JOB_PROGRESS
 
-    STREAMLIT = True
-
-
-def setup_scraping_updates():
-
-    global MESSAGE_STYLE
-    global MESSAGE_BOX
-    global MESSAGES
-
-    MESSAGE_STYLE = """
-    <style>
-    .message-box {
-        width: 100%;
-        height: 500px;
-        overflow-y: scroll;
-        border: 1px solid #ccc;
-        padding: 10px;
-        font-family: monospace;
-        font-size: 14px;
-        background-color: #f9f9f9;
-    }
-    </style>
-    """
-
-    MESSAGE_BOX = st.empty()
-    st.markdown(MESSAGE_STYLE, unsafe_allow_html=True)
-
-    MESSAGES = []
-
-def print_scraping_update(message):
-
-    global MESSAGE_STYLE
-    global MESSAGE_BOX
-    global MESSAGES
-
-    message_list = message.split('\n')
-
-    for message in message_list:
-        # Add a new message to the list
-        MESSAGES.append(message)
-
-        # Update the message box with the latest messages
-        message_html = "<br>".join(MESSAGES)
-        MESSAGE_BOX.markdown(f"<div class='message-box'>{message_html}</div>", unsafe_allow_html=True)
+    JOB_PROGRESS = progress_callback
 
 
 def prints(what: str,
            term: str=None,
            journal: str=None,
            len_comments: int=None,
+           len_articles: int=None,
            date_article: datetime=None,
            title: str=None,
            date_init: datetime=None,
            date_end: datetime=None,
            search_terms: list=None,
            url: str=None,
-           current_page: int=None) -> None:
+           current_page: int=None,
+           skipped_pages: int=None,
+           probes: int=None,
+           wait_stats: list=None,
+           parse_stats: list=None,
+           fetch_stats: list=None,
+           frontier_stats: list=None,
+           cache_stats: dict=None) -> None:
     
     '''
     Function to print status updates to the standard output.
@@ -93,6 +61,12 @@ def prints(what: str,
         case 'term':
             message = f"--> SEARCHING TERM {term} ..."
 
+        case 'candidates':
+            message = f"--> {len_articles} DIFFERENT ARTICLES FOUND FOR ALL THE SEARCH TERMS. GETTING THEM..."
+
+        case 'watermark':
+            message = f"    Incremental crawl: looking for articles published after {date_init.strftime("%Y-%m-%d - %H:%M")}"
+
         case 'comments':
             if len_comments == 1:
                 message = f"       -{len_comments} comment"
@@ -114,6 +88,10 @@ def prints(what: str,
             message = "----------------------------------------------------------------------------------"
             message = message + f"\nThe articles had no comments."
 
+        case 'labeled':
+            message = "----------------------------------------------------------------------------------"
+            message = message + f"\n{len_comments} comments were labeled while crawling."
+
         case 'url':
             message = f"URL: {url} ..."
 
@@ -123,17 +101,82 @@ def prints(what: str,
         case 'loading_more_results':
             message = f"LOADING MORE RESULTS..."
 
-    if STREAMLIT:
+        case 'page_seek':
+            message = f"--> STARTING AT PAGE {current_page}: {skipped_pages} PAGES SKIPPED ({probes} PAGES PROBED)"
+
+        case 'resume_page':
+            message = f"--> RESUMING FROM THE CHECKPOINT AT PAGE {current_page}"
+
+        case 'resume_journal':
+            message = f"--> {names[journal].upper()} WAS ALREADY CRAWLED BEFORE THE CHECKPOINT"
+
+        case 'wait_stats':
+            message = "----------------------------------------------------------------------------------"
+            message = message + f"\nTime spent waiting for the pages:"
+            for line in wait_stats:
+                message = message + f"\n    - {line}"
+
+        case 'parse_stats':
+            message = "----------------------------------------------------------------------------------"
+            message = message + f"\nTime spent parsing the pages:"
+            for line in parse_stats:
+                message = message + f"\n    - {line}"
+
+        case 'fetch_stats':
+            message = "----------------------------------------------------------------------------------"
+            message = message + f"\nPages fetched with plain HTTP (static) and with the browser (dynamic):"
+            for line in fetch_stats:
+                message = message + f"\n    - {line}"
+
+        case 'frontier':
+            message = "----------------------------------------------------------------------------------"
+            message = message + f"\nStatic pages fetched per domain:"
+            for line in frontier_stats:
+                message = message + f"\n    - {line}"
+
+        case 'page_cache':
+            message = "----------------------------------------------------------------------------------"
+            message = message + f"\nPage cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, {cache_stats['misses']} misses"
+            message = message + f"\n    - {cache_stats['stored']} pages stored, {cache_stats['evicted']} evicted"
+            message = message + f" ({cache_stats['pages']} pages, {cache_stats['size_mb']:.1f} MB in the cache)"
+
+    print(message)
+
+    if JOB_PROGRESS:
+        JOB_PROGRESS(message)
+
+class SavedIds:
+    # Set of the article and comment ids already saved during a crawl.
+    # Journals can be crawled in parallel threads, so every access goes through a lock.
+
+    def __init__(self):
+
+        self.ids = set()
+        self.lock = threading.Lock()
+
+    def __contains__(self, id: str) -> bool:
+        with self.lock:
+            return id in self.ids
 
-        # captured_output = buffer.getvalue()
-        # print_scraping_update(captured_output)
-        # sys.stdout = sys.__stdout__
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.ids)
 
-        print_scraping_update(message)
+    def add(self, id: str) -> None:
+        with self.lock:
+            self.ids.add(id)
 
-    else:
+    def update(self, ids: list) -> None:
+        with self.lock:
+            self.ids.update(ids)
 
-        print(message)
+    def add_if_new(self, id: str) -> bool:
+        # We check and add the id in a single step, and return whether it was new
+        with self.lock:
+            if id in self.ids:
+                return False
+            self.ids.add(id)
+            return True
 
 def string_to_datetime(string: str, date_format: str, formatted: bool, multiple_formats: bool) -> datetime:
     # We convert the string that we obtained from the web into a datetime object.
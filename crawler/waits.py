@@ -0,0 +1,130 @@
+import threading
+import time as tme
+
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Maximum seconds we wait for a condition if the journal has no wait_timeout in sources_elements.csv
+DEFAULT_TIMEOUT = 15
+# Seconds between two checks of a condition
+POLL_FREQUENCY = 0.25
+
+class WaitStats:
+    # Duration of every wait of a crawl, grouped by journal and by what we waited for.
+    # Journals can be crawled in parallel threads, so every access goes through a lock.
+
+    def __init__(self):
+
+        self.waits = {}
+        self.lock = threading.Lock()
+
+    def record(self, journal: str, what: str, seconds: float, timed_out: bool) -> None:
+
+        with self.lock:
+            durations, timeouts = self.waits.get((journal, what), ([], 0))
+            durations.append(seconds)
+            self.waits[(journal, what)] = (durations, timeouts + int(timed_out))
+
+    def summary(self) -> list:
+
+        lines = []
+        with self.lock:
+            for (journal, what), (durations, timeouts) in sorted(self.waits.items()):
+                lines.append(f"{journal} - {what}: {len(durations)} waits, {sum(durations):.1f}s in total, "
+                             f"average {sum(durations) / len(durations):.2f}s, maximum {max(durations):.2f}s, {timeouts} timeouts")
+
+        return lines
+
+class Waits:
+    # Instead of sleeping a fixed time, we wait for a condition on the page (an element appears, goes stale,
+    # a number of elements changes...). We stop as soon as it's met, or after the journal's maximum timeout.
+
+    def __init__(self, crawler_instance):
+
+        # The crawler_instance has attributes driver, sources_elements and wait_stats
+        self.crawler = crawler_instance
+
+    def timeout(self, journal: str) -> float:
+
+        if 'wait_timeout' in self.crawler.sources_elements.columns and journal in self.crawler.sources_elements.index:
+            timeout = self.crawler.sources_elements.loc[journal, 'wait_timeout']
+            if timeout == timeout and timeout != '-':  # not NaN
+                return float(timeout)
+
+        return DEFAULT_TIMEOUT
+
+    def until(self, journal: str, what: str, condition, timeout: float = None):
+        # We return the result of the condition, or None if it wasn't met in time
+
+        timeout = timeout if timeout else self.timeout(journal)
+
+        start_time = tme.time()
+        try:
+            result = WebDriverWait(self.crawler.driver,
+                                   timeout,
+                                   poll_frequency=POLL_FREQUENCY,
+                                   ignored_exceptions=[StaleElementReferenceException]).until(condition)
+            timed_out = False
+        except TimeoutException:
+            result = None
+            timed_out = True
+
+        self.crawler.wait_stats.record(journal, what, tme.time() - start_time, timed_out)
+
+        return result
+
+    def presence(self, journal: str, what: str, by: str, loc: str):
+        return self.until(journal, what, EC.presence_of_element_located((by, loc)))
+
+    def clickable(self, journal: str, what: str, by: str, loc: str):
+        return self.until(journal, what, EC.element_to_be_clickable((by, loc)))
+
+    def staleness(self, journal: str, what: str, element) -> bool:
+        # The element was removed from the page (e.g. the page was replaced by the next one)
+        return self.until(journal, what, EC.staleness_of(element)) is not None
+
+    def count_changes(self, journal: str, what: str, by: str, loc: str, previous_count: int) -> bool:
+        # The number of elements found changed (e.g. more comments were loaded)
+        return self.until(journal, what, lambda driver: len(driver.find_elements(by, loc)) != previous_count) is not None
+
+    def loaded_more(self, journal: str, what: str, button, by: str, loc: str, previous_count: int) -> bool:
+        # After clicking a "Show more" button: the button disappeared or was replaced, or new elements were added
+        return self.until(journal, what, EC.any_of(EC.staleness_of(button),
+                                                   EC.invisibility_of_element(button),
+                                                   lambda driver: len(driver.find_elements(by, loc)) != previous_count)) is not None
+
+    def content_changes(self, journal: str, what: str, by: str, loc: str, previous_content: str) -> bool:
+        # The content of the element changed (e.g. a page turn that updates the list of articles in place)
+
+        def changed(driver):
+            elements = driver.find_elements(by, loc)
+            return bool(elements) and elements[0].get_attribute('innerHTML') != previous_content
+
+        return self.until(journal, what, changed) is not None
+
+    def stable_count(self, journal: str, what: str, by: str, loc: str) -> int:
+        # Elements loaded by JavaScript after the page: we wait until the page is loaded and their number
+        # stops changing between two checks. If there are none, we don't wait for the whole timeout.
+
+        counts = []
+
+        def stable(driver):
+            if driver.execute_script("return document.readyState") != 'complete':
+                return False
+            counts.append(len(driver.find_elements(by, loc)))
+            return len(counts) >= 2 and counts[-1] == counts[-2]
+
+        self.until(journal, what, stable)
+
+        return counts[-1] if counts else 0
+
+    def shadow_root(self, journal: str, what: str, by: str, loc: str) -> bool:
+        # The element's shadow DOM was rendered
+
+        def rendered(driver):
+            hosts = driver.find_elements(by, loc)
+            return bool(hosts) and driver.execute_script(
+                "return arguments[0].shadowRoot !== null && arguments[0].shadowRoot.innerHTML.length > 0;", hosts[0])
+
+        return self.until(journal, what, rendered) is not None
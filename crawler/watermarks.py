@@ -0,0 +1,75 @@
+import os
+import json
+from datetime import datetime
+
+import pandas as pd
+
+from crawler import utils
+
+class Watermarks:
+    # For an incremental crawl: the newest datetime_article already stored, per journal and search term.
+    # The next crawl of the same directory doesn't look for articles older than that.
+
+    def __init__(self, results_path: str, articles_filepath: str):
+
+        self.filepath = os.path.join(results_path, "watermarks.json")
+        self.articles_filepath = articles_filepath
+
+        self.marks = self.read()
+
+    def read(self) -> dict:
+
+        if os.path.isfile(self.filepath):
+            with open(self.filepath, 'r', encoding='utf-8') as file:
+                marks = json.load(file)
+            return {journal: {term: datetime.fromisoformat(mark) for term, mark in terms.items()} for journal, terms in marks.items()}
+
+        # A directory crawled before the incremental mode existed: we take the watermarks from the stored articles
+        if os.path.isfile(self.articles_filepath):
+            return self.newest(self.read_articles())
+
+        return {}
+
+    def read_articles(self) -> pd.DataFrame:
+        return pd.read_csv(self.articles_filepath, usecols=['id', 'journal', 'search_term', 'datetime_article'], dtype={'id': str}, parse_dates=['datetime_article'])
+
+    def newest(self, articles: pd.DataFrame) -> dict:
+        # {journal: {term: newest datetime_article}} of the articles
+
+        articles = articles.assign(search_term=articles['search_term'].str.split(utils.TERMS_SEPARATOR))
+        newest = articles.explode('search_term').groupby(['journal', 'search_term'])['datetime_article'].max()
+
+        marks = {}
+        for (journal, term), mark in newest.items():
+            marks.setdefault(journal, {})[term] = mark.to_pydatetime()
+        return marks
+
+    def get(self, journal: str, term: str) -> datetime:
+        return self.marks.get(journal, {}).get(term)
+
+    def date_init(self, journal: str, term: str, date_init: datetime) -> datetime:
+        # We start the search at the watermark, unless the requested interval starts later
+        mark = self.get(journal, term)
+        return max(date_init, mark) if mark else date_init
+
+    def update(self, article_ids) -> None:
+        # article_ids are the articles got by the crawl. Their rows are only in the results file (see crawler.writers.RowWriter),
+        # so it has to be written before.
+
+        if not article_ids or not os.path.isfile(self.articles_filepath):
+            return
+
+        articles = self.read_articles()
+        articles = articles[articles['id'].isin(set(article_ids))]
+
+        for journal, terms in self.newest(articles).items():
+            for term, date_article in terms.items():
+                mark = self.get(journal, term)
+                if mark is None or date_article > mark:
+                    self.marks.setdefault(journal, {})[term] = date_article
+
+    def write(self) -> None:
+
+        marks = {journal: {term: mark.isoformat() for term, mark in terms.items()} for journal, terms in self.marks.items()}
+        with open(self.filepath, 'w', encoding='utf-8') as file:
+            json.dump(marks, file, indent=2, ensure_ascii=False)
@@ -0,0 +1,171 @@
+import os
+import csv
+import threading
+import time as tme
+from datetime import datetime
+
+from config import RESULTS_FLUSH_ROWS, RESULTS_FLUSH_INTERVAL, RESULTS_COLUMNAR_FORMAT
+
+# pyarrow is optional: it's only needed for the columnar copy of the results
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+def define_columnar_format(columnar_format: str) -> str:
+    # We return the columnar format to write, or None if it isn't available
+
+    if columnar_format == 'parquet' and pa is None:
+        print("pyarrow is not installed, the results are only stored as csv")
+        return None
+    if columnar_format not in (None, 'parquet'):
+        print(f"Unknown columnar format {columnar_format}, the results are only stored as csv")
+        return None
+
+    return columnar_format
+
+class RowWriter:
+    # Appends the rows of a results file (articles or comments) while the crawl runs, instead of storing them all at the end.
+    # The rows are buffered and written every RESULTS_FLUSH_ROWS rows or RESULTS_FLUSH_INTERVAL seconds, so the memory
+    # doesn't grow with the crawl and the file can be watched while it runs.
+    # With RESULTS_COLUMNAR_FORMAT = "parquet", each flush is also written as a row group of <filepath>_parquet/part-<date>.parquet.
+    # Journals can be crawled in parallel threads, so every access goes through a lock.
+
+    def __init__(self,
+                 filepath: str,
+                 index_label: str,
+                 headers: list,
+                 types: dict = None,
+                 append: bool = False,
+                 flush_rows: int = RESULTS_FLUSH_ROWS,
+                 flush_interval: float = RESULTS_FLUSH_INTERVAL,
+                 columnar_format: str = RESULTS_COLUMNAR_FORMAT):
+
+        # filepath without the extension
+        self.filepath = filepath
+        self.index_label = index_label
+        self.headers = headers
+        # Type of the columns that aren't strings, for the columnar copy: 'datetime' or 'int'
+        self.types = types if types else {}
+        # If the file exists, we append to it (incremental or resumed crawl) instead of overwriting it
+        self.append = append
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.columnar_format = define_columnar_format(columnar_format)
+
+        self.buffer = []
+        self.rows = 0
+        self.last_flush = tme.time()
+        self.lock = threading.Lock()
+
+        # The files are only opened with the first row, so a crawl without results doesn't leave empty files
+        self.file = None
+        self.csv_writer = None
+        self.appended = False
+        self.columnar_writer = None
+
+    @property
+    def csv_path(self) -> str:
+        return f"{self.filepath}.csv"
+
+    @property
+    def columnar_path(self) -> str:
+        return f"{self.filepath}_{self.columnar_format}"
+
+    def write(self, id: str, row: list) -> None:
+
+        with self.lock:
+            self.buffer.append([id] + list(row))
+            self.rows += 1
+
+            if len(self.buffer) >= self.flush_rows or tme.time() - self.last_flush >= self.flush_interval:
+                self.flush_buffer()
+
+    def flush(self) -> None:
+        with self.lock:
+            self.flush_buffer()
+
+    def flush_buffer(self) -> None:
+
+        if self.buffer:
+            if self.file is None:
+                self.open()
+
+            self.csv_writer.writerows(self.buffer)
+            self.file.flush()
+
+            if self.columnar_format:
+                self.write_columnar(self.buffer)
+
+            self.buffer = []
+
+        self.last_flush = tme.time()
+
+    def open(self) -> None:
+
+        self.appended = self.append and os.path.exists(self.csv_path)
+
+        # Same format as the results stored with pandas: comma separated, quoted only when needed
+        self.file = open(self.csv_path, 'a' if self.appended else 'w', newline='', encoding='utf-8')
+        self.csv_writer = csv.writer(self.file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+        if not self.appended:
+            self.csv_writer.writerow([self.index_label] + self.headers)
+
+        if self.columnar_format:
+            self.open_columnar()
+
+    # -- Columnar copy --
+    def schema(self):
+
+        fields = []
+        for column in [self.index_label] + self.headers:
+            match self.types.get(column):
+                case 'datetime':
+                    fields.append(pa.field(column, pa.timestamp('us')))
+                case 'int':
+                    fields.append(pa.field(column, pa.int64()))
+                case _:
+                    fields.append(pa.field(column, pa.string()))
+
+        return pa.schema(fields)
+
+    def open_columnar(self) -> None:
+        # Parquet files can't be appended to, so every run writes its own part of the dataset.
+        # pandas.read_parquet(<filepath>_parquet) reads every part together.
+
+        os.makedirs(self.columnar_path, exist_ok=True)
+        if not self.appended:
+            for filename in os.listdir(self.columnar_path):
+                if filename.startswith('part-'):
+                    os.remove(os.path.join(self.columnar_path, filename))
+
+        part_path = os.path.join(self.columnar_path, f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}.parquet")
+        self.columnar_writer = pq.ParquetWriter(part_path, self.schema())
+
+    def columnar_value(self, column: str, value):
+        # Missing values ('' in the csv, e.g. a comment without a date) are nulls
+
+        match self.types.get(column):
+            case 'datetime':
+                return value if isinstance(value, datetime) else None
+            case 'int':
+                return int(value) if value not in ('', None) else None
+            case _:
+                return str(value) if value is not None else None
+
+    def write_columnar(self, rows: list) -> None:
+
+        columns = [self.index_label] + self.headers
+        data = {column: [self.columnar_value(column, row[i]) for row in rows] for i, column in enumerate(columns)}
+        self.columnar_writer.write_table(pa.table(data, schema=self.schema()))
+
+    def close(self) -> None:
+
+        with self.lock:
+            self.flush_buffer()
+
+            if self.file is not None:
+                self.file.close()
+            if self.columnar_writer is not None:
+                self.columnar_writer.close()
@@ -0,0 +1,18 @@
+from inference import registry as inference_registry
+from inference import onnx_backend
+from inference import quantization
+
+def load_model(registry: inference_registry.ModelRegistry, backend: str):
+    # We use the ONNX Runtime or int8 model if it's selected and available, and the torch model otherwise
+
+    if backend == 'onnx':
+        onnx_model = onnx_backend.get_model(registry)
+        if onnx_model is not None:
+            return onnx_model, registry.get_tokenizer()
+
+    if backend == 'int8':
+        int8_model = quantization.get_model(registry)
+        if int8_model is not None:
+            return int8_model, registry.get_tokenizer()
+
+    return registry.get()
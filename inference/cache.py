@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import hashlib
+import time as tme
+from contextlib import closing
+
+import numpy as np
+
+from config import PREDICTION_CACHE_PATH, PREDICTION_CACHE_MAX_ENTRIES
+
+class PredictionCache:
+
+    def __init__(self, path: str = PREDICTION_CACHE_PATH, max_entries: int = PREDICTION_CACHE_MAX_ENTRIES):
+
+        self.path = path
+        self.max_entries = max_entries
+
+        # SQLite limits the number of parameters in a single query
+        self.chunk_size = 500
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.create_table()
+
+    def connect(self) -> sqlite3.Connection:
+        # A new connection for every operation, so the cache can be used from any Streamlit thread or worker process
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create_table(self) -> None:
+
+        with closing(self.connect()) as connection, connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    model_hash TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    label_code INTEGER NOT NULL,
+                    logits BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model_hash, text_hash)
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+
+    def text_hash(self, text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model_hash: str, texts: list) -> dict:
+        # We return a dictionary {position in texts: (label_code, logits)} with every text that is already stored.
+
+        hashes = [self.text_hash(text) for text in texts]
+        unique_hashes = list(dict.fromkeys(hashes))
+        found = {}
+
+        with closing(self.connect()) as connection, connection:
+            for start in range(0, len(unique_hashes), self.chunk_size):
+                chunk = unique_hashes[start:start + self.chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                rows = connection.execute(f"SELECT text_hash, label_code, logits FROM predictions "
+                                          f"WHERE model_hash = ? AND text_hash IN ({placeholders})",
+                                          [model_hash] + chunk).fetchall()
+                for text_hash, label_code, logits in rows:
+                    found[text_hash] = (label_code, np.frombuffer(logits, dtype=np.float32))
+
+                # We mark the entries we've found as recently used, so they are the last ones to be evicted
+                hits = [(tme.time(), model_hash, text_hash) for text_hash, _, _ in rows]
+                connection.executemany("UPDATE predictions SET last_used = ? WHERE model_hash = ? AND text_hash = ?", hits)
+
+        return {i: found[text_hash] for i, text_hash in enumerate(hashes) if text_hash in found}
+
+    def put_many(self, model_hash: str, texts: list, label_codes: np.ndarray, logits: np.ndarray) -> None:
+
+        now = tme.time()
+        rows = [(model_hash,
+                 self.text_hash(text),
+                 int(label_code),
+                 np.asarray(text_logits, dtype=np.float32).tobytes(),
+                 now) for text, label_code, text_logits in zip(texts, label_codes, logits)]
+
+        with closing(self.connect()) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)", rows)
+
+        self.evict()
+
+    def evict(self) -> None:
+        # We delete the least recently used predictions once we're over the size bound
+
+        with closing(self.connect()) as connection, connection:
+            count = connection.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            if count > self.max_entries:
+                connection.execute("""
+                    DELETE FROM predictions WHERE rowid IN (
+                        SELECT rowid FROM predictions ORDER BY last_used ASC LIMIT ?
+                    )
+                """, (count - self.max_entries,))
@@ -0,0 +1,75 @@
+import numpy as np
+import torch
+
+from config import MAX_LENGTH, BATCH_SIZE
+
+LABELS = {
+    0: 'positive',
+    1: 'neutral',
+    2: 'negative',
+    3: 'very-negative'
+}
+
+class BatchedInference:
+
+    def __init__(self, model, tokenizer, batch_size: int = BATCH_SIZE, max_length: int = MAX_LENGTH):
+
+        self.model = model
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    def tokenize(self, texts: list):
+        # We tokenize every text once, without padding, truncating to the length the model was trained with.
+        # Padding is done later for each batch, only up to the longest sequence in that batch.
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = np.array([len(input_ids) for input_ids in encodings['input_ids']])
+
+        return encodings, lengths
+
+    def define_batches(self, lengths: np.ndarray) -> list:
+        # We sort the texts by token length so that each batch holds sequences of similar size
+        # and we don't waste computation on padding tokens.
+        order = np.argsort(lengths, kind='stable')
+        return [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+
+    def pad_batch(self, encodings, batch: np.ndarray):
+
+        features = [{key: encodings[key][i] for key in encodings.keys()} for i in batch]
+        return self.tokenizer.pad(features, padding='longest', return_tensors="pt")
+
+    def predict_logits(self, texts: list, progress_callback=None) -> np.ndarray:
+        # We return the logits of every text, in the same order as the texts were given.
+        # progress_callback(done, total) is called after every batch.
+
+        len_texts = len(texts)
+        num_labels = self.model.config.num_labels
+        logits = np.empty((len_texts, num_labels), dtype=np.float32)
+
+        if len_texts == 0:
+            return logits
+
+        encodings, lengths = self.tokenize(texts)
+
+        # Set the model to evaluation mode (necessary for inference)
+        self.model.eval()
+
+        done = 0
+        with torch.inference_mode():
+            for batch in self.define_batches(lengths):
+                inputs = self.pad_batch(encodings, batch)
+                logits[batch] = self.model(**inputs).logits.float().numpy()
+
+                done += len(batch)
+                if progress_callback:
+                    progress_callback(done, len_texts)
+
+        return logits
+
+    def predict(self, texts: list, progress_callback=None):
+        # We return the label codes and the logits of every text as whole vectors
+
+        logits = self.predict_logits(texts, progress_callback)
+        label_codes = logits.argmax(axis=1)
+
+        return label_codes, logits
@@ -0,0 +1,55 @@
+import os
+import io
+import resource
+import time as tme
+
+import numpy as np
+import pandas as pd
+import torch
+
+from inference import engine as inference_engine
+
+from config import REPO_PATH
+
+LABELED_SUBSET_PATH = os.path.join(REPO_PATH, "fine-tuning-model", "manual-labeling", "comments_subset_labeled.tsv")
+
+def load_labeled_subset(path: str = LABELED_SUBSET_PATH):
+    # We return the input texts of the manually labeled comments and their label codes
+
+    subset = pd.read_csv(path, sep='\t')
+
+    texts = [f"[ARTICLE TITLE] {title} [COMMENT] {content}"
+             for title, content in zip(subset['article_title'], subset['comment_content'])]
+
+    label_codes = {label: code for code, label in inference_engine.LABELS.items()}
+    true_codes = subset['label'].map(label_codes).to_numpy()
+
+    return texts, true_codes
+
+def agreement(label_codes_a: np.ndarray, label_codes_b: np.ndarray) -> float:
+    # Fraction of texts that get the same label with both models
+    return float(np.mean(np.asarray(label_codes_a) == np.asarray(label_codes_b)))
+
+def accuracy(label_codes: np.ndarray, true_codes: np.ndarray) -> float:
+    return float(np.mean(np.asarray(label_codes) == np.asarray(true_codes)))
+
+def timed_predict(model, tokenizer, texts: list):
+    # We return the label codes and the throughput of the model (comments per second)
+
+    start_time = tme.time()
+    label_codes, _ = inference_engine.BatchedInference(model, tokenizer).predict(texts)
+    elapsed = tme.time() - start_time
+
+    return label_codes, len(texts) / elapsed
+
+def peak_memory_mb() -> float:
+    # Peak resident memory of the process (ru_maxrss is in kB on Linux)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def weights_size_mb(model) -> float:
+    # Size of the serialized weights, not the memory the model takes while running (see quantization.memory_mb).
+    # Quantized Linear layers keep their weights in packed parameters that are not listed in model.parameters(),
+    # so we measure the state_dict instead.
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
@@ -0,0 +1,131 @@
+import numpy as np
+
+from inference import engine as inference_engine
+from inference import registry as inference_registry
+from inference import cache as inference_cache
+from inference import quantization
+from inference import backends
+from inference import sharding
+
+from config import MODEL_PATH, BATCH_SIZE, MAX_LENGTH, INFERENCE_BACKEND, INFERENCE_WORKERS, THREADS_PER_WORKER
+
+class Labeler:
+    # With several workers, the worker processes are kept between calls to predict(...): close() stops them
+    # (or use the labeler in a with statement)
+
+    def __init__(self,
+                 model_path: str = MODEL_PATH,
+                 batch_size: int = BATCH_SIZE,
+                 max_length: int = MAX_LENGTH,
+                 use_cache: bool = True,
+                 backend: str = INFERENCE_BACKEND,
+                 workers: int = INFERENCE_WORKERS,
+                 threads_per_worker: int = THREADS_PER_WORKER):
+
+        self.registry = inference_registry.get_registry(model_path)
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+
+        self.cache = inference_cache.PredictionCache() if use_cache else None
+
+        # Counters of the last call to predict(...)
+        self.cache_hits = 0
+        self.predicted = 0
+
+        # inference.sharding.ShardedInference, started the first time we need it
+        self.sharded = None
+
+    def close(self) -> None:
+
+        if self.sharded is not None:
+            self.sharded.close()
+            self.sharded = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load_model(self):
+        return backends.load_model(self.registry, self.backend)
+
+    def cache_key(self) -> str:
+        # The int8 model can give different labels than the fp32 one, so its predictions are cached separately.
+        # The ONNX model gives the same labels as torch and shares its predictions.
+        model_hash = self.registry.model_hash()
+        if self.backend == 'int8' and quantization.is_available(self.registry):
+            return f"{model_hash}-int8"
+
+        return model_hash
+
+    def run_model(self, texts: list, progress_callback=None):
+
+        # With several workers, the texts are split in shards and labeled in separate processes
+        if self.workers > 1 and len(texts) > self.batch_size:
+            if self.sharded is None:
+                self.sharded = sharding.ShardedInference(self.registry.model_path,
+                                                         self.backend,
+                                                         self.workers,
+                                                         self.batch_size,
+                                                         self.max_length,
+                                                         self.threads_per_worker)
+            return self.sharded.predict(texts, len(inference_engine.LABELS), progress_callback)
+
+        model, tokenizer = self.load_model()
+        engine = inference_engine.BatchedInference(model, tokenizer, batch_size=self.batch_size, max_length=self.max_length)
+
+        return engine.predict(texts, progress_callback)
+
+    def predict(self, texts: list, progress_callback=None):
+        # We return the label codes and logits of every text, in the same order as the texts were given.
+        # Texts that were already labeled by the same model are taken from the cache, and only the rest go through the model.
+
+        len_texts = len(texts)
+
+        if self.cache is None:
+            self.cache_hits, self.predicted = 0, len_texts
+            return self.run_model(texts, progress_callback)
+
+        model_hash = self.cache_key()
+        cached = self.cache.get_many(model_hash, texts)
+        missing = [i for i in range(len_texts) if i not in cached]
+
+        self.cache_hits = len(cached)
+        self.predicted = len(missing)
+
+        label_codes = np.empty(len_texts, dtype=np.int64)
+        logits = None
+
+        if cached:
+            cached_positions = list(cached.keys())
+            cached_logits = np.stack([cached[i][1] for i in cached_positions])
+            logits = np.empty((len_texts, cached_logits.shape[1]), dtype=np.float32)
+            label_codes[cached_positions] = [cached[i][0] for i in cached_positions]
+            logits[cached_positions] = cached_logits
+
+        if progress_callback and cached:
+            progress_callback(len(cached), len_texts)
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            # The progress of the model is reported on top of the texts we already had
+            callback = None
+            if progress_callback:
+                callback = lambda done, total: progress_callback(len(cached) + done, len_texts)
+
+            missing_codes, missing_logits = self.run_model(missing_texts, callback)
+            self.cache.put_many(model_hash, missing_texts, missing_codes, missing_logits)
+
+            if logits is None:
+                logits = np.empty((len_texts, missing_logits.shape[1]), dtype=np.float32)
+            label_codes[missing] = missing_codes
+            logits[missing] = missing_logits
+
+        if logits is None:
+            logits = np.empty((0, len(inference_engine.LABELS)), dtype=np.float32)
+
+        return label_codes, logits
@@ -0,0 +1,184 @@
+import argparse
+import os
+import sys
+import json
+import threading
+import time as tme
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    # onnxruntime is optional: without it, we always run the torch model
+    ort = None
+
+from inference import engine as inference_engine
+from inference import registry as inference_registry
+from inference import evaluation
+
+from config import MODEL_PATH, ONNX_MODEL_PATH, ONNX_INTRA_OP_THREADS, ONNX_INTER_OP_THREADS
+
+INPUT_NAMES = ['input_ids', 'attention_mask', 'token_type_ids']
+
+class LogitsOnly(torch.nn.Module):
+    # The exported graph only needs the logits of BertForSequenceClassification
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids).logits
+
+class OnnxModel:
+    # We wrap the ONNX Runtime session so BatchedInference can use it exactly like the torch model
+
+    def __init__(self, session, num_labels: int):
+
+        self.session = session
+        self.config = SimpleNamespace(num_labels=num_labels)
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+
+        feed = {name: inputs[name].numpy().astype(np.int64) for name in INPUT_NAMES}
+        logits = self.session.run(['logits'], feed)[0]
+
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+def metadata_path(onnx_path: str) -> str:
+    return f"{os.path.splitext(onnx_path)[0]}.json"
+
+def session_options(intra_op_threads: int = ONNX_INTRA_OP_THREADS, inter_op_threads: int = ONNX_INTER_OP_THREADS):
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+
+    return options
+
+# Sessions are expensive to create, so we keep one per exported file and thread settings in the process
+SESSIONS = {}
+SESSIONS_LOCK = threading.Lock()
+
+def get_model(registry: inference_registry.ModelRegistry,
+              onnx_path: str = ONNX_MODEL_PATH,
+              intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+              inter_op_threads: int = ONNX_INTER_OP_THREADS) -> OnnxModel:
+    # We return the ONNX model, or None if it can't be used (the caller then falls back to torch)
+
+    if ort is None:
+        print("onnxruntime is not installed. Falling back to the torch model.", file=sys.stderr)
+        return None
+
+    if not os.path.isfile(onnx_path) or not os.path.isfile(metadata_path(onnx_path)):
+        print(f"No ONNX model found in {onnx_path}. Falling back to the torch model.", file=sys.stderr)
+        return None
+
+    with open(metadata_path(onnx_path), 'r') as file:
+        metadata = json.load(file)
+
+    # The ONNX model is stale if it was exported from other weights than the ones currently in the model directory
+    if metadata['model_hash'] != registry.model_hash():
+        print(f"The ONNX model in {onnx_path} is stale. Falling back to the torch model.", file=sys.stderr)
+        return None
+
+    key = (onnx_path, os.stat(onnx_path).st_mtime_ns, intra_op_threads, inter_op_threads)
+
+    with SESSIONS_LOCK:
+        if key not in SESSIONS:
+            start_time = tme.time()
+            session = ort.InferenceSession(onnx_path,
+                                           session_options(intra_op_threads, inter_op_threads),
+                                           providers=['CPUExecutionProvider'])
+            SESSIONS[key] = OnnxModel(session, metadata['num_labels'])
+            print(f"ONNX model loaded from {onnx_path} in {tme.time() - start_time:.3f}s", file=sys.stderr)
+
+        return SESSIONS[key]
+
+def export(model_path: str = MODEL_PATH, onnx_path: str = ONNX_MODEL_PATH, opset: int = 17) -> None:
+    # We export the fine-tuned model to ONNX, and let ONNX Runtime save an optimized version of the graph
+
+    registry = inference_registry.get_registry(model_path)
+    model, tokenizer = registry.get()
+
+    os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+    raw_onnx_path = f"{os.path.splitext(onnx_path)[0]}.raw.onnx"
+
+    dummy_inputs = tokenizer(["[ARTICLE TITLE] Andorra [COMMENT] Exemple"], return_tensors="pt")
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in INPUT_NAMES}
+    dynamic_axes['logits'] = {0: 'batch'}
+
+    start_time = tme.time()
+    torch.onnx.export(LogitsOnly(model),
+                      tuple(dummy_inputs[name] for name in INPUT_NAMES),
+                      raw_onnx_path,
+                      input_names=INPUT_NAMES,
+                      output_names=['logits'],
+                      dynamic_axes=dynamic_axes,
+                      opset_version=opset,
+                      dynamo=False)
+
+    # Saving the optimized graph: extended optimizations are the ones that don't depend on the current machine
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = onnx_path
+    ort.InferenceSession(raw_onnx_path, options, providers=['CPUExecutionProvider'])
+    os.remove(raw_onnx_path)
+
+    with open(metadata_path(onnx_path), 'w') as file:
+        json.dump({
+            'model_hash': registry.model_hash(),
+            'num_labels': model.config.num_labels,
+            'opset': opset,
+            'exported_at': datetime.now().isoformat()
+        }, file, indent=2)
+
+    print(f"ONNX model exported to {onnx_path} in {tme.time() - start_time:.3f}s")
+
+def check(model_path: str = MODEL_PATH, onnx_path: str = ONNX_MODEL_PATH) -> float:
+    # We label the manually labeled subset with both backends and check that they agree
+
+    registry = inference_registry.get_registry(model_path)
+    texts, _ = evaluation.load_labeled_subset()
+
+    model, tokenizer = registry.get()
+    torch_codes, _ = inference_engine.BatchedInference(model, tokenizer).predict(texts)
+
+    onnx_model = get_model(registry, onnx_path)
+    if onnx_model is None:
+        return 0.0
+    onnx_codes, _ = inference_engine.BatchedInference(onnx_model, tokenizer).predict(texts)
+
+    agreement = evaluation.agreement(torch_codes, onnx_codes)
+    print(f"Label agreement between torch and ONNX on {len(texts)} comments: {agreement:.2%}")
+
+    return agreement
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Export the fine-tuned model to an optimized ONNX graph.")
+    parser.add_argument('--model', type=str, default=MODEL_PATH, help="Directory of the fine-tuned model")
+    parser.add_argument('--output', type=str, default=ONNX_MODEL_PATH, help="Path of the exported .onnx file")
+    parser.add_argument('--opset', type=int, default=17, help="ONNX opset version")
+    parser.add_argument('--no-check', action='store_true', help="Don't compare the labels of both backends after exporting")
+
+    args = parser.parse_args()
+
+    if ort is None:
+        print("onnxruntime is required to export the model (pip install onnxruntime onnx).")
+        return
+
+    export(args.model, args.output, args.opset)
+    if not args.no_check:
+        check(args.model, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import queue
+import threading
+import traceback
+import time as tme
+
+import pandas as pd
+
+import analyze
+from inference import engine as inference_engine
+from inference import labeler as inference_labeler
+
+from config import STREAMING_QUEUE_SIZE, STREAMING_MICRO_BATCH, STREAMING_MAX_WAIT
+
+class StreamingLabeler:
+    # Labels comments in a background thread while the crawl is still running.
+    # The crawler submits every new comment, and they are labeled in micro-batches and appended to comments_labeled.csv
+
+    def __init__(self,
+                 results_path: str,
+                 comments_headers: list,
+                 labeler: inference_labeler.Labeler = None,
+                 queue_size: int = STREAMING_QUEUE_SIZE,
+                 micro_batch: int = STREAMING_MICRO_BATCH,
+                 max_wait: float = STREAMING_MAX_WAIT):
+
+        self.labeled_dataset = analyze.LabeledDataset(results_path)
+        # We only close the labeler if we created it
+        self.own_labeler = labeler is None
+        self.labeler = labeler if labeler else inference_labeler.Labeler()
+
+        self.columns = ['comment_id'] + comments_headers + ['search_term', 'article_title', 'input_text']
+        self.micro_batch = micro_batch
+        self.max_wait = max_wait
+
+        # The queue is bounded: if the model can't keep up, the crawler waits instead of filling the memory
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self.already_labeled = self.get_already_labeled()
+
+        self.len_labeled = 0
+        self.len_predicted = 0
+        self.errors = 0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def get_already_labeled(self) -> set:
+        # If the directory already has labels (e.g. a re-crawl), we only label the new comments
+
+        if not self.labeled_dataset.exists():
+            self.header = True
+            return set()
+
+        labeled = self.labeled_dataset.read()
+        # We rewrite the file in case it was stored in the old format, so we can append to it
+        self.labeled_dataset.write(labeled)
+        self.header = False
+        self.file_columns = list(labeled.columns)
+
+        return set(labeled['comment_id'])
+
+    def submit(self, comment_id: str, comment: list, title: str, term: str) -> None:
+
+        if comment_id in self.already_labeled:
+            return
+
+        input_text = f"[ARTICLE TITLE] {title} [COMMENT] {comment[4]}"
+        self.queue.put([comment_id] + list(comment) + [term, title, input_text])
+
+    def next_micro_batch(self):
+        # We wait for a first comment and then gather whatever is queued, up to micro_batch comments
+        # or max_wait seconds. We return the batch and whether the crawl has finished.
+
+        first = self.queue.get()
+        if first is None:
+            return [], True
+
+        items = [first]
+        deadline = tme.time() + self.max_wait
+        while len(items) < self.micro_batch:
+            try:
+                item = self.queue.get(timeout=max(0, deadline - tme.time()))
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+
+        return items, False
+
+    def label_items(self, items: list) -> None:
+
+        comments = pd.DataFrame(items, columns=self.columns)
+
+        label_codes, _ = self.labeler.predict(comments['input_text'].tolist())
+        comments['predicted_label_code'] = label_codes
+        comments['predicted_label'] = comments['predicted_label_code'].map(inference_engine.LABELS)
+
+        if not self.header:
+            comments = comments.reindex(columns=self.file_columns)
+        self.labeled_dataset.append(comments, header=self.header)
+        if self.header:
+            self.header = False
+            self.file_columns = list(comments.columns)
+
+        self.len_labeled += len(comments)
+        self.len_predicted += self.labeler.predicted
+
+    def run(self) -> None:
+
+        finished = False
+        while not finished:
+            items, finished = self.next_micro_batch()
+            if items:
+                try:
+                    self.label_items(items)
+                except Exception:
+                    # A labeling error must never stop the crawl: those comments can be labeled later on
+                    self.errors += len(items)
+                    traceback.print_exc()
+
+    def close(self) -> None:
+        # We signal the end of the crawl and wait for the queued comments to be labeled
+        self.queue.put(None)
+        self.thread.join()
+
+        if self.own_labeler:
+            self.labeler.close()
@@ -0,0 +1,169 @@
+import argparse
+import os
+import sys
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import time as tme
+from datetime import datetime
+
+import torch
+from torch.ao.quantization import quantize_dynamic
+from transformers import BertConfig, BertForSequenceClassification
+
+from inference import registry as inference_registry
+from inference import evaluation
+
+from config import MODEL_PATH, INT8_MODEL_PATH, BATCH_SIZE
+
+def metadata_path(int8_path: str) -> str:
+    return f"{os.path.splitext(int8_path)[0]}.json"
+
+def quantize(model):
+    # Nearly all the computation of BERT is in its Linear layers: we store their weights as int8
+    # and quantize the activations on the fly
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def build(model_path: str = MODEL_PATH, int8_path: str = INT8_MODEL_PATH) -> None:
+
+    registry = inference_registry.get_registry(model_path)
+
+    start_time = tme.time()
+    # We quantize a new copy, so the fp32 model in the registry stays untouched
+    int8_model = quantize(BertForSequenceClassification.from_pretrained(model_path).eval())
+
+    os.makedirs(os.path.dirname(int8_path), exist_ok=True)
+    torch.save(int8_model.state_dict(), int8_path)
+
+    with open(metadata_path(int8_path), 'w') as file:
+        json.dump({
+            'model_hash': registry.model_hash(),
+            'built_at': datetime.now().isoformat()
+        }, file, indent=2)
+
+    print(f"int8 model stored in {int8_path} in {tme.time() - start_time:.3f}s")
+
+def is_available(registry: inference_registry.ModelRegistry, int8_path: str = INT8_MODEL_PATH) -> bool:
+    # The int8 model can be used if it was built from the weights currently in the model directory
+
+    if not os.path.isfile(int8_path) or not os.path.isfile(metadata_path(int8_path)):
+        return False
+
+    with open(metadata_path(int8_path), 'r') as file:
+        metadata = json.load(file)
+
+    return metadata['model_hash'] == registry.model_hash()
+
+# Quantized models loaded in the process, one per stored file
+MODELS = {}
+MODELS_LOCK = threading.Lock()
+
+def get_model(registry: inference_registry.ModelRegistry, int8_path: str = INT8_MODEL_PATH):
+    # We return the int8 model, or None if it can't be used (the caller then falls back to torch fp32)
+
+    if not is_available(registry, int8_path):
+        print(f"No up to date int8 model found in {int8_path}. Falling back to the fp32 model.", file=sys.stderr)
+        return None
+
+    key = (int8_path, os.stat(int8_path).st_mtime_ns)
+
+    with MODELS_LOCK:
+        if key not in MODELS:
+            start_time = tme.time()
+            # We rebuild the structure of the quantized model from the config (without reading the fp32 weights)
+            # and load the stored int8 weights into it. The file only has tensors, so it's read without unpickling objects.
+            config = BertConfig.from_pretrained(registry.model_path)
+            model = quantize(BertForSequenceClassification(config).eval())
+            model.load_state_dict(torch.load(int8_path, weights_only=True))
+            MODELS[key] = model.eval()
+            print(f"int8 model loaded from {int8_path} in {tme.time() - start_time:.3f}s", file=sys.stderr)
+
+        return MODELS[key]
+
+def memory_worker(model_path: str, int8_path: str, quantized: bool, texts: list) -> float:
+    # Runs in its own process, so the memory of one model isn't mixed with the other one.
+    # We return how much the peak resident memory grew to load the model and label the texts (one batch).
+
+    start_memory = evaluation.peak_memory_mb()
+
+    registry = inference_registry.get_registry(model_path)
+    if quantized:
+        model, tokenizer = get_model(registry, int8_path), registry.get_tokenizer()
+    else:
+        model, tokenizer = registry.get()
+
+    evaluation.timed_predict(model, tokenizer, texts)
+
+    return evaluation.peak_memory_mb() - start_memory
+
+def memory_mb(model_path: str, int8_path: str, quantized: bool, texts: list) -> float:
+    # Workers are started with spawn, so they don't inherit the memory of the models already loaded here
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(memory_worker, model_path, int8_path, quantized, texts).result()
+
+def check(model_path: str = MODEL_PATH,
+          int8_path: str = INT8_MODEL_PATH,
+          max_accuracy_drop: float = 0.02,
+          min_agreement: float = 0.95) -> bool:
+    # We run the fp32 and int8 models on the manually labeled subset and compare them.
+    # The int8 model is safe to deploy if it agrees with fp32 and doesn't lose more accuracy than allowed.
+
+    registry = inference_registry.get_registry(model_path)
+    texts, true_codes = evaluation.load_labeled_subset()
+
+    fp32_model, tokenizer = registry.get()
+    int8_model = get_model(registry, int8_path)
+    if int8_model is None:
+        return False
+
+    fp32_codes, fp32_throughput = evaluation.timed_predict(fp32_model, tokenizer, texts)
+    int8_codes, int8_throughput = evaluation.timed_predict(int8_model, tokenizer, texts)
+
+    fp32_accuracy = evaluation.accuracy(fp32_codes, true_codes)
+    int8_accuracy = evaluation.accuracy(int8_codes, true_codes)
+    agreement = evaluation.agreement(fp32_codes, int8_codes)
+    accuracy_delta = int8_accuracy - fp32_accuracy
+
+    print(f"Comments evaluated:  {len(texts)}")
+    print(f"Label agreement:     {agreement:.2%}")
+    print(f"Accuracy fp32:       {fp32_accuracy:.2%}")
+    print(f"Accuracy int8:       {int8_accuracy:.2%} ({accuracy_delta:+.2%})")
+    print(f"Throughput fp32:     {fp32_throughput:.1f} comments/s")
+    print(f"Throughput int8:     {int8_throughput:.1f} comments/s ({int8_throughput / fp32_throughput:.2f}x)")
+    print(f"Weights size fp32:   {evaluation.weights_size_mb(fp32_model):.1f} MB")
+    print(f"Weights size int8:   {evaluation.weights_size_mb(int8_model):.1f} MB")
+    print(f"Memory fp32:         {memory_mb(model_path, int8_path, False, texts[:BATCH_SIZE]):.1f} MB (loading and labeling {BATCH_SIZE} comments)")
+    print(f"Memory int8:         {memory_mb(model_path, int8_path, True, texts[:BATCH_SIZE]):.1f} MB (loading and labeling {BATCH_SIZE} comments)")
+
+    safe = agreement >= min_agreement and -accuracy_delta <= max_accuracy_drop
+    if safe:
+        print("--> The int8 model is safe to deploy.")
+    else:
+        print(f"--> The int8 model is NOT safe to deploy (minimum agreement {min_agreement:.0%}, "
+              f"maximum accuracy drop {max_accuracy_drop:.0%}).")
+
+    return safe
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Build and check a dynamically quantized (int8) version of the fine-tuned model.")
+    parser.add_argument('--model', type=str, default=MODEL_PATH, help="Directory of the fine-tuned model")
+    parser.add_argument('--output', type=str, default=INT8_MODEL_PATH, help="Path of the stored int8 weights")
+    parser.add_argument('--check-only', action='store_true', help="Don't build the model, only compare the existing one with fp32")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.02, help="Maximum accepted accuracy loss (0.02 = 2 points)")
+    parser.add_argument('--min-agreement', type=float, default=0.95, help="Minimum fraction of comments with the same label")
+
+    args = parser.parse_args()
+
+    if not args.check_only:
+        build(args.model, args.output)
+
+    safe = check(args.model, args.output, args.max_accuracy_drop, args.min_agreement)
+    if not safe:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
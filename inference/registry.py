@@ -0,0 +1,108 @@
+import os
+import hashlib
+import threading
+import time as tme
+
+from transformers import BertTokenizer, BertForSequenceClassification
+
+from config import MODEL_PATH
+
+class ModelRegistry:
+
+    def __init__(self, model_path: str = MODEL_PATH):
+
+        self.model_path = model_path
+
+        self.model = None
+        self.tokenizer = None
+        self.signature = None
+        self.load_time = None
+
+        self.tokenizer_signature = None
+
+        self.hash = None
+        self.hash_signature = None
+
+        # Streamlit serves every session from its own thread, so loading has to be guarded
+        self.lock = threading.Lock()
+
+    def files_signature(self) -> tuple:
+        # We describe the model directory by the name, size and modification time of its files.
+        # If any of them changes, the model has been replaced and we need to load it again.
+        signature = []
+        for filename in sorted(os.listdir(self.model_path)):
+            filepath = os.path.join(self.model_path, filename)
+            if os.path.isfile(filepath):
+                stat = os.stat(filepath)
+                signature.append((filename, stat.st_size, stat.st_mtime_ns))
+
+        return tuple(signature)
+
+    def load(self, signature: tuple) -> None:
+
+        start_time = tme.time()
+
+        model = BertForSequenceClassification.from_pretrained(self.model_path)
+        tokenizer = BertTokenizer.from_pretrained(self.model_path)
+        # Set the model to evaluation mode (necessary for inference)
+        model.eval()
+
+        self.model, self.tokenizer = model, tokenizer
+        self.signature = signature
+        self.tokenizer_signature = signature
+        self.load_time = tme.time() - start_time
+
+        print(f"Model loaded from {self.model_path} in {self.load_time:.3f}s")
+
+    def model_hash(self) -> str:
+        # We identify the model by a hash of the files in the model directory (weights, config and vocabulary).
+        # Hashing ~700 MB takes a while, so we only do it again if the files have changed.
+
+        with self.lock:
+            signature = self.files_signature()
+            if self.hash is None or signature != self.hash_signature:
+                sha = hashlib.sha256()
+                for filename, _, _ in signature:
+                    sha.update(filename.encode())
+                    with open(os.path.join(self.model_path, filename), 'rb') as file:
+                        for chunk in iter(lambda: file.read(1 << 20), b''):
+                            sha.update(chunk)
+                self.hash = sha.hexdigest()
+                self.hash_signature = signature
+
+            return self.hash
+
+    def get(self):
+        # We load the model the first time it is used, and every time the files in the model directory change.
+
+        with self.lock:
+            signature = self.files_signature()
+            if self.model is None or signature != self.signature:
+                self.load(signature)
+
+            return self.model, self.tokenizer
+
+    def get_tokenizer(self):
+        # Backends that don't run the torch model (e.g. ONNX Runtime) only need the tokenizer
+
+        with self.lock:
+            signature = self.files_signature()
+            if self.tokenizer is None or signature != self.tokenizer_signature:
+                self.tokenizer = BertTokenizer.from_pretrained(self.model_path)
+                self.tokenizer_signature = signature
+
+            return self.tokenizer
+
+# One registry per model directory, shared by every session and page in the process
+REGISTRIES = {}
+REGISTRIES_LOCK = threading.Lock()
+
+def get_registry(model_path: str = MODEL_PATH) -> ModelRegistry:
+
+    model_path = os.path.abspath(model_path)
+
+    with REGISTRIES_LOCK:
+        if model_path not in REGISTRIES:
+            REGISTRIES[model_path] = ModelRegistry(model_path)
+
+        return REGISTRIES[model_path]
@@ -0,0 +1,111 @@
+import os
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+
+from inference import engine as inference_engine
+from inference import registry as inference_registry
+from inference import backends
+
+# Model and settings of the current worker process, set by init_worker(...)
+WORKER = {}
+
+def init_worker(model_path: str, backend: str, batch_size: int, max_length: int, num_threads: int) -> None:
+    # Each worker loads its own copy of the model and uses a bounded number of threads,
+    # so that the workers together don't oversubscribe the cores
+
+    torch.set_num_threads(num_threads)
+
+    registry = inference_registry.get_registry(model_path)
+    model, tokenizer = backends.load_model(registry, backend)
+
+    WORKER['engine'] = inference_engine.BatchedInference(model, tokenizer, batch_size=batch_size, max_length=max_length)
+
+def label_shard(start: int, texts: list):
+    # We return the position of the shard with its results, so they can be put back in the original order
+    label_codes, logits = WORKER['engine'].predict(texts)
+    return start, label_codes, logits
+
+class ShardedInference:
+    # The worker processes are started with the first call to predict(...) and kept for the next ones,
+    # so each worker loads the model only once. close() stops them.
+
+    def __init__(self,
+                 model_path: str,
+                 backend: str,
+                 workers: int,
+                 batch_size: int,
+                 max_length: int,
+                 threads_per_worker: int = None):
+
+        self.model_path = model_path
+        self.backend = backend
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        self.threads_per_worker = threads_per_worker
+
+        # Every worker gets several shards, so that results (and the progress bar) are updated regularly
+        self.shards_per_worker = 4
+
+        self.pool = None
+
+    def get_pool(self) -> ProcessPoolExecutor:
+
+        if self.pool is None:
+            # Workers are started with spawn: forking a process that already runs torch threads can deadlock
+            context = multiprocessing.get_context('spawn')
+            initargs = (self.model_path, self.backend, self.batch_size, self.max_length, self.threads_per_worker)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=init_worker, initargs=initargs)
+
+        return self.pool
+
+    def close(self) -> None:
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def define_shards(self, len_texts: int) -> list:
+
+        shard_size = max(self.batch_size, math.ceil(len_texts / (self.workers * self.shards_per_worker)))
+        return [(start, min(start + shard_size, len_texts)) for start in range(0, len_texts, shard_size)]
+
+    def predict(self, texts: list, num_labels: int, progress_callback=None):
+        # We split the texts in shards, label them in worker processes, and reassemble the results in the original order
+
+        len_texts = len(texts)
+        label_codes = np.empty(len_texts, dtype=np.int64)
+        logits = np.empty((len_texts, num_labels), dtype=np.float32)
+
+        if len_texts == 0:
+            return label_codes, logits
+
+        pool = self.get_pool()
+
+        done = 0
+        futures = [pool.submit(label_shard, start, texts[start:end]) for start, end in self.define_shards(len_texts)]
+
+        for future in as_completed(futures):
+            start, shard_codes, shard_logits = future.result()
+            end = start + len(shard_codes)
+            label_codes[start:end] = shard_codes
+            logits[start:end] = shard_logits
+
+            done += len(shard_codes)
+            if progress_callback:
+                progress_callback(done, len_texts)
+
+        return label_codes, logits
@@ -0,0 +1,316 @@
+import argparse
+import sys
+import os
+import json
+import signal
+import fcntl
+import subprocess
+import traceback
+import uuid
+import threading
+import time as tme
+from datetime import datetime
+
+from config import REPO_PATH, JOBS_PATH, CRAWL_WORKERS
+
+# Minimum seconds between two progress updates written to disk
+PROGRESS_INTERVAL = 1.0
+# A job in one of these statuses can still change. Once it's done, failed or cancelled, only resume(...) changes it.
+ACTIVE_STATUSES = ('queued', 'running')
+# Seconds a cancelled worker has to close its results files before it exits anyway
+CANCEL_GRACE_PERIOD = 30.0
+
+class JobCancelled(BaseException):
+    # Raised in the worker when its job is cancelled. It's not an Exception, so the broad except clauses of the scrapers
+    # let it through, and the crawl closes its results files on the way out (see main_crawler.run_crawl).
+    pass
+
+class JobStore:
+    # Every job has a directory data/jobs/<job_id> with its state (job.json) and the output of its worker (job.log).
+    # The state is on disk, so the app can poll it from any session, and after a browser refresh.
+
+    def __init__(self, jobs_path: str = JOBS_PATH):
+
+        self.jobs_path = jobs_path
+        os.makedirs(self.jobs_path, exist_ok=True)
+
+    def state_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_path, job_id, "job.json")
+
+    def log_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_path, job_id, "job.log")
+
+    def lock_path(self, job_id: str) -> str:
+        # The state file is replaced on every write, so we lock a separate file
+        return os.path.join(self.jobs_path, job_id, "job.lock")
+
+    def read(self, job_id: str) -> dict:
+
+        with open(self.state_path(job_id), 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def write(self, job: dict) -> None:
+        # We write to a temporary file and rename it, so a reader never sees a half written state
+        state_path = self.state_path(job['id'])
+        tmp_path = f"{state_path}.tmp"
+
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(job, file, indent=2)
+        os.replace(tmp_path, state_path)
+
+    def update(self, job_id: str, statuses: tuple = ACTIVE_STATUSES, **fields) -> dict:
+        # The app and the worker process both change the state, so every change holds the lock of the job.
+        # We only change the job if its status is one of statuses (e.g. a progress update doesn't undo a cancel),
+        # and return the new state, or None if the job wasn't changed.
+
+        with open(self.lock_path(job_id), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                job = self.read(job_id)
+                if job['status'] not in statuses:
+                    return None
+                job.update(fields)
+                self.write(job)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        return job
+
+    def is_alive(self, pid: int) -> bool:
+
+        if not pid:
+            return False
+
+        # If the worker is our child and has finished, we reap it (otherwise it stays as a zombie that looks alive)
+        try:
+            finished_pid, _ = os.waitpid(pid, os.WNOHANG)
+            if finished_pid == pid:
+                return False
+        except ChildProcessError:
+            pass
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+        return True
+
+    def get(self, job_id: str) -> dict:
+        # We return the state of the job, after checking that a queued or running job still has its worker process.
+        # A queued job has no pid only while its worker is being started (see start_worker).
+
+        job = self.read(job_id)
+
+        if job['status'] in ACTIVE_STATUSES and job['pid'] and not self.is_alive(job['pid']):
+            job = self.update(job_id,
+                              statuses=(job['status'],),
+                              status='failed',
+                              error="The worker process stopped unexpectedly.",
+                              finished=datetime.now().isoformat()) or self.read(job_id)
+
+        return job
+
+    def list_jobs(self, kind: str = None) -> list:
+        # Most recent jobs first
+
+        jobs = []
+        for job_id in os.listdir(self.jobs_path):
+            if os.path.isfile(self.state_path(job_id)):
+                job = self.get(job_id)
+                if kind is None or job['kind'] == kind:
+                    jobs.append(job)
+
+        return sorted(jobs, key=lambda job: job['created'], reverse=True)
+
+    def submit(self, kind: str, params: dict) -> str:
+        # We store the job and start its worker as a separate process, in its own session,
+        # so it keeps running when the Streamlit script reruns or the browser is refreshed
+
+        job_id = f"{kind.upper()}-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(os.path.join(self.jobs_path, job_id), exist_ok=True)
+
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'params': params,
+            'status': 'queued',
+            'pid': None,
+            'created': datetime.now().isoformat(),
+            'started': None,
+            'finished': None,
+            'progress': "",
+            'result': None,
+            'error': None
+        }
+        self.write(job)
+        self.start_worker(job_id)
+
+        return job_id
+
+    def start_worker(self, job_id: str) -> None:
+        # We store the pid of the worker while the job is queued, so a worker that dies before running it
+        # (e.g. a failing import) is noticed by get(...). Once running, the worker stores the same pid itself.
+
+        with open(self.log_path(job_id), 'a', encoding='utf-8') as log:
+            try:
+                worker = subprocess.Popen([sys.executable, os.path.join(REPO_PATH, "jobs.py"), "run", job_id, "--jobs-path", self.jobs_path],
+                                          cwd=REPO_PATH,
+                                          stdin=subprocess.DEVNULL,
+                                          stdout=log,
+                                          stderr=subprocess.STDOUT,
+                                          start_new_session=True)
+            except OSError as e:
+                self.update(job_id, statuses=('queued',), status='failed', error=f"The worker process couldn't start: {e}", finished=datetime.now().isoformat())
+                return
+
+        self.update(job_id, statuses=('queued',), pid=worker.pid)
+
+    def resume(self, job_id: str) -> None:
+        # A crawl job that failed or was cancelled runs again from the checkpoint it left in its results folder
+
+        job = self.get(job_id)
+
+        if job['kind'] != 'crawl' or job['status'] not in ('failed', 'cancelled'):
+            return
+
+        params = dict(job['params'], resume=True)
+        if self.update(job_id, statuses=('failed', 'cancelled'), status='queued', params=params, pid=None, finished=None, result=None, error=None):
+            self.start_worker(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        # A queued job is cancelled before its worker starts running it (see run_job)
+
+        job = self.update(job_id, status='cancelled', finished=datetime.now().isoformat())
+        if job is None:
+            return
+
+        # The worker runs in its own process group: we stop it together with its children (e.g. Chrome)
+        if self.is_alive(job['pid']):
+            try:
+                os.killpg(os.getpgid(job['pid']), signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+class JobProgress:
+    # Writes the progress messages of a running job to its state, at most once every PROGRESS_INTERVAL seconds.
+    # Journals can be crawled in parallel threads, so only one of them writes the state at a time.
+
+    def __init__(self, store: JobStore, job_id: str):
+
+        self.store = store
+        self.job_id = job_id
+        self.last_update = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, message: str) -> None:
+
+        with self.lock:
+            if tme.time() - self.last_update >= PROGRESS_INTERVAL:
+                self.store.update(self.job_id, statuses=('running',), progress=message)
+                self.last_update = tme.time()
+
+def run_crawl_job(params: dict, progress: JobProgress) -> dict:
+
+    import main_crawler
+    from crawler import utils
+
+    utils.running_from_job(progress)
+
+    date_init = datetime.fromisoformat(params['date_init'])
+    date_end = datetime.fromisoformat(params['date_end'])
+
+    articles, comments = main_crawler.crawl_search(date_init,
+                                                   date_end,
+                                                   params['results_path'],
+                                                   params.get('label', False),
+                                                   params.get('workers', CRAWL_WORKERS),
+                                                   params.get('incremental', False),
+                                                   params.get('resume', False))
+
+    return {'articles': articles, 'comments': comments}
+
+def run_label_job(params: dict, progress: JobProgress) -> dict:
+
+    import analyze
+    from inference import labeler as inference_labeler
+
+    total_labeled = 0
+    with inference_labeler.Labeler() as labeler:
+        for path in params['paths']:
+            total_labeled += analyze.Predict(path, labeler, progress_callback=progress).predict_all_comments()
+
+    return {'labeled': total_labeled}
+
+def run_job(job_id: str, jobs_path: str = JOBS_PATH) -> None:
+    # Entry point of the worker process
+
+    store = JobStore(jobs_path)
+
+    def cancelled(signum, frame):
+        # The state was already set to cancelled by JobStore.cancel(...). We stop the job so it can close its results files.
+        # If it's still running after CANCEL_GRACE_PERIOD seconds (e.g. a bare except swallowed it), we exit right away.
+        print(f"Job {job_id} cancelled.", flush=True)
+        timer = threading.Timer(CANCEL_GRACE_PERIOD, os._exit, args=(1,))
+        timer.daemon = True
+        timer.start()
+        raise JobCancelled()
+
+    signal.signal(signal.SIGTERM, cancelled)
+
+    # The job only starts if it wasn't cancelled while queued. Once it's running (with our pid), cancel(...) stops us.
+    job = store.update(job_id, statuses=('queued',), status='running', pid=os.getpid(), started=datetime.now().isoformat())
+    if job is None:
+        return
+
+    progress = JobProgress(store, job_id)
+
+    try:
+        match job['kind']:
+            case 'crawl':
+                result = run_crawl_job(job['params'], progress)
+            case 'label':
+                result = run_label_job(job['params'], progress)
+            case _:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+
+        store.update(job_id, statuses=('running',), status='done', result=result, finished=datetime.now().isoformat())
+
+    except Exception as e:
+        traceback.print_exc()
+        store.update(job_id, statuses=('running',), status='failed', error=str(e), finished=datetime.now().isoformat())
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Run and manage the background crawl and labeling jobs.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run a job (used by the app to start the worker process)")
+    run_parser.add_argument('job_id', type=str)
+    run_parser.add_argument('--jobs-path', type=str, default=JOBS_PATH)
+
+    subparsers.add_parser('list', help="List the jobs and their status")
+
+    cancel_parser = subparsers.add_parser('cancel', help="Cancel a queued or running job")
+    cancel_parser.add_argument('job_id', type=str)
+
+    resume_parser = subparsers.add_parser('resume', help="Run a failed or cancelled crawl job again from its last checkpoint")
+    resume_parser.add_argument('job_id', type=str)
+
+    args = parser.parse_args()
+
+    match args.command:
+        case 'run':
+            run_job(args.job_id, args.jobs_path)
+        case 'list':
+            for job in JobStore().list_jobs():
+                print(f"{job['id']}  {job['status']:<10} {job['progress']}")
+        case 'cancel':
+            JobStore().cancel(args.job_id)
+        case 'resume':
+            JobStore().resume(args.job_id)
+
+if __name__ == "__main__":
+    main()
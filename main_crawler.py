@@ -2,12 +2,12 @@ import argparse
 import sys
 import os
 import time as tme
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import numpy as np
 
-import csv
-
 from datetime import datetime, date, time
 from dateutil.relativedelta import relativedelta
 
@@ -15,11 +15,22 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 
-from crawler import utils, scraper
+from crawler import utils, scraper, waits, parsing, routing, frontier, page_cache, article_index, article_store, watermarks, checkpoint, writers
+
+from config import CRAWL_WORKERS, ARTICLE_INDEX_ENABLED, BROWSER_PAGE_LOAD_STRATEGY, CHECKPOINT_ENABLED
 
 class Input:
     
-    def __init__(self, today: date, now: datetime, path: str = None, date_init: datetime = None, date_end: datetime = None):
+    def __init__(self,
+                 today: date,
+                 now: datetime,
+                 path: str = None,
+                 date_init: datetime = None,
+                 date_end: datetime = None,
+                 label: bool = False,
+                 workers: int = CRAWL_WORKERS,
+                 incremental: bool = False,
+                 resume: bool = False):
 
         self.NOW = now
         self.TODAY = today
@@ -28,9 +39,13 @@ class Input:
             self.path_to_input = path
             self.date_init = date_init
             self.date_end = date_end
+            self.label = label
+            self.workers = workers
+            self.incremental = incremental
+            self.resume = resume
 
         else:
-            self.path_to_input, self.date_init, self.date_end = self.get_args()
+            self.path_to_input, self.date_init, self.date_end, self.label, self.workers, self.incremental, self.resume = self.get_args()
 
         self.check_args(self.path_to_input, self.date_init, self.date_end)
             
@@ -53,6 +68,10 @@ class Input:
         parser.add_argument("path", type=str, help="Path to the desired directory or file")
         parser.add_argument('-i', type=str, metavar="date_init", help="Initial date of the interval we want to observe")
         parser.add_argument('-e', type=str, metavar="date_end", help="Final date of the interval we want to observe")
+        parser.add_argument('-l', '--label', action='store_true', help="Label the comments with the sentiment model while crawling")
+        parser.add_argument('-w', '--workers', type=int, default=CRAWL_WORKERS, help="Number of journals crawled at the same time")
+        parser.add_argument('--incremental', action='store_true', help="Only look for articles newer than the ones already stored, and append them to articles.csv and comments.csv")
+        parser.add_argument('--resume', action='store_true', help="Continue the crawl from the checkpoint of a previous run that stopped, with the same search terms and sources")
 
         args = parser.parse_args()       
 
@@ -70,7 +89,7 @@ class Input:
         if path[-1] != '/':
             path = path + '/'
 
-        return path, date_init, date_end
+        return path, date_init, date_end, args.label, args.workers, args.incremental, args.resume
     
     def check_args(self, path, date_init, date_end):
 
@@ -118,14 +137,22 @@ class Input:
 
 class Output:
 
-    def __init__(self, search_name, output_path, articles_path = False, comments_path = False):
+    def __init__(self, search_name, output_path, articles_path = False, comments_path = False, incremental = False, resume = False, filepaths = None):
 
         self.path = output_path
         self.search_name = search_name
-
-        self.articles_path = self.define_articles_path()
-
-        if articles_path:
+        # In an incremental crawl, the new results are appended to the existing articles.csv and comments.csv
+        self.incremental = incremental
+        # In a crawl resumed from a checkpoint, the results files already have the rows got before it
+        self.resume = resume
+
+        # The title, subtitle and content of every article (see crawler.article_store.ArticleStore)
+        self.article_store = article_store.ArticleStore(self.path)
+
+        # A resumed crawl keeps writing to the results files of the stopped crawl (the date in their name may not be today's)
+        if filepaths:
+            self.filepath = filepaths[0]
+        elif articles_path:
             self.filepath = f"{self.path}articles"
         else:
             self.filepath = f"{self.path}{self.define_filename()}"
@@ -141,7 +168,9 @@ class Output:
             "nb_of_comments"
         ]
 
-        if comments_path:
+        if filepaths:
+            self.comments_filepath = filepaths[1]
+        elif comments_path:
             self.comments_filepath = f"{self.path}comments"
         else:
             self.comments_filepath = f"{self.path}{self.define_comments_filename()}"
@@ -158,21 +187,24 @@ class Output:
 
         self.check_filepath()
 
+        # The rows are written while the crawl runs (see crawler.writers.RowWriter)
+        self.articles_writer = writers.RowWriter(self.filepath,
+                                                 "id",
+                                                 self.headers,
+                                                 types={'datetime_added': 'datetime', 'datetime_article': 'datetime', 'nb_of_comments': 'int'},
+                                                 append=self.incremental or self.resume)
+        self.comments_writer = writers.RowWriter(self.comments_filepath,
+                                                 "comment_id",
+                                                 self.comments_headers,
+                                                 types={'comment_datetime': 'datetime', 'comment_likes': 'int', 'comment_dislikes': 'int'},
+                                                 append=self.incremental or self.resume)
+
     def define_filename(self) -> str:
         return f"{datetime.now().strftime('%Y%m%d')}_{self.search_name}_articles"
     
     def define_comments_filename(self) -> str:
         return f"{datetime.now().strftime('%Y%m%d')}_{self.search_name}_comments"
 
-    def define_articles_path(self) -> str:
-
-        articles_path = f"{self.path}articles/"
-
-        if not os.path.exists(articles_path):
-            os.makedirs(articles_path, exist_ok=True)
-
-        return articles_path
-
     def check_filepath(self) -> None:
 
         if not os.path.exists(self.path):
@@ -181,11 +213,10 @@ class Output:
         else:
             print(f"Storing results as -> {self.filepath}.csv")
 
-        if not os.path.exists(self.articles_path):
-            print(f"Invalid path to store articles in -> {self.articles_path}")
-            sys.exit(2)
-        else:
-            print(f"Storing articles in -> {self.articles_path}")
+        print(f"Storing articles in -> {self.article_store.data_path}")
+
+        if self.incremental or self.resume:
+            return
 
         if os.path.exists(f"{self.filepath}.csv"):
             print(f"File {self.filepath}.csv already exists.\nWould you like to override it? [y/n]")
@@ -201,32 +232,49 @@ class Output:
                 self.comments_filepath = self.comments_filepath + '_copy'
                 self.check_filepath()
         
-    def store_results(self, results: dict) -> None:
-        # We export the data and either append it to existing file or create a new one
-        # We create a pandas DataFrame from the dicitonary will all the information
+    def store_result(self, id: str, result: list) -> None:
+        self.articles_writer.write(id, result)
 
-        data_frame = pd.DataFrame.from_dict(results, orient="index", columns=self.headers)
+    def store_comment(self, comment_id: str, comment: list) -> None:
+        self.comments_writer.write(comment_id, comment)
 
-        data_frame.to_csv(f"{self.filepath}.csv", index_label="id", sep=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        print(f"Resulting dataset stored as -> {self.filepath}.csv")
-        # data_frame.to_excel(f"{self.filepath}.xlsx", index_label="id")
+    def flush(self) -> None:
+        # Every row got so far is written to the results files
+        self.articles_writer.flush()
+        self.comments_writer.flush()
 
-    def store_comments(self, comments: dict) -> None:
-        
-        comments_data_frame = pd.DataFrame.from_dict(comments, orient="index", columns=self.comments_headers)
+    def close(self) -> None:
+        # We write the rows still in the buffers
 
-        comments_data_frame.to_csv(f"{self.comments_filepath}.csv", index_label="comment_id", sep=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        print(f"Resulting comments dataset stored as -> {self.comments_filepath}.csv")
-        # comments_data_frame.to_excel(f"{self.comments_filepath}.xlsx", index_label="comment_id")
+        self.articles_writer.close()
+        self.comments_writer.close()
+        self.article_store.close()
 
-    def store_article(self, id: str, title: str, subtitle: str, content: str) -> None:
+        if self.articles_writer.rows:
+            if self.articles_writer.appended:
+                print(f"{self.articles_writer.rows} new articles appended to -> {self.filepath}.csv")
+            else:
+                print(f"Resulting dataset stored as -> {self.filepath}.csv")
+
+        if self.comments_writer.rows:
+            if self.comments_writer.appended:
+                print(f"{self.comments_writer.rows} new comments appended to -> {self.comments_filepath}.csv")
+            else:
+                print(f"Resulting comments dataset stored as -> {self.comments_filepath}.csv")
+
+    def read_saved_ids(self) -> tuple:
+        # In an incremental crawl, we return the ids of the articles and comments already stored
 
-        filepath = f"{self.articles_path}{id}.txt"
+        article_ids, comment_ids = [], []
+        if os.path.exists(f"{self.filepath}.csv"):
+            article_ids = pd.read_csv(f"{self.filepath}.csv", usecols=['id'], dtype=str)['id'].tolist()
+        if os.path.exists(f"{self.comments_filepath}.csv"):
+            comment_ids = pd.read_csv(f"{self.comments_filepath}.csv", usecols=['comment_id'], dtype=str)['comment_id'].tolist()
+
+        return article_ids, comment_ids
 
-        with open(filepath, 'w') as file:
-            file.write(title + "\n\n")
-            file.write(subtitle + "\n\n")
-            file.write(content)
+    def store_article(self, id: str, title: str, subtitle: str, content: str) -> None:
+        self.article_store.put(id, title, subtitle, content)
 
 
 class Crawler:
@@ -242,7 +290,12 @@ class Crawler:
                  today: date,
                  now: datetime,
                  output_instance: Output,
-                 headless: bool = True):
+                 headless: bool = True,
+                 labeling_pipeline=None,
+                 workers: int = CRAWL_WORKERS,
+                 article_index: article_index.ArticleIndex = None,
+                 watermarks: watermarks.Watermarks = None,
+                 checkpoint: checkpoint.Checkpoint = None):
 
         self.chromedriver_loc = chromedriver_loc
         self.sources = sources
@@ -255,9 +308,39 @@ class Crawler:
         self.NOW = now
         self.output = output_instance
         self.headless = headless
+        # Optional inference.pipeline.StreamingLabeler that labels the comments as they are scraped
+        self.labeling_pipeline = labeling_pipeline
+        # Number of journals crawled at the same time, each one with its own driver
+        self.workers = workers
+        # Optional crawler.article_index.ArticleIndex with the articles stored by past searches
+        self.article_index = article_index
+        # Optional crawler.watermarks.Watermarks, in an incremental crawl
+        self.watermarks = watermarks
+        # Optional crawler.checkpoint.Checkpoint where the progress of the crawl is written
+        self.checkpoint = checkpoint
+        # Articles found while looking through the results of every search term (see Scraper.scrape)
+        self.candidates = None
+        # Journal and window of the driver whose blocked resources are set (see crawler.browser.BrowserProfile)
+        self.profile_applied = None
         
-        self.saved_articles = set()
-        self.saved_comments = set()
+        # Shared by every worker: we check them before saving an article or a comment
+        self.saved_articles = utils.SavedIds()
+        self.saved_comments = utils.SavedIds()
+        if self.checkpoint:
+            # The rows are in the results files before the checkpoint says they were got
+            self.checkpoint.output = self.output
+            if self.checkpoint.resumed:
+                # The articles and comments got before we stopped (already in the results files) won't be got again
+                article_ids, comment_ids = self.output.read_saved_ids()
+                self.saved_articles.update(self.checkpoint.article_ids() + article_ids)
+                self.saved_comments.update(self.checkpoint.comment_ids() + comment_ids)
+
+        # How long we waited for each page condition, per journal
+        self.wait_stats = waits.WaitStats()
+        # How long we spent parsing each page, per journal
+        self.parse_stats = parsing.ParseStats()
+        # Which pages were fetched with plain HTTP or Selenium, and how long they took, per journal
+        self.fetch_stats = routing.FetchStats()
 
         self.scraper = scraper.Scraper(self)
 
@@ -274,47 +357,178 @@ class Crawler:
         options.add_argument("--disable-extensions")
         options.add_argument("--dns-prefetch-disable")
         options.add_argument("--disable-gpu")
+        # We don't wait for images, stylesheets and frames (see crawler.browser.BrowserProfile)
+        options.page_load_strategy = BROWSER_PAGE_LOAD_STRATEGY
 
         s = Service(self.chromedriver_loc)
         driver = webdriver.Chrome(service=s, options=options)
 
         return driver
     
-    def shutdown_driver(self) -> dict:
-        self.driver.close()
-        self.driver.quit()
+    def shutdown_driver(self, driver: webdriver = None) -> None:
+
+        driver = driver if driver else self.driver
+        driver.close()
+        driver.quit()
     
     def crawl(self) -> dict:
 
         utils.prints('mode', date_init=self.date_init, date_end=self.date_end, search_terms=self.search_terms)
 
+        journals = [journal for journal in self.sources if journal not in self.sources_out_of_order]
+        for journal in self.sources_out_of_order:
+            if journal in self.sources:
+                utils.prints('out_of_order', journal=journal)
+
+        if self.workers > 1 and len(journals) > 1:
+            result_articles, result_comments = self.crawl_parallel(journals)
+        else:
+            result_articles, result_comments = self.crawl_sequential(journals)
+
+        utils.prints('wait_stats', wait_stats=self.wait_stats.summary())
+        utils.prints('parse_stats', parse_stats=self.parse_stats.summary())
+        utils.prints('fetch_stats', fetch_stats=self.fetch_stats.summary())
+
+        return result_articles, result_comments
+
+    def crawl_sequential(self, journals: list) -> dict:
+
         self.driver = self.setup_driver()
 
         result_articles = {}
         result_comments = {}
 
-        for journal in self.sources:
+        for journal in journals:
             utils.prints('searching', journal=journal)
-            if journal in self.sources_out_of_order:
-                utils.prints('out_of_order', journal=journal)
-            else:
-                # Use the methods in Scraper to search the for the articles!!!
-                articles, comments = self.scraper.scrape(journal)
-                result_articles.update(articles)
-                result_comments.update(comments)
+            # Use the methods in Scraper to search the for the articles!!!
+            articles, comments = self.scraper.scrape(journal)
+            result_articles.update(articles)
+            result_comments.update(comments)
 
         self.shutdown_driver()
 
-        return result_articles, result_comments 
+        return result_articles, result_comments
 
-def main():
+    def crawl_parallel(self, journals: list) -> dict:
+        # Every journal is an independent website, so we crawl several of them at the same time.
+        # We start a pool of drivers: each journal takes a free driver, scrapes every search term with it and gives it back.
 
-    start_time = tme.time()
+        workers = min(self.workers, len(journals))
 
-    today = date.today()
-    now = datetime.now()
+        drivers = queue.Queue()
+        for _ in range(workers):
+            drivers.put(self.setup_driver())
 
-    input = Input(today, now)
+        def scrape_journal(journal: str):
+
+            driver = drivers.get()
+            try:
+                utils.prints('searching', journal=journal)
+                return scraper.Scraper(JournalWorker(self, driver)).scrape(journal)
+            finally:
+                drivers.put(driver)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(scrape_journal, journals))
+        finally:
+            while not drivers.empty():
+                self.shutdown_driver(drivers.get())
+
+        # We merge the results in the order of sources.csv, as in a sequential crawl
+        result_articles = {}
+        result_comments = {}
+
+        for articles, comments in results:
+            result_articles.update(articles)
+            result_comments.update(comments)
+
+        return result_articles, result_comments
+
+class JournalWorker:
+    # The crawler as seen by a single worker of a parallel crawl.
+    # The driver, the state of the cookies and notifications pop ups and the browser profile applied belong to the worker,
+    # every other attribute (search terms, dates, output, saved ids...) is read from the shared crawler.
+
+    def __init__(self, crawler: Crawler, driver: webdriver):
+
+        self.crawler = crawler
+        self.driver = driver
+        self.cookies_clicked = False
+        self.notifs_clicked = False
+        self.profile_applied = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.crawler, name)
+
+def define_article_index(output: Output) -> article_index.ArticleIndex:
+    # We index the articles of every past search, so we don't open them again
+
+    if not ARTICLE_INDEX_ENABLED:
+        return None
+
+    index = article_index.ArticleIndex()
+    refreshed = index.refresh(exclude=output.path)
+    print(f"Article index updated with {refreshed} new or changed searches")
+
+    return index
+
+def define_watermarks(output: Output, crawler: Crawler) -> watermarks.Watermarks:
+    # Incremental crawl: we won't look for articles older than the ones already stored,
+    # and the ones already stored won't be added again
+
+    marks = watermarks.Watermarks(output.path, f"{output.filepath}.csv")
+
+    article_ids, comment_ids = output.read_saved_ids()
+    crawler.saved_articles.update(article_ids)
+    crawler.saved_comments.update(comment_ids)
+    print(f"Incremental crawl: {len(article_ids)} articles and {len(comment_ids)} comments already stored")
+
+    return marks
+
+def define_checkpoint(input: Input, search_terms: list, sources: list) -> checkpoint.Checkpoint:
+    # The progress of the crawl is written to the results folder. If we resume, we load the progress of the stopped crawl.
+
+    if not CHECKPOINT_ENABLED:
+        if input.resume:
+            print("Checkpoints are disabled (CHECKPOINT_ENABLED): starting the crawl from the beginning")
+        return None
+
+    crawl_checkpoint = checkpoint.Checkpoint(input.path_to_input, input.date_init, input.date_end, search_terms, sources)
+    if input.resume and crawl_checkpoint.resume():
+        # We crawl the same interval as the stopped crawl
+        input.date_init, input.date_end = crawl_checkpoint.date_init, crawl_checkpoint.date_end
+
+    return crawl_checkpoint
+
+def define_labeling_pipeline(output: Output):
+    # The sentiment model is only imported if we want to label while crawling
+    from inference import pipeline
+
+    return pipeline.StreamingLabeler(output.path, output.comments_headers)
+
+def close_labeling_pipeline(labeling_pipeline) -> None:
+    # We wait for the comments still in the queue to be labeled
+
+    labeling_pipeline.close()
+    utils.prints('labeled', len_comments=labeling_pipeline.len_labeled)
+    if labeling_pipeline.errors:
+        print(f"{labeling_pipeline.errors} comments couldn't be labeled. Run analyze.py on the results to label them.")
+
+def print_page_cache_stats() -> None:
+    # Only if some page went through the cache during the crawl
+    if page_cache.CACHE is not None:
+        utils.prints('page_cache', cache_stats=page_cache.CACHE.summary())
+
+def print_frontier_stats() -> None:
+    # Only if some static page was fetched during the crawl
+    if frontier.FRONTIER is not None:
+        utils.prints('frontier', frontier_stats=frontier.FRONTIER.summary())
+
+def run_crawl(input: Input, fixed_filenames: bool) -> tuple:
+    # The crawl of a search, from the command line (main) or from the app (crawl_search).
+    # With fixed_filenames, the results are stored as articles.csv and comments.csv instead of <date>_<search>_articles.csv.
+    # We return whether the search found articles, and whether they had comments.
 
     chromedriver_loc = input.get_chromedriver_loc()
     sources = input.get_sources()
@@ -322,34 +536,99 @@ def main():
     sources_elements = input.get_sources_elements()
     search_name, search_terms = input.get_search_terms()
     path_to_input = input.path_to_input
-    (date_init, date_end) = (input.date_init, input.date_end)
 
-    output = Output(search_name, path_to_input)
-
-    crawler = Crawler(chromedriver_loc,
-                      sources,
-                      sources_out_of_order,
-                      sources_elements,
-                      search_terms,
-                      date_init,
-                      date_end,
-                      today,
-                      now,
-                      output,
-                      headless=True)
-    
-    articles, comments = crawler.crawl()
+    crawl_checkpoint = define_checkpoint(input, search_terms, sources)
+    (date_init, date_end) = (input.date_init, input.date_end)
 
-    if articles:
-        output.store_results(articles)
-    else:
+    resumed = bool(crawl_checkpoint and crawl_checkpoint.resumed)
+    output = Output(search_name,
+                    path_to_input,
+                    articles_path=fixed_filenames,
+                    comments_path=fixed_filenames,
+                    incremental=input.incremental,
+                    resume=resumed,
+                    filepaths=crawl_checkpoint.filepaths if resumed else None)
+
+    labeling_pipeline = None
+    if input.label:
+        labeling_pipeline = define_labeling_pipeline(output)
+
+    # Whatever happens during the crawl (an error, Ctrl+C...), the labeling thread is stopped and the results files are
+    # completed with the rows still in the buffers, so a resumed crawl continues from complete files
+    try:
+        index = define_article_index(output)
+
+        crawler = Crawler(chromedriver_loc,
+                          sources,
+                          sources_out_of_order,
+                          sources_elements,
+                          search_terms,
+                          date_init,
+                          date_end,
+                          input.TODAY,
+                          input.NOW,
+                          output,
+                          headless=True,
+                          labeling_pipeline=labeling_pipeline,
+                          workers=input.workers,
+                          article_index=index,
+                          checkpoint=crawl_checkpoint)
+
+        if input.incremental:
+            crawler.watermarks = define_watermarks(output, crawler)
+
+        articles, comments = crawler.crawl()
+
+        print_page_cache_stats()
+        print_frontier_stats()
+
+    finally:
+        try:
+            if labeling_pipeline:
+                close_labeling_pipeline(labeling_pipeline)
+        finally:
+            # The rows were written while crawling: we write the last ones
+            output.close()
+
+    # The watermarks are taken from the rows of the new articles, now in the results file
+    if crawler.watermarks:
+        crawler.watermarks.update(articles)
+        crawler.watermarks.write()
+
+    if not articles:
         utils.prints('no_results')
-
-    if comments:
-        output.store_comments(comments)
-    else:
+    elif not comments:
         utils.prints('no_comments')
 
+    # The results are stored: the next run starts over
+    if crawl_checkpoint:
+        crawl_checkpoint.remove()
+
+    return bool(articles), bool(articles) and bool(comments)
+
+def crawl_search(date_init: datetime,
+                 date_end: datetime,
+                 results_path: str,
+                 label: bool = False,
+                 workers: int = CRAWL_WORKERS,
+                 incremental: bool = False,
+                 resume: bool = False):
+    # Crawl of a search set up from the app (New Search page or job runner): the inputs are already in
+    # results_path and the results are stored as articles.csv and comments.csv.
+
+    input = Input(date.today(), datetime.now(), results_path, date_init, date_end, label, workers, incremental, resume)
+
+    return run_crawl(input, fixed_filenames=True)
+
+def main():
+
+    start_time = tme.time()
+
+    input = Input(date.today(), datetime.now())
+
+    # An incremental crawl always uses articles.csv and comments.csv, so the next run can append to them
+    run_crawl(input, fixed_filenames=input.incremental)
+
     print(f"\nTotal execution time: {tme.time() - start_time:.3f}({(tme.time() - start_time)/60:.3f} minutes)")
     
 if __name__ == "__main__":
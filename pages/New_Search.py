@@ -6,15 +6,12 @@ import csv
 from datetime import date, datetime, time
 from dateutil.relativedelta import relativedelta
 
-import main_crawler
 import analyze
-from crawler import utils
+import jobs
+from crawler import checkpoint
 
 class Scrape:
 
-    def __init__(self) -> None:
-        utils.running_from_st()
-    
     def setup_search(self, search_terms: list, options: list, search_name: str, results_path: str) -> bool:
         
         try:
@@ -38,48 +35,6 @@ class Scrape:
 
             return False
 
-    def main_scraper(self, date_init: datetime, date_end: datetime, results_path: str):
-            
-        today = date.today()
-        now = datetime.now()
-
-        input = main_crawler.Input(today, now, results_path, date_init, date_end)
-
-        chromedriver_loc = input.get_chromedriver_loc()
-        sources = input.get_sources()
-        sources_out_of_order = input.get_sources_out_of_order()
-        sources_elements = input.get_sources_elements()
-        search_name, search_terms = input.get_search_terms()
-        path_to_input = input.path_to_input
-        (date_init, date_end) = (input.date_init, input.date_end)
-
-        output = main_crawler.Output(search_name, path_to_input, articles_path=True, comments_path=True)
-
-        crawler = main_crawler.Crawler(chromedriver_loc,
-                                        sources,
-                                        sources_out_of_order,
-                                        sources_elements,
-                                        search_terms,
-                                        date_init,
-                                        date_end,
-                                        today,
-                                        now,
-                                        output,
-                                        headless=True)
-        
-        articles, comments = crawler.crawl()
-
-        if articles:
-            output.store_results(articles)
-            if comments:
-                output.store_comments(comments)
-            else:
-                utils.prints('no_comments')
-                return True, False
-        else:
-            utils.prints('no_results')
-            return False, False
-
 
 class Search:
 
@@ -150,6 +105,11 @@ class Search:
 
         return options
 
+    def select_labeling(self):
+
+        st.markdown("### Sentiment analysis")
+        return st.checkbox("Label the comments while searching")
+
 def main():
 
     st.set_page_config(
@@ -175,47 +135,94 @@ def main():
     # Journal options
     options = search.select_journals()
 
+    # Labeling while crawling
+    label = search.select_labeling()
+
     # ------------------------------------------------------------------------------------------------------
 
     if st.button("Search"):
 
-        # Create a placeholder for the warning
-        search_status_placeholder = st.empty()
-        results_message_placeholder = st.empty()
+        search_name = f"SEARCH-{datetime.now().strftime("%Y%m%d%H%M%S")}"
+        results_path = f"data/scrapes/{search_name}/"
 
-        # Display a warning message before the process starts
-        with search_status_placeholder:
-            st.warning("DO NOT QUIT OR REFRESH THIS PAGE WHILE THE SEARCH IS IN PROGRESS!")
+        if not os.path.exists(results_path):
+            os.makedirs(results_path, exist_ok=True)
 
-        with st.spinner("Performing search"):
+        scrape = Scrape()
+        success = scrape.setup_search(search_terms, options, search_name, results_path)
 
-            search_name = f"SEARCH-{datetime.now().strftime("%Y%m%d%H%M%S")}"
-            results_path = f"data/scrapes/{search_name}/"
+        if success:
 
-            if not os.path.exists(results_path):
-                os.makedirs(results_path, exist_ok=True)
+            # The search runs in a background job: the page can be refreshed or closed while it's in progress
+            job_id = jobs.JobStore().submit('crawl', {
+                'results_path': results_path,
+                'date_init': date_init.isoformat(),
+                'date_end': date_end.isoformat(),
+                'label': label
+            })
+            st.session_state['crawl_job_id'] = job_id
+            st.success(f"Search started! Results will be stored in directory {search_name}")
 
-            scrape = Scrape()
-            success = scrape.setup_search(search_terms, options, search_name, results_path)
+        else:
+            st.warning("Please enter the correct parameters to proceed.")
 
-            if success:
+    # ------------------------------------------------------------------------------------------------------
+    # Searches in progress and finished
+    # ------------------------------------------------------------------------------------------------------
 
-                utils.setup_scraping_updates()
-                articles, comments = scrape.main_scraper(date_init, date_end, results_path)
+    show_jobs()
 
-            else:
-                st.warning("Please enter the correct parameters to proceed.")
-        
-        # Display a warning message before the process starts
-        with search_status_placeholder:
-            st.success(f"Search completed!")
-        with results_message_placeholder:
+def show_job_result(job: dict) -> None:
+
+    search_name = os.path.basename(os.path.normpath(job['params']['results_path']))
+
+    match job['status']:
+        case 'queued' | 'running':
+            st.info(f"In progress... {job['progress']}")
+        case 'cancelled':
+            st.warning("The search was cancelled.")
+        case 'failed':
+            st.error(f"The search failed: {job['error']}")
+        case 'done':
+            articles, comments = job['result']['articles'], job['result']['comments']
             if articles and not comments:
                 st.warning(f"The articles had no comments. Articles dataset stored in directory {search_name}")
             elif not articles and not comments:
                 st.error(f"The search yielded no results.")
             else:
-                 st.success(f"Results were stored in directory {search_name}")
+                st.success(f"Results were stored in directory {search_name}")
+
+def show_jobs() -> None:
+
+    store = jobs.JobStore()
+    crawl_jobs = store.list_jobs('crawl')
+
+    if not crawl_jobs:
+        return
+
+    st.markdown("### Searches")
+    st.button("Refresh")
+
+    for job in crawl_jobs:
+
+        search_name = os.path.basename(os.path.normpath(job['params']['results_path']))
+        expanded = job['id'] == st.session_state.get('crawl_job_id') or job['status'] in ('queued', 'running')
+
+        with st.expander(f"{search_name} - {job['status']}", expanded=expanded):
+
+            show_job_result(job)
+
+            if job['status'] in ('queued', 'running'):
+                if st.button("Cancel", key=f"cancel_{job['id']}"):
+                    store.cancel(job['id'])
+                    st.rerun()
+
+            # A search that stopped can continue from its last checkpoint instead of starting over
+            if job['status'] in ('failed', 'cancelled') and os.path.isfile(checkpoint.checkpoint_path(job['params']['results_path'])):
+                if st.button("Resume", key=f"resume_{job['id']}"):
+                    store.resume(job['id'])
+                    st.session_state['crawl_job_id'] = job['id']
+                    st.rerun()
 
 
 if __name__ == "__main__":
@@ -3,22 +3,21 @@ import streamlit as st
 import re
 import os
 import shutil
-import csv
 from datetime import date, datetime, time
 import time as tme
 from dateutil.relativedelta import relativedelta
 
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 
-from transformers import BertTokenizer, BertForSequenceClassification
-import torch
-
 import main_crawler
 import analyze
+import jobs
 from crawler import utils
 
+from inference import engine as inference_engine
+from inference import labeler as inference_labeler
+
 from config import REPO_PATH
 
 class AllStoredSearches:
@@ -197,8 +196,9 @@ class SelectedData:
 
     def get_summary_stats(self):
         
-        search_terms_article_count = self.articles['search_term'].value_counts()
-        search_terms_comment_count = self.comments['search_term'].value_counts()
+        # An article found with several search terms is counted for each of them
+        search_terms_article_count = self.articles['search_term'].str.split(utils.TERMS_SEPARATOR).explode().value_counts()
+        search_terms_comment_count = self.comments['search_term'].str.split(utils.TERMS_SEPARATOR).explode().value_counts()
 
         search_term_counts = pd.merge(search_terms_article_count, search_terms_comment_count, on='search_term', how='outer').fillna(0)
 
@@ -310,8 +310,9 @@ class Predict:
         
         self.results_path = results_path
 
-        self.model = BertForSequenceClassification.from_pretrained("./model")
-        self.tokenizer = BertTokenizer.from_pretrained("./model")
+        # The model is loaded lazily by the process-wide registry, the first time we need to make predictions,
+        # and texts that were already labeled by the same model are taken from the prediction cache
+        self.labeler = inference_labeler.Labeler()
 
         self.articles = articles
         self.comments = comments
@@ -322,8 +323,9 @@ class Predict:
 
     def get_existing_labels_dataset(self):
 
-        self.comments_labeled_filepath = f"{self.results_path}/comments_labeled.csv"
-        return os.path.isfile(self.comments_labeled_filepath)
+        self.labeled_dataset = analyze.LabeledDataset(self.results_path)
+        self.comments_labeled_filepath = self.labeled_dataset.filepath
+        return self.labeled_dataset.exists()
 
     def define_input_text(self, comments):
 
@@ -332,61 +334,62 @@ class Predict:
         
         return comments
 
-    def predict_single_label(self, input_text):
-
-        # Set the model to evaluation mode (necessary for inference)
-        self.model.eval()
-
-        # Tokenize the input text
-        tokenized_input = self.tokenizer(input_text, return_tensors="pt", truncation=True, padding=True)
-
-        # Make predictions
-        with torch.no_grad():
-            outputs = self.model(**tokenized_input)
-            logits = outputs.logits
-            predicted_label = torch.argmax(logits, dim=-1).item()  # Get the index of the max logit
-
-        return predicted_label
-
     def add_predictions_to_comments(self, comments):
-        
-        labels = {
-            0: 'positive',
-            1: 'neutral',
-            2: 'negative',
-            3: 'very-negative'
-        }
 
         progress_bar = st.progress(0)
 
-        comments['predicted_label_code'] = np.nan
-        comments['predicted_label'] = np.nan
+        # The worker processes (if any) are stopped once the comments are labeled, as the page is rerun from scratch
+        with self.labeler:
+            label_codes, _ = self.labeler.predict(comments['input_text'].tolist(),
+                                                  progress_callback=lambda done, total: progress_bar.progress(done / total))
+
+        if self.labeler.predicted and self.labeler.registry.load_time is not None:
+            st.caption(f"Model loaded in {self.labeler.registry.load_time:.1f}s")
+        st.caption(f"{self.labeler.cache_hits} predictions taken from the cache, {self.labeler.predicted} made with the model.")
 
-        len_comments = len(comments)
-        for i in range (len_comments):
-            comments.loc[i,'predicted_label_code'] = self.predict_single_label(comments.loc[i,'input_text'])
-            comments.loc[i,'predicted_label'] = labels[comments.loc[i,'predicted_label_code']]
-            progress_bar.progress((i + 1) / len_comments)
+        # We assign the whole vectors of predictions to the DataFrame in one step
+        comments['predicted_label_code'] = label_codes
+        comments['predicted_label'] = comments['predicted_label_code'].map(inference_engine.LABELS)
 
         return comments
     
     def make_predictions(self):
 
-        if not self.existing_predictions:
-            # make predictions
-            self.comments = self.add_predictions_to_comments(self.comments)
-            try:
-                self.comments.to_csv(self.comments_labeled_filepath, index_label="comment_id", sep=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-                self.existing_predictions = True
-            except:
-                st.warning(f"Couldn't save file {self.comments_labeled_filepath}")
-        else:
+        labeled = None
+        if self.existing_predictions:
             # get predictions from existing file
-            dtype_comments = {'comment_in_answer_to': 'str'}
             try:
-                self.comments = pd.read_csv(self.comments_labeled_filepath, dtype=dtype_comments, parse_dates=['comment_datetime'])
+                labeled = self.labeled_dataset.read()
             except:
                 st.warning(f"The selected directory has no results stored.\nPlease select another one.")
+                return
+
+        if labeled is None:
+            # make predictions for every comment
+            comments_to_label = self.comments
+        else:
+            # make predictions only for the comments that have no label yet (e.g. added by a new crawl)
+            comments_to_label = self.labeled_dataset.missing(self.comments, labeled)
+            if len(comments_to_label) > 0:
+                st.write(f"Labeling {len(comments_to_label)} new comments without predictions.")
+
+        if len(comments_to_label) == 0:
+            if labeled is not None:
+                self.comments = labeled
+            return
+
+        new_labeled = self.add_predictions_to_comments(comments_to_label.copy())
+
+        if labeled is None:
+            self.comments = new_labeled
+        else:
+            self.comments = self.labeled_dataset.merge(labeled, new_labeled)
+
+        try:
+            self.labeled_dataset.write(self.comments)
+            self.existing_predictions = True
+        except:
+            st.warning(f"Couldn't save file {self.comments_labeled_filepath}")
 
     def get_label_valuecounts(self):
 
@@ -409,6 +412,35 @@ class Predict:
             st.write("\n\n")
             st.dataframe(label_valuecounts)
 
+def show_label_job(search_directory_path: str) -> bool:
+    # We show the status of the latest labeling job of the directory, and return whether it's still in progress
+
+    store = jobs.JobStore()
+    label_jobs = [job for job in store.list_jobs('label') if search_directory_path in job['params']['paths']]
+
+    if not label_jobs:
+        return False
+
+    job = label_jobs[0]
+
+    match job['status']:
+        case 'queued' | 'running':
+            st.info(f"Labeling in the background... {job['progress']}")
+            col1, col2 = st.columns([1, 8])
+            with col1:
+                st.button("Refresh")
+            with col2:
+                if st.button("Cancel"):
+                    store.cancel(job['id'])
+                    st.rerun()
+            return True
+        case 'failed':
+            st.error(f"The last labeling job failed: {job['error']}")
+        case 'cancelled':
+            st.warning("The last labeling job was cancelled.")
+
+    return False
+
 def main():
 
     st.set_page_config(
@@ -453,10 +485,20 @@ def main():
             st.markdown("### Sentiment Analysis")
             predict = Predict(search_directory_path, search.articles, search.comments)
 
+            # While a background job labels this directory, we don't label it here too
+            if show_label_job(search_directory_path):
+                return
+
             if not predict.existing_predictions:
                 st.write("There's no predictions for this dataset.")
-                if st.button("Make predictions!"):
-                    predict.make_predictions()
+                col1, col2 = st.columns([1, 4])
+                with col1:
+                    if st.button("Make predictions!"):
+                        predict.make_predictions()
+                with col2:
+                    if st.button("Make predictions in the background"):
+                        jobs.JobStore().submit('label', {'paths': [search_directory_path]})
+                        st.rerun()
             else:
                 predict.make_predictions()
 
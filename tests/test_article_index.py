@@ -0,0 +1,96 @@
+import os
+
+import pandas as pd
+import pytest
+
+from crawler import article_store
+from crawler.article_index import ArticleIndex, canonical_link
+
+COLUMNS = ["datetime_added", "journal", "search_term", "datetime_article", "category", "type", "title", "link", "nb_of_comments"]
+
+@pytest.mark.parametrize('link', ["https://www.ara.ad/societat/article_1.html",
+                                  "http://www.ara.ad/societat/article_1.html",
+                                  "https://WWW.ARA.AD/societat/article_1.html",
+                                  "https://www.ara.ad/societat/article_1.html/",
+                                  "https://www.ara.ad/societat/article_1.html?utm_source=twitter&utm_medium=social",
+                                  " https://www.ara.ad/societat/article_1.html#comments"])
+def test_canonical_link(link):
+    assert canonical_link(link) == "https://www.ara.ad/societat/article_1.html"
+
+def test_canonical_link_keeps_other_parameters():
+    assert canonical_link("https://diari.ad/article?id=3&utm_campaign=x") == "https://diari.ad/article?id=3"
+
+def write_search(scrapes_path, search: str, articles: dict, use_store: bool = True) -> str:
+    # articles: {article_id: (datetime_added, link, title)}
+
+    results_path = os.path.join(scrapes_path, search)
+    os.makedirs(results_path)
+
+    rows = {article_id: [datetime_added, "ara", "term", "2024-05-01 10:00:00", "societat", "noticia", title, link, 0]
+            for article_id, (datetime_added, link, title) in articles.items()}
+    pd.DataFrame.from_dict(rows, orient='index', columns=COLUMNS).to_csv(os.path.join(results_path, "articles.csv"), index_label="id")
+
+    if use_store:
+        store = article_store.ArticleStore(results_path)
+        for article_id, (_, _, title) in articles.items():
+            store.put(article_id, title, f"{search} subtitle", "Contingut de l'article")
+        store.close()
+    else:
+        os.makedirs(os.path.join(results_path, "articles"))
+        for article_id, (_, _, title) in articles.items():
+            with open(os.path.join(results_path, "articles", f"{article_id}.txt"), 'w', encoding='utf-8') as file:
+                file.write(article_store.join_text(title, f"{search} subtitle", "Contingut de l'article"))
+
+    return results_path
+
+@pytest.fixture
+def scrapes_path(tmp_path):
+    return str(tmp_path / "scrapes")
+
+def make_index(tmp_path, scrapes_path) -> ArticleIndex:
+    return ArticleIndex(str(tmp_path / "index" / "articles.sqlite"), scrapes_path)
+
+def test_same_article_in_several_searches(tmp_path, scrapes_path):
+
+    write_search(scrapes_path, "old", {"AR1": ("2024-05-01 12:00:00", "http://www.ara.ad/article_1.html", "Old title")}, use_store=False)
+    write_search(scrapes_path, "new", {"AR2": ("2024-05-02 12:00:00", "https://www.ara.ad/article_1.html?utm_source=x", "New title")})
+
+    index = make_index(tmp_path, scrapes_path)
+    assert index.refresh() == 2
+
+    # Both links are the same article: the most recently added one is kept
+    article = index.get("https://WWW.ara.ad/article_1.html/")
+    assert article['article_id'] == "AR2"
+    assert index.read_content(article) == ("New title", "new subtitle", "Contingut de l'article")
+
+def test_articles_not_migrated_to_the_store(tmp_path, scrapes_path):
+
+    write_search(scrapes_path, "old", {"AR1": ("2024-05-01 12:00:00", "https://www.ara.ad/article_1.html", "Títol")}, use_store=False)
+
+    index = make_index(tmp_path, scrapes_path)
+    index.refresh()
+
+    assert index.read_content(index.get("https://www.ara.ad/article_1.html")) == ("Títol", "old subtitle", "Contingut de l'article")
+    assert index.get("https://www.ara.ad/article_2.html") is None
+
+def test_refresh_only_reads_changed_files(tmp_path, scrapes_path):
+
+    write_search(scrapes_path, "first", {"AR1": ("2024-05-01 12:00:00", "https://www.ara.ad/article_1.html", "One")})
+
+    index = make_index(tmp_path, scrapes_path)
+    assert index.refresh() == 1
+    assert index.refresh() == 0
+
+    write_search(scrapes_path, "second", {"AR2": ("2024-05-02 12:00:00", "https://www.ara.ad/article_2.html", "Two")})
+    assert index.refresh() == 1
+
+def test_exclude_only_the_current_search(tmp_path, scrapes_path):
+
+    current = write_search(scrapes_path, "foo", {"AR1": ("2024-05-01 12:00:00", "https://www.ara.ad/article_1.html", "One")})
+    write_search(scrapes_path, "foo_2", {"AR2": ("2024-05-02 12:00:00", "https://www.ara.ad/article_2.html", "Two")})
+
+    index = make_index(tmp_path, scrapes_path)
+    assert index.refresh(exclude=current + "/") == 1
+
+    assert index.get("https://www.ara.ad/article_1.html") is None
+    assert index.get("https://www.ara.ad/article_2.html")['article_id'] == "AR2"
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from crawler import article_store
+from crawler.article_store import ArticleStore
+
+def test_put_get_round_trip(tmp_path):
+
+    store = ArticleStore(str(tmp_path))
+    store.put("ara-1", "Title", "Subtitle", "First paragraph\n\nSecond paragraph")
+    store.put("ara-2", "Other", "", "")
+    store.close()
+
+    stored = ArticleStore(str(tmp_path))
+    assert len(stored) == 2
+    assert "ara-1" in stored
+    assert stored.get("ara-1") == ("Title", "Subtitle", "First paragraph\n\nSecond paragraph")
+    assert stored.get("ara-2") == ("Other", "", "")
+    assert stored.get("ara-3") is None
+
+def test_last_put_wins(tmp_path):
+
+    store = ArticleStore(str(tmp_path))
+    store.put("ara-1", "Old", "", "old content")
+    store.put("ara-1", "New", "", "new content")
+    store.close()
+
+    stored = ArticleStore(str(tmp_path))
+    assert len(stored) == 1
+    assert stored.get("ara-1") == ("New", "", "new content")
+    assert dict(stored.items()) == {"ara-1": ("New", "", "new content")}
+
+def test_truncated_index_is_recovered(tmp_path):
+
+    store = ArticleStore(str(tmp_path))
+    store.put("ara-1", "Title", "Subtitle", "Content")
+    store.close()
+
+    # A crawl that stopped while writing: a torn line, and a line whose article is not in articles.pack
+    data_size = os.path.getsize(article_store.data_path(str(tmp_path)))
+    with open(article_store.index_path(str(tmp_path)), 'a', encoding='utf-8') as file:
+        file.write(f"ara-2\t{data_size}\t100\n")
+        file.write("ara-3\t12")
+
+    stored = ArticleStore(str(tmp_path))
+    assert stored.ids() == ["ara-1"]
+    assert stored.get("ara-1") == ("Title", "Subtitle", "Content")
+
+    # New articles are still appended after the recovered ones
+    stored.put("ara-4", "Four", "", "")
+    stored.close()
+    assert ArticleStore(str(tmp_path)).get("ara-4") == ("Four", "", "")
+
+def write_txt_articles(results_path, articles: dict) -> str:
+
+    articles_path = os.path.join(results_path, "articles")
+    os.makedirs(articles_path)
+    for article_id, (title, subtitle, content) in articles.items():
+        with open(os.path.join(articles_path, f"{article_id}.txt"), 'w') as file:
+            file.write(article_store.join_text(title, subtitle, content))
+
+    return articles_path
+
+@pytest.mark.parametrize('keep', [False, True])
+def test_migrate(tmp_path, keep):
+
+    articles = {"ara-1": ("Title", "Subtitle", "Content"),
+                "diari-2": ("Other title", "", "Line\n\nOther line")}
+    articles_path = write_txt_articles(str(tmp_path), articles)
+
+    assert article_store.migrate(str(tmp_path), keep=keep) == 2
+
+    stored = ArticleStore(str(tmp_path))
+    assert {article_id: stored.get(article_id) for article_id in articles} == articles
+    assert os.path.isdir(articles_path) == keep
+
+def test_migrate_without_articles(tmp_path):
+
+    assert article_store.migrate(str(tmp_path)) == 0
+    assert not article_store.store_exists(str(tmp_path))
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from bs4 import BeautifulSoup
+
+from crawler import scraper, parser, routing
+from crawler.scraper import AddArticle, Candidates, Scraper
+
+class Crawler:
+
+    def __init__(self, saved_articles=()):
+        self.saved_articles = set(saved_articles)
+        self.candidates = None
+        self.checkpoint = None
+        self.article_index = None
+        self.sources_elements = pd.DataFrame({'fetch_comments': ['-']}, index=['periodic'])
+
+def listing_article(link: str, title: str):
+    # An article of the list of results of El Periòdic
+    html = f'<li class="item article article_llistat"><a href="{link}"><div><h2>{title}</h2></div></a></li>'
+    return BeautifulSoup(html, 'html.parser').li
+
+@pytest.fixture
+def added(monkeypatch):
+    # The articles got in the second phase, instead of reading their pages
+
+    added = []
+
+    def add_candidate_to_dict(self, journal, title, category, article_id, date_article, link, soup, term, dict_articles, dict_comments, text=None):
+        added.append({'article_id': article_id, 'title': title, 'category': category, 'soup': soup, 'term': term, 'text': text})
+        dict_articles[article_id] = journal
+        return dict_articles, dict_comments
+
+    monkeypatch.setattr(AddArticle, 'add_candidate_to_dict', add_candidate_to_dict)
+    return added
+
+@pytest.fixture
+def fetched(monkeypatch):
+    # The batches of links fetched in the second phase
+
+    fetched = []
+
+    def get_soups(self, journal, urls, kind):
+        fetched.append(list(urls))
+        return {url: f"page of {url}" for url in urls}
+
+    monkeypatch.setattr(routing.Router, 'get_soups', get_soups)
+    return fetched
+
+def test_terms_are_merged(added, fetched):
+
+    crawler = Crawler()
+    crawler.candidates = Candidates()
+    add_article = AddArticle(crawler, parser.Parser())
+    date_article = datetime(2024, 5, 1, 10, 0)
+
+    for term in ["govern", "pressupost", "govern"]:
+        add_article.add_article_to_dict('periodic', listing_article("https://elperiodic.ad/1", "Title"), "EL1", date_article,
+                                        "https://elperiodic.ad/1", None, term, {}, {})
+    add_article.add_article_to_dict('periodic', listing_article("https://elperiodic.ad/2", "Other"), "EL2", date_article,
+                                    "https://elperiodic.ad/2", None, "pressupost", {}, {})
+
+    candidates = crawler.candidates
+    assert [candidate['terms'] for candidate in candidates] == [["govern", "pressupost"], ["pressupost"]]
+    assert [candidate['title'] for candidate in candidates] == ["Title", "Other"]
+
+    crawler.candidates = None
+    articles, _ = Scraper(crawler).get_candidates('periodic', candidates)
+
+    # Each article is got once, with every term that found it
+    assert articles == {"EL1": 'periodic', "EL2": 'periodic'}
+    assert [(article['article_id'], article['term']) for article in added] == [("EL1", "govern|pressupost"), ("EL2", "pressupost")]
+    assert added[0]['category'] == "noticia"
+    assert fetched == [["https://elperiodic.ad/1", "https://elperiodic.ad/2"]]
+
+def test_candidates_are_fetched_in_batches(monkeypatch, added, fetched):
+
+    monkeypatch.setattr(scraper, 'FRONTIER_DOMAIN_CONCURRENCY', 4)
+
+    candidates = Candidates()
+    for i in range(10):
+        candidates.add('periodic', f"EL{i}", datetime(2024, 5, 1, 10, i), f"https://elperiodic.ad/{i}", f"Title {i}", "noticia", None, None, "govern")
+    # Its text was read while collecting it: it isn't fetched again
+    candidates.add('periodic', "EL10", datetime(2024, 5, 1, 11, 0), "https://elperiodic.ad/10", "Title 10", "noticia", None, ("Subtitle", "Content"), "govern")
+
+    # EL3 was stored by a previous incremental crawl
+    articles, _ = Scraper(Crawler(saved_articles=["EL3"])).get_candidates('periodic', candidates)
+
+    assert fetched == [[f"https://elperiodic.ad/{i}" for i in (0, 1, 2, 4)],
+                       [f"https://elperiodic.ad/{i}" for i in (5, 6, 7, 8)],
+                       ["https://elperiodic.ad/9"]]
+    assert "EL3" not in articles and len(articles) == 10
+    assert added[-1]['text'] == ("Subtitle", "Content") and added[-1]['soup'] is None
+    assert added[0]['soup'] == "page of https://elperiodic.ad/0"
+
+    # The pages are dropped once their batch is done
+    assert all(candidate['soup'] is None and candidate['text'] is None for candidate in candidates)
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from crawler import checkpoint
+from crawler.checkpoint import Checkpoint
+from crawler.scraper import Candidates
+
+DATE_INIT = datetime(2024, 1, 1)
+DATE_END = datetime(2024, 3, 1)
+
+class Output:
+    # Results files of the crawl: they are flushed before every write of the checkpoint
+
+    def __init__(self, path):
+        self.filepath = str(path / "results_2024")
+        self.comments_filepath = str(path / "results_2024_comments")
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+def make_checkpoint(path, search_terms=("govern",), sources=("vilaweb",), date_end=DATE_END) -> Checkpoint:
+    return Checkpoint(str(path), DATE_INIT, date_end, list(search_terms), list(sources))
+
+def make_candidates() -> Candidates:
+    candidates = Candidates()
+    candidates.add('vilaweb', "VW1", datetime(2024, 2, 1, 10, 30), "https://vilaweb.cat/1", "Títol", "política", "<html/>", None, "govern")
+    candidates.add('vilaweb', "VW1", datetime(2024, 2, 1, 10, 30), "https://vilaweb.cat/1", "Títol", "política", None, None, "pressupost")
+    candidates.add('vilaweb', "VW2", datetime(2024, 2, 2), "https://vilaweb.cat/2", "Un altre", None, None, ("subtítol", "text"), "govern")
+    return candidates
+
+def test_write_and_resume(tmp_path):
+
+    crawl_checkpoint = make_checkpoint(tmp_path)
+    output = Output(tmp_path)
+    crawl_checkpoint.output = output
+
+    crawl_checkpoint.page_done('vilaweb', "govern", 3, make_candidates().to_list(), force=True)
+    # Rows are only written when a write is due
+    crawl_checkpoint.last_write = 0
+    crawl_checkpoint.save_rows('vilaweb', {"VW0": 'vilaweb'}, {"C1": "VW0", "C2": "VW0"})
+    crawl_checkpoint.journal_done('elnacional', {"EN1": 'elnacional'}, {})
+    assert output.flushes >= 2
+
+    # A new run, with date_end moved to today, continues with the interval of the checkpoint
+    resumed = make_checkpoint(tmp_path, date_end=datetime(2024, 6, 1))
+    assert resumed.resume()
+
+    assert resumed.resumed
+    assert (resumed.date_init, resumed.date_end) == (DATE_INIT, DATE_END)
+    assert resumed.filepaths == (output.filepath, output.comments_filepath)
+    assert resumed.last_page('vilaweb', "govern") == 3
+    assert not resumed.is_term_done('vilaweb', "govern")
+    assert resumed.is_journal_done('elnacional')
+    assert not resumed.is_journal_done('vilaweb')
+    assert sorted(resumed.article_ids()) == ["EN1", "VW0"]
+    assert sorted(resumed.comment_ids()) == ["C1", "C2"]
+    assert resumed.rows('vilaweb') == ({"VW0": 'vilaweb'}, {"C1": "VW0", "C2": "VW0"})
+
+def test_candidates_round_trip(tmp_path):
+
+    crawl_checkpoint = make_checkpoint(tmp_path)
+    crawl_checkpoint.term_done('vilaweb', "govern", make_candidates().to_list())
+
+    resumed = make_checkpoint(tmp_path)
+    resumed.resume()
+    candidates = Candidates.from_list(resumed.candidates('vilaweb'))
+
+    # The pages and texts aren't kept: the articles are fetched again
+    assert [candidate['article_id'] for candidate in candidates] == ["VW1", "VW2"]
+    first, second = list(candidates)
+    assert first['date_article'] == datetime(2024, 2, 1, 10, 30)
+    assert first['terms'] == ["govern", "pressupost"]
+    assert (first['title'], first['category']) == ("Títol", "política")
+    assert first['soup'] is None and second['text'] is None
+    assert resumed.is_term_done('vilaweb', "govern")
+
+def test_done_journal_drops_its_candidates(tmp_path):
+
+    crawl_checkpoint = make_checkpoint(tmp_path)
+    crawl_checkpoint.term_done('vilaweb', "govern", make_candidates().to_list())
+    crawl_checkpoint.journal_done('vilaweb', {"VW1": 'vilaweb', "VW2": 'vilaweb'}, {})
+
+    resumed = make_checkpoint(tmp_path)
+    resumed.resume()
+
+    assert resumed.candidates('vilaweb') == []
+    assert resumed.article_ids() == ["VW1", "VW2"]
+
+def test_progress_is_written_when_due(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(checkpoint, 'CHECKPOINT_INTERVAL', 3600)
+    crawl_checkpoint = make_checkpoint(tmp_path)
+
+    crawl_checkpoint.page_done('vilaweb', "govern", 1, [])
+    crawl_checkpoint.save_rows('vilaweb', {"VW1": 'vilaweb'}, {})
+    assert not (tmp_path / "checkpoint.json").exists()
+
+    crawl_checkpoint.last_write -= 3600
+    crawl_checkpoint.save_rows('vilaweb', {"VW1": 'vilaweb'}, {})
+    assert (tmp_path / "checkpoint.json").exists()
+
+def test_different_search_is_not_resumed(tmp_path):
+
+    make_checkpoint(tmp_path).journal_done('vilaweb', {"VW1": 'vilaweb'}, {})
+
+    assert not make_checkpoint(tmp_path, search_terms=("eleccions",)).resume()
+    assert not make_checkpoint(tmp_path, sources=("vilaweb", "elnacional")).resume()
+    assert not make_checkpoint(tmp_path / "other").resume()
+
+def test_remove(tmp_path):
+
+    crawl_checkpoint = make_checkpoint(tmp_path)
+    crawl_checkpoint.journal_done('vilaweb', {}, {})
+    crawl_checkpoint.remove()
+    crawl_checkpoint.remove()
+
+    assert not (tmp_path / "checkpoint.json").exists()
+    assert not make_checkpoint(tmp_path).resume()
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from inference.engine import BatchedInference
+
+class Tokenizer:
+    # One token per word, with the length of the word as its id
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        input_ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {'input_ids': input_ids, 'attention_mask': [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, features, padding='longest', return_tensors='pt'):
+        longest = max(len(feature['input_ids']) for feature in features)
+        return {key: torch.tensor([feature[key] + [0] * (longest - len(feature[key])) for feature in features])
+                for key in features[0]}
+
+class Model:
+    # The logits of a text are its number of tokens and the sum of its ids, so we can tell which text they belong to
+
+    def __init__(self):
+        self.config = SimpleNamespace(num_labels=2)
+        self.widths = []
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        self.widths.append(input_ids.shape)
+        logits = torch.stack([attention_mask.sum(dim=1), input_ids.sum(dim=1)], dim=1).float()
+        return SimpleNamespace(logits=logits)
+
+TEXTS = ["a much longer comment than the others here",
+         "short",
+         "two words",
+         "three words here",
+         "",
+         "another fairly long comment with many words in it",
+         "one more"]
+
+def test_logits_in_the_order_of_the_texts():
+
+    logits = BatchedInference(Model(), Tokenizer(), batch_size=3, max_length=128).predict_logits(TEXTS)
+
+    for text, (tokens, ids) in zip(TEXTS, logits):
+        assert tokens == len(text.split())
+        assert ids == sum(len(word) for word in text.split())
+
+def test_batches_of_similar_length():
+
+    model = Model()
+    BatchedInference(model, Tokenizer(), batch_size=2, max_length=128).predict_logits(TEXTS)
+
+    # 7 texts in batches of 2, sorted by length: each batch is only padded up to its longest text
+    assert [shape[0] for shape in model.widths] == [2, 2, 2, 1]
+    assert [shape[1] for shape in model.widths] == sorted(shape[1] for shape in model.widths)
+    assert model.widths[0][1] == 1
+
+def test_truncation_and_progress():
+
+    progress = []
+    engine = BatchedInference(Model(), Tokenizer(), batch_size=4, max_length=3)
+    label_codes, logits = engine.predict(TEXTS, progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert logits[:, 0].max() == 3
+    assert label_codes.shape == (len(TEXTS),)
+    assert progress == [(4, len(TEXTS)), (len(TEXTS), len(TEXTS))]
+
+def test_no_texts():
+
+    logits = BatchedInference(Model(), Tokenizer()).predict_logits([])
+
+    assert logits.shape == (0, 2)
@@ -0,0 +1,106 @@
+import threading
+import time as tme
+
+import pytest
+
+from crawler import frontier, http_client
+from crawler.frontier import Frontier
+
+class Client:
+    # Takes a while to answer every page and keeps the most pages fetched at the same time per domain
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = {}
+        self.max_active = {}
+        self.lock = threading.Lock()
+
+    def fresh_text(self, url, kind):
+        return None
+
+    def get_text(self, url, kind):
+
+        host = frontier.domain(url)
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+
+        tme.sleep(self.delay)
+
+        with self.lock:
+            self.active[host] -= 1
+
+        return f"<html>{url}</html>"
+
+@pytest.fixture
+def client(monkeypatch):
+    client = Client()
+    monkeypatch.setattr(http_client, 'get_client', lambda: client)
+    return client
+
+@pytest.fixture
+def limits(monkeypatch):
+    limits = {}
+    monkeypatch.setattr(frontier, 'FRONTIER_DOMAIN_LIMITS', limits)
+    return limits
+
+def test_domain_without_www():
+
+    assert frontier.domain("https://www.Vilaweb.cat/noticies/1") == "vilaweb.cat"
+    assert frontier.domain("https://elnacional.cat/ca/1") == "elnacional.cat"
+
+def test_tasks_are_dispatched_by_priority(client, limits):
+    # Without workers, we take the tasks by hand
+    crawl_frontier = Frontier(workers=0)
+    limits.update({'a.cat': (10, float('inf'))})
+
+    crawl_frontier.submit("https://a.cat/comments/1", 'comments')
+    crawl_frontier.submit("https://a.cat/article/1", 'article')
+    crawl_frontier.submit("https://a.cat/listing/1", 'listing')
+    crawl_frontier.submit("https://a.cat/article/2", 'article')
+
+    urls = [crawl_frontier.next_task().url for _ in range(4)]
+
+    assert urls == ["https://a.cat/listing/1", "https://a.cat/article/1", "https://a.cat/article/2", "https://a.cat/comments/1"]
+
+def test_busy_domain_is_skipped(client, limits):
+    # With a domain at its concurrency, the tasks of other domains are dispatched first
+    crawl_frontier = Frontier(workers=0)
+    limits.update({'a.cat': (2, float('inf')), 'b.cat': (2, float('inf'))})
+
+    for i in range(3):
+        crawl_frontier.submit(f"https://a.cat/{i}", 'article')
+    crawl_frontier.submit("https://b.cat/0", 'article')
+
+    urls = [crawl_frontier.next_task().url for _ in range(3)]
+
+    assert urls == ["https://a.cat/0", "https://a.cat/1", "https://b.cat/0"]
+    assert crawl_frontier.domains['a.cat']['active'] == 2
+    assert [task.url for task in crawl_frontier.queue] == ["https://a.cat/2"]
+
+def test_domain_waits_for_its_rate(client, limits):
+    # A domain allowing 10 requests per second can't be requested again within 0.1s
+    crawl_frontier = Frontier(workers=0)
+    limits.update({'a.cat': (4, 10)})
+
+    crawl_frontier.submit("https://a.cat/0", 'article')
+    crawl_frontier.submit("https://a.cat/1", 'article')
+
+    start_time = tme.time()
+    crawl_frontier.next_task()
+    crawl_frontier.next_task()
+
+    assert tme.time() - start_time >= 0.09
+
+def test_fetch_all_keeps_the_order_and_the_limits(client, limits):
+
+    limits.update({'a.cat': (2, 1000), 'b.cat': (3, 1000)})
+    crawl_frontier = Frontier(workers=8)
+
+    urls = [f"https://{host}/{i}" for i in range(6) for host in ('a.cat', 'b.cat')]
+    texts = crawl_frontier.fetch_all(urls, 'article')
+
+    assert texts == [f"<html>{url}</html>" for url in urls]
+    assert client.max_active == {'a.cat': 2, 'b.cat': 3}
+    assert crawl_frontier.domains['a.cat']['fetched'] == 6
+    assert crawl_frontier.domains['b.cat']['fetched'] == 6
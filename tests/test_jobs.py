@@ -0,0 +1,68 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import jobs
+from jobs import JobStore
+
+def finished_pid() -> int:
+    # The pid of a process that already finished (and was reaped)
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Workers are not started: they "exit" right away with the pid they get
+    pid = finished_pid()
+    monkeypatch.setattr(jobs.subprocess, 'Popen', lambda *args, **kwargs: SimpleNamespace(pid=pid))
+    return JobStore(str(tmp_path / "jobs"))
+
+def test_queued_job_keeps_the_pid_of_its_worker(store):
+
+    job_id = store.submit('label', {})
+
+    assert store.read(job_id)['pid']
+
+def test_queued_job_without_worker_fails(store):
+
+    job_id = store.submit('label', {})
+    job = store.get(job_id)
+
+    assert job['status'] == 'failed'
+    assert job['error'] == "The worker process stopped unexpectedly."
+
+def test_running_job_without_worker_fails(store):
+
+    job_id = store.submit('label', {})
+    store.update(job_id, statuses=('queued',), status='running')
+
+    assert store.get(job_id)['status'] == 'failed'
+
+def test_job_while_its_worker_starts_stays_queued(store):
+
+    job_id = store.submit('label', {})
+    store.update(job_id, pid=None)
+
+    assert store.get(job_id)['status'] == 'queued'
+
+def test_worker_that_cannot_start(tmp_path, monkeypatch):
+
+    def popen(*args, **kwargs):
+        raise OSError("no python")
+
+    monkeypatch.setattr(jobs.subprocess, 'Popen', popen)
+    store = JobStore(str(tmp_path / "jobs"))
+    job = store.get(store.submit('label', {}))
+
+    assert job['status'] == 'failed'
+    assert "no python" in job['error']
+
+def test_finished_job_is_not_checked(store):
+
+    job_id = store.submit('label', {})
+    store.update(job_id, statuses=('queued',), status='done', result={})
+
+    assert store.get(job_id)['status'] == 'done'
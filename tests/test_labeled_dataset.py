@@ -0,0 +1,25 @@
+import analyze
+
+def test_legacy_comment_id_column(tmp_path):
+    # Older files had an extra positional index, also named comment_id, before the real comment_id
+
+    with open(tmp_path / "comments_labeled.csv", 'w', encoding='utf-8') as file:
+        file.write("comment_id,comment_id,comment_datetime,comment_in_answer_to,label\n")
+        file.write("0,ara-1-1,2024-05-01 10:30:00,,positive\n")
+        file.write("1,ara-1-2,2024-05-01 11:00:00,1,negative\n")
+
+    labeled = analyze.LabeledDataset(str(tmp_path)).read()
+
+    assert labeled['comment_id'].tolist() == ["ara-1-1", "ara-1-2"]
+    assert 'comment_id.1' not in labeled.columns
+    assert labeled.columns.tolist().count('comment_id') == 1
+
+def test_current_comment_id_column(tmp_path):
+
+    with open(tmp_path / "comments_labeled.csv", 'w', encoding='utf-8') as file:
+        file.write("comment_id,comment_datetime,comment_in_answer_to,label\n")
+        file.write("ara-1-1,2024-05-01 10:30:00,,positive\n")
+
+    labeled = analyze.LabeledDataset(str(tmp_path)).read()
+
+    assert labeled['comment_id'].tolist() == ["ara-1-1"]
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from crawler import page_cache, http_client
+from crawler.page_cache import PageCache
+
+TTL = {'listing': 60, 'article': 3600, 'comments': 600}
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class Session:
+    # Answers with the queued responses and keeps the headers of every request
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+def response(status_code: int, text: str = "", headers: dict = None):
+    return SimpleNamespace(status_code=status_code, text=text, headers=headers or {})
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(page_cache.tme, 'time', clock)
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch, clock):
+    cache = PageCache(str(tmp_path / "cache" / "pages.sqlite"), max_mb=10, ttl=TTL)
+    monkeypatch.setattr(page_cache, 'CACHE', cache)
+    monkeypatch.setattr(http_client, 'PAGE_CACHE_ENABLED', True)
+    return cache
+
+def make_client(*responses) -> http_client.HttpClient:
+    client = http_client.HttpClient()
+    client.session = Session(*responses)
+    return client
+
+def test_fresh_for_the_ttl_of_its_kind(cache, clock):
+
+    cache.put("https://journal/page", 'listing', "<html>page</html>")
+    page = cache.get("https://journal/page")
+
+    assert page['text'] == "<html>page</html>"
+    assert cache.is_fresh(page, 'listing')
+
+    clock.now += 61
+    assert not cache.is_fresh(page, 'listing')
+    assert cache.is_fresh(page, 'article')
+
+def test_fresh_page_is_not_requested(cache):
+
+    client = make_client(response(200, "first", {'ETag': '"v1"'}))
+
+    assert client.get_text("https://journal/article", 'article') == "first"
+    assert client.get_text("https://journal/article", 'article') == "first"
+
+    assert len(client.session.requests) == 1
+    assert cache.stats['misses'] == 1 and cache.stats['hits'] == 1
+
+def test_stale_page_is_revalidated(cache, clock):
+
+    client = make_client(response(200, "first", {'ETag': '"v1"', 'Last-Modified': "Mon, 01 Jan 2024 00:00:00 GMT"}),
+                         response(304))
+
+    client.get_text("https://journal/listing", 'listing')
+    clock.now += 61
+
+    assert client.get_text("https://journal/listing", 'listing') == "first"
+    assert client.session.requests[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.stats['revalidated'] == 1
+
+    # The 304 makes the stored page fresh again
+    assert cache.is_fresh(cache.get("https://journal/listing"), 'listing')
+
+def test_changed_page_is_replaced(cache, clock):
+
+    client = make_client(response(200, "first", {'ETag': '"v1"'}), response(200, "second", {'ETag': '"v2"'}))
+
+    client.get_text("https://journal/listing", 'listing')
+    clock.now += 61
+
+    assert client.get_text("https://journal/listing", 'listing') == "second"
+    assert cache.get("https://journal/listing")['etag'] == '"v2"'
+
+def test_unreachable_server_uses_the_stale_page(cache, clock):
+
+    client = make_client(response(200, "first"))
+    client.get_text("https://journal/listing", 'listing')
+    clock.now += 61
+
+    # HttpClient.get returns None when the server can't be reached
+    client.get = lambda url, headers=None: None
+
+    assert client.get_text("https://journal/listing", 'listing') == "first"
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from crawler import scraper
+from crawler.scraper import PageSeeker
+
+NOW = datetime(2024, 6, 1)
+
+class Crawler:
+    checkpoint = None
+    candidates = None
+
+class Checkpoint:
+
+    def __init__(self, last_page):
+        self.page = last_page
+
+    def last_page(self, journal, term):
+        return self.page
+
+def make_seeker(last_page: int, crawler=None) -> tuple:
+    # Results sorted from the newest article: one day per page, and the pages after last_page are empty.
+    # We return the seeker and the pages it read.
+
+    seeker = PageSeeker(crawler if crawler else Crawler(), None, None, None)
+    probed = []
+
+    def oldest_date(journal, page):
+        probed.append(page)
+        return NOW - timedelta(days=page) if page <= last_page else None
+
+    seeker.page_url = lambda journal, url, add_on, page: page
+    seeker.oldest_date = oldest_date
+
+    return seeker, probed
+
+@pytest.mark.parametrize('days_back', [1, 2, 3, 7, 20, 100, 500])
+def test_first_page_reaching_date_end(days_back):
+
+    seeker, probed = make_seeker(1000)
+    page = seeker.first_page('diari', "url", "&page=", NOW - timedelta(days=days_back))
+
+    assert page == days_back
+    # Exponential probing and binary search instead of reading every newer page
+    assert len(probed) <= 2 * days_back.bit_length() + 1
+
+def test_date_end_after_the_last_result():
+
+    seeker, probed = make_seeker(1000)
+
+    assert seeker.first_page('diari', "url", "&page=", NOW) == 1
+    assert probed == [1]
+
+def test_empty_pages_count_as_the_end():
+
+    seeker, _ = make_seeker(5)
+
+    assert seeker.first_page('diari', "url", "&page=", NOW - timedelta(days=50)) == 6
+
+def test_results_that_dont_end(monkeypatch):
+
+    monkeypatch.setattr(scraper, 'PAGE_SEEK_MAX_PAGE', 16)
+    seeker, _ = make_seeker(1000)
+
+    assert seeker.first_page('diari', "url", "&page=", NOW - timedelta(days=500)) == 1
+
+def test_error_reads_from_the_first_page():
+
+    seeker, _ = make_seeker(1000)
+
+    def oldest_date(journal, page):
+        raise ValueError("Unexpected page")
+
+    seeker.oldest_date = oldest_date
+
+    assert seeker.first_page('diari', "url", "&page=", NOW - timedelta(days=10)) == 1
+
+def test_start_page_resumes_after_the_checkpoint():
+
+    crawler = Crawler()
+    crawler.checkpoint = Checkpoint(last_page=7)
+    seeker, probed = make_seeker(1000, crawler)
+
+    assert seeker.start_page('diari', "url", "&page=", NOW - timedelta(days=3), "term") == 8
+    assert probed == []
+
+@pytest.mark.parametrize('enabled, expected', [(True, 3), (False, 1)])
+def test_start_page_without_checkpoint(monkeypatch, enabled, expected):
+
+    monkeypatch.setattr(scraper, 'PAGE_SEEK_ENABLED', enabled)
+    seeker, _ = make_seeker(1000)
+
+    assert seeker.start_page('diari', "url", "&page=", NOW - timedelta(days=3), "term") == expected
@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from inference import cache
+from inference.cache import PredictionCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Every call to time() is one second later, so the order of use is never a tie
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cache.tme, 'time', lambda: float(next(ticks)))
+
+def make_cache(tmp_path, max_entries: int = 100) -> PredictionCache:
+    return PredictionCache(str(tmp_path / "cache" / "predictions.sqlite"), max_entries)
+
+def logits_of(*codes) -> np.ndarray:
+    return np.array([[float(code), -1.0] for code in codes], dtype=np.float32)
+
+def test_hits_in_the_positions_of_the_texts(tmp_path, clock):
+
+    predictions = make_cache(tmp_path)
+    predictions.put_many("model-a", ["first", "second"], [0, 2], logits_of(0, 2))
+
+    found = predictions.get_many("model-a", ["second", "unknown", "first", "second"])
+
+    assert sorted(found) == [0, 2, 3]
+    assert found[0][0] == 2 and found[3][0] == 2 and found[2][0] == 0
+    np.testing.assert_array_equal(found[2][1], logits_of(0)[0])
+
+def test_hits_are_keyed_by_model(tmp_path, clock):
+
+    predictions = make_cache(tmp_path)
+    predictions.put_many("model-a", ["text"], [1], logits_of(1))
+    predictions.put_many("model-b", ["text"], [3], logits_of(3))
+
+    assert predictions.get_many("model-a", ["text"])[0][0] == 1
+    assert predictions.get_many("model-b", ["text"])[0][0] == 3
+    assert predictions.get_many("model-c", ["text"]) == {}
+
+def test_least_recently_used_are_evicted(tmp_path, clock):
+
+    predictions = make_cache(tmp_path, max_entries=3)
+    predictions.put_many("model-a", ["one", "two", "three"], [0, 1, 2], logits_of(0, 1, 2))
+
+    # "one" is used again, so "two" is now the least recently used
+    predictions.get_many("model-a", ["one"])
+    predictions.put_many("model-a", ["four"], [3], logits_of(3))
+
+    found = predictions.get_many("model-a", ["one", "two", "three", "four"])
+    assert sorted(found) == [0, 2, 3]
@@ -0,0 +1,41 @@
+import json
+from types import SimpleNamespace
+
+import torch
+from transformers import BertConfig, BertForSequenceClassification
+
+from inference import quantization
+
+def make_registry(path):
+    # A tiny model, with the stored int8 weights built from it
+    config = BertConfig(vocab_size=50, hidden_size=16, num_hidden_layers=1, num_attention_heads=2, intermediate_size=32, num_labels=4)
+    config.save_pretrained(path)
+
+    int8_model = quantization.quantize(BertForSequenceClassification(config).eval())
+    int8_path = str(path / "int8" / "model.pt")
+    (path / "int8").mkdir()
+    torch.save(int8_model.state_dict(), int8_path)
+    with open(quantization.metadata_path(int8_path), 'w') as file:
+        json.dump({'model_hash': "hash", 'built_at': None}, file)
+
+    registry = SimpleNamespace(model_path=str(path), model_hash=lambda: "hash")
+    return registry, int8_model, int8_path
+
+def test_int8_model_is_loaded_from_its_weights(tmp_path):
+
+    registry, int8_model, int8_path = make_registry(tmp_path)
+    model = quantization.get_model(registry, int8_path)
+
+    input_ids = torch.tensor([[1, 2, 3, 4]])
+    with torch.inference_mode():
+        assert torch.equal(model(input_ids=input_ids).logits, int8_model(input_ids=input_ids).logits)
+
+    # The model is loaded once per stored file
+    assert quantization.get_model(registry, int8_path) is model
+
+def test_stale_int8_model_is_not_used(tmp_path):
+
+    registry, _, int8_path = make_registry(tmp_path)
+    registry.model_hash = lambda: "new weights"
+
+    assert quantization.get_model(registry, int8_path) is None
@@ -0,0 +1,66 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from crawler.watermarks import Watermarks
+
+COLUMNS = ["datetime_added", "journal", "search_term", "datetime_article", "category", "type", "title", "link", "nb_of_comments"]
+
+def write_articles(results_path, articles: dict) -> str:
+    # articles: {article_id: (journal, search_term, datetime_article)}
+
+    rows = {article_id: [datetime(2024, 6, 1), journal, terms, date_article, "", "", "", "", 0]
+            for article_id, (journal, terms, date_article) in articles.items()}
+    filepath = os.path.join(str(results_path), "articles.csv")
+    pd.DataFrame.from_dict(rows, orient='index', columns=COLUMNS).to_csv(filepath, index_label="id")
+
+    return filepath
+
+def test_start_at_the_watermark(tmp_path):
+
+    marks = Watermarks(str(tmp_path), os.path.join(str(tmp_path), "articles.csv"))
+    marks.marks = {'ara': {'govern': datetime(2024, 5, 10)}}
+
+    assert marks.date_init('ara', 'govern', datetime(2024, 5, 1)) == datetime(2024, 5, 10)
+    # The requested interval starts after the watermark
+    assert marks.date_init('ara', 'govern', datetime(2024, 5, 20)) == datetime(2024, 5, 20)
+    # Nothing stored yet for this journal or term
+    assert marks.date_init('ara', 'turisme', datetime(2024, 5, 1)) == datetime(2024, 5, 1)
+    assert marks.date_init('diari', 'govern', datetime(2024, 5, 1)) == datetime(2024, 5, 1)
+
+def test_watermarks_from_articles_stored_before(tmp_path):
+
+    filepath = write_articles(tmp_path, {"AR1": ("ara", "govern|turisme", datetime(2024, 5, 3)),
+                                         "AR2": ("ara", "govern", datetime(2024, 5, 7)),
+                                         "DI1": ("diari", "govern", datetime(2024, 5, 2))})
+
+    marks = Watermarks(str(tmp_path), filepath)
+
+    assert marks.marks == {'ara': {'govern': datetime(2024, 5, 7), 'turisme': datetime(2024, 5, 3)},
+                           'diari': {'govern': datetime(2024, 5, 2)}}
+
+def test_update_with_the_new_articles(tmp_path):
+
+    filepath = write_articles(tmp_path, {"AR1": ("ara", "govern", datetime(2024, 5, 3))})
+    marks = Watermarks(str(tmp_path), filepath)
+
+    # The new articles of the crawl are appended to the same file
+    write_articles(tmp_path, {"AR1": ("ara", "govern", datetime(2024, 5, 3)),
+                              "AR2": ("ara", "govern|turisme", datetime(2024, 5, 9)),
+                              "AR3": ("ara", "turisme", datetime(2024, 5, 1)),
+                              "DI1": ("diari", "govern", datetime(2024, 5, 20))})
+    marks.update({"AR2": "ara", "AR3": "ara"})
+
+    # DI1 isn't one of the new articles, so it doesn't move the watermarks
+    assert marks.marks == {'ara': {'govern': datetime(2024, 5, 9), 'turisme': datetime(2024, 5, 9)}}
+
+def test_written_watermarks_are_read_back(tmp_path):
+
+    marks = Watermarks(str(tmp_path), os.path.join(str(tmp_path), "articles.csv"))
+    assert marks.marks == {}
+
+    marks.marks = {'ara': {'govern': datetime(2024, 5, 9, 12, 30)}}
+    marks.write()
+
+    assert Watermarks(str(tmp_path), os.path.join(str(tmp_path), "articles.csv")).marks == marks.marks
@@ -0,0 +1,84 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from crawler.writers import RowWriter
+
+HEADERS = ["journal", "datetime_article", "title", "nb_of_comments"]
+ROWS = {"ara-1": ["ara", datetime(2024, 5, 1, 10, 30), "A title, with a comma", 3],
+        "ara-2": ["ara", datetime(2024, 5, 2, 8, 0), 'A "quoted" title', 0],
+        "diari-3": ["diari", datetime(2024, 5, 3, 12, 15), "Two\nlines", 12]}
+
+def make_writer(tmp_path, **kwargs) -> RowWriter:
+    return RowWriter(os.path.join(str(tmp_path), "articles"), "id", HEADERS, flush_interval=3600, **kwargs)
+
+def test_same_file_as_pandas(tmp_path):
+
+    writer = make_writer(tmp_path)
+    for article_id, row in ROWS.items():
+        writer.write(article_id, row)
+    writer.close()
+
+    expected = pd.DataFrame.from_dict(ROWS, orient='index', columns=HEADERS)
+    expected_path = os.path.join(str(tmp_path), "expected.csv")
+    expected.to_csv(expected_path, index_label="id")
+
+    with open(writer.csv_path, 'rb') as file, open(expected_path, 'rb') as expected_file:
+        assert file.read() == expected_file.read()
+
+def test_flush_every_flush_rows(tmp_path):
+
+    writer = make_writer(tmp_path, flush_rows=2)
+    ids = list(ROWS)
+
+    writer.write(ids[0], ROWS[ids[0]])
+    assert not os.path.exists(writer.csv_path)
+
+    writer.write(ids[1], ROWS[ids[1]])
+    assert pd.read_csv(writer.csv_path)['id'].tolist() == ids[:2]
+
+    writer.write(ids[2], ROWS[ids[2]])
+    writer.flush()
+    assert pd.read_csv(writer.csv_path)['id'].tolist() == ids
+    writer.close()
+
+def test_resume_appends_without_header(tmp_path):
+
+    ids = list(ROWS)
+
+    writer = make_writer(tmp_path)
+    writer.write(ids[0], ROWS[ids[0]])
+    writer.close()
+
+    # A resumed (or incremental) crawl appends to the file of the stopped one
+    resumed = make_writer(tmp_path, append=True)
+    for article_id in ids[1:]:
+        resumed.write(article_id, ROWS[article_id])
+    resumed.close()
+
+    assert resumed.appended
+    assert resumed.rows == 2
+    assert pd.read_csv(resumed.csv_path)['id'].tolist() == ids
+
+def test_new_crawl_overwrites(tmp_path):
+
+    ids = list(ROWS)
+
+    writer = make_writer(tmp_path)
+    writer.write(ids[0], ROWS[ids[0]])
+    writer.close()
+
+    new = make_writer(tmp_path)
+    new.write(ids[1], ROWS[ids[1]])
+    new.close()
+
+    assert not new.appended
+    assert pd.read_csv(new.csv_path)['id'].tolist() == [ids[1]]
+
+def test_no_rows_no_file(tmp_path):
+
+    writer = make_writer(tmp_path)
+    writer.close()
+
+    assert not os.path.exists(writer.csv_path)